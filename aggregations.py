@@ -0,0 +1,285 @@
+"""
+Blood Cancer Dashboard - Aggregation Services
+Server-side aggregations used by the dashboard pages. Everything here works on
+plain pandas/NumPy objects so it can be reused outside of Streamlit.
+"""
+
+import numpy as np
+import pandas as pd
+from scipy import stats
+
+import disk_cache
+
+# Bump when compute_page_aggregates changes shape, so cached results are recomputed
+AGGREGATES_VERSION = 3
+
+# ============================================================================
+# HISTOGRAM SERVICE
+# ============================================================================
+HISTOGRAM_COLUMNS = ['Age', 'Total WBC count(/cumm)', 'Platelet Count( (/cumm)']
+
+HISTOGRAM_STRATA = {
+    'None': None,
+    'Cancer Type': 'Cancer_Type(AML, ALL, CLL)',
+    'Treatment Type': 'Treatment_Type(Chemotherapy, Radiation)',
+    'Treatment Outcome': 'Treatment_Outcome',
+    'Gender': 'Gender'
+}
+
+def compute_bin_edges(values, nbins=30):
+    """Compute shared bin edges for a numeric column, ignoring missing values"""
+    values = np.asarray(values, dtype=float)
+    finite = values[np.isfinite(values)]
+    if len(finite) == 0:
+        return np.linspace(0.0, 1.0, nbins + 1)
+    return np.histogram_bin_edges(finite, bins=nbins)
+
+def histogram_by_stratum(df, column, strata_col=None, nbins=30, row_mask=None):
+    """
+    Precompute histogram bin counts for a numeric column
+    Values are binned once with shared edges, then counted per stratum with a
+    single np.bincount over (stratum code, bin index) pairs. The result has
+    one row per stratum and bin, so charts render from O(bins) data. Rows
+    outside row_mask (if given) are left out of the edges and the counts.
+    """
+    values = pd.to_numeric(df[column], errors='coerce').to_numpy(dtype=float)
+    if row_mask is not None:
+        values = np.where(row_mask, values, np.nan)
+    edges = compute_bin_edges(values, nbins)
+    nbins = len(edges) - 1
+
+    if strata_col is None:
+        codes = np.zeros(len(values), dtype=np.int64)
+        labels = np.array(['All'], dtype=object)
+    else:
+        codes, labels = pd.factorize(df[strata_col], sort=True)
+        labels = np.asarray(labels, dtype=object)
+
+    valid = np.isfinite(values) & (codes >= 0)
+    bin_idx = np.searchsorted(edges, values[valid], side='right') - 1
+    # The right-most edge is inclusive, matching np.histogram
+    bin_idx = np.clip(bin_idx, 0, nbins - 1)
+
+    flat = codes[valid].astype(np.int64) * nbins + bin_idx
+    counts = np.bincount(flat, minlength=len(labels) * nbins).reshape(len(labels), nbins)
+
+    return pd.DataFrame({
+        'Stratum': np.repeat(labels, nbins),
+        'Bin_Start': np.tile(edges[:-1], len(labels)),
+        'Bin_End': np.tile(edges[1:], len(labels)),
+        'Bin_Center': np.tile((edges[:-1] + edges[1:]) / 2, len(labels)),
+        'Count': counts.ravel()
+    })
+
+def precompute_histograms(df, strata_col=None, nbins=30, columns=None, row_mask=None):
+    """Precompute binned counts for every histogram column present in the frame"""
+    columns = HISTOGRAM_COLUMNS if columns is None else columns
+    return {
+        col: histogram_by_stratum(df, col, strata_col=strata_col, nbins=nbins, row_mask=row_mask)
+        for col in columns if col in df.columns
+    }
+
+# ============================================================================
+# PAGE AGGREGATES (ANALYTICS & CLINICAL INSIGHTS)
+# ============================================================================
+CANCER_COL = 'Cancer_Type(AML, ALL, CLL)'
+TREATMENT_COL = 'Treatment_Type(Chemotherapy, Radiation)'
+OUTCOME_COL = 'Treatment_Outcome'
+GENETIC_COL = 'Genetic_Data(BCR-ABL, FLT3)'
+SIDE_EFFECTS_COL = 'Side_Effects'
+DIAGNOSIS_COL = 'Diagnosis_Result'
+WBC_COL = 'Total WBC count(/cumm)'
+PLATELET_COL = 'Platelet Count( (/cumm)'
+BMA_COL = 'Bone Marrow Aspiration(Positive / Negative / Not Done)'
+SPEP_COL = 'Serum Protein Electrophoresis (SPEP)(Normal / Abnormal)'
+LNB_COL = 'Lymph Node Biopsy(Positive / Negative / Not Done)'
+
+COUNT_COLUMNS = {
+    'gender_counts': 'Gender',
+    'cancer_counts': CANCER_COL,
+    'treatment_counts': TREATMENT_COL,
+    'outcome_counts': OUTCOME_COL,
+    'genetic_counts': GENETIC_COL,
+    'side_effect_counts': SIDE_EFFECTS_COL,
+    'diagnosis_counts': DIAGNOSIS_COL,
+    'bma_counts': BMA_COL,
+    'spep_counts': SPEP_COL,
+    'lnb_counts': LNB_COL
+}
+
+SCATTER_MAX_POINTS = 5000
+
+# Categorical columns compared pairwise in the association matrix
+ASSOCIATION_COLUMNS = ['Gender', CANCER_COL, TREATMENT_COL, GENETIC_COL, SIDE_EFFECTS_COL, OUTCOME_COL,
+                       DIAGNOSIS_COL, BMA_COL, SPEP_COL, LNB_COL, 'Lumbar Puncture (Spinal Tap)']
+ASSOCIATION_CHUNK_ROWS = 100_000
+
+def masked(series, row_mask=None):
+    """A column restricted to the rows selected by a boolean mask (the column itself without one)"""
+    return series if row_mask is None else series[row_mask]
+
+def counts_frame(series):
+    """value_counts as a two-column frame (Value, Count), most frequent first"""
+    counts = series.value_counts()
+    return pd.DataFrame({'Value': counts.index, 'Count': counts.values})
+
+def box_stats(values, groups):
+    """Per-group quartiles and Tukey fences, enough to draw a box plot without raw rows"""
+    frame = pd.DataFrame({'value': values, 'group': groups}).dropna()
+    rows = []
+    for name, group in frame.groupby('group', sort=False)['value']:
+        q1, median, q3 = np.percentile(group.to_numpy(), [25, 50, 75])
+        iqr = q3 - q1
+        inside = group[(group >= q1 - 1.5 * iqr) & (group <= q3 + 1.5 * iqr)]
+        rows.append({'Group': name, 'Q1': q1, 'Median': median, 'Q3': q3,
+                     'Lower_Fence': inside.min(), 'Upper_Fence': inside.max(),
+                     'Mean': group.mean(), 'Count': len(group)})
+    return pd.DataFrame(rows, columns=['Group', 'Q1', 'Median', 'Q3', 'Lower_Fence',
+                                       'Upper_Fence', 'Mean', 'Count'])
+
+def pairwise_contingency(codes, cardinalities, chunk_rows=ASSOCIATION_CHUNK_ROWS):
+    """
+    Contingency tables for every column pair from one batched count
+    codes is an (n_rows, n_columns) array of category codes (-1 = missing).
+    Each pair's (code_i, code_j) cell is offset into its own block of a single
+    flat index, so one np.bincount per row chunk counts every pair at once.
+    Returns {(i, j): table} for i < j.
+    """
+    n_rows, n_cols = codes.shape
+    pairs = [(i, j) for i in range(n_cols) for j in range(i + 1, n_cols)]
+    sizes = [cardinalities[i] * cardinalities[j] for i, j in pairs]
+    offsets = np.concatenate([[0], np.cumsum(sizes)])
+    counts = np.zeros(offsets[-1], dtype=np.int64)
+
+    for start in range(0, n_rows, chunk_rows):
+        chunk = codes[start:start + chunk_rows]
+        flat = []
+        for (i, j), offset in zip(pairs, offsets):
+            valid = (chunk[:, i] >= 0) & (chunk[:, j] >= 0)
+            flat.append(offset + chunk[valid, i] * cardinalities[j] + chunk[valid, j])
+        if flat:
+            counts += np.bincount(np.concatenate(flat), minlength=offsets[-1])
+
+    return {pair: counts[offsets[k]:offsets[k + 1]].reshape(cardinalities[pair[0]], cardinalities[pair[1]])
+            for k, pair in enumerate(pairs)}
+
+def cramers_v(table):
+    """(Cramér's V, chi-square p-value) for a contingency table; empty rows/columns are ignored"""
+    table = table[table.sum(axis=1) > 0][:, table.sum(axis=0) > 0]
+    n = table.sum()
+    if n == 0 or min(table.shape) < 2:
+        return np.nan, np.nan
+    expected = np.outer(table.sum(axis=1), table.sum(axis=0)) / n
+    chi2 = ((table - expected) ** 2 / expected).sum()
+    dof = (table.shape[0] - 1) * (table.shape[1] - 1)
+    return np.sqrt(chi2 / n / (min(table.shape) - 1)), stats.chi2.sf(chi2, dof)
+
+def is_header_value(value, column):
+    """True for a repeated-header cell: the column name, with or without its '(...)' options"""
+    return isinstance(value, str) and (value == column or column.startswith(value + '(')
+                                       or column.startswith(value + ' ('))
+
+def categorical_association(df, columns=None, row_mask=None):
+    """
+    Cramér's V and chi-square p-values for every pair of categorical columns
+    Repeated header rows (a cell holding its own column name) would form a
+    category that co-occurs perfectly across every column, so those cells
+    count as missing, as do rows outside row_mask. Returns two square frames
+    (V, p-value) indexed by column name.
+    """
+    columns = [col for col in (ASSOCIATION_COLUMNS if columns is None else columns) if col in df.columns]
+    codes = np.full((len(df), len(columns)), -1, dtype=np.int64)
+    cardinalities = []
+    for k, col in enumerate(columns):
+        col_codes, uniques = pd.factorize(df[col])
+        for header in np.flatnonzero([is_header_value(value, col) for value in uniques]):
+            col_codes[col_codes == header] = -1
+        if row_mask is not None:
+            col_codes[~row_mask] = -1
+        codes[:, k] = col_codes
+        cardinalities.append(len(uniques))
+
+    v = np.eye(len(columns))
+    p = np.zeros((len(columns), len(columns)))
+    for (i, j), table in pairwise_contingency(codes, cardinalities).items():
+        v[i, j], p[i, j] = cramers_v(table)
+        v[j, i], p[j, i] = v[i, j], p[i, j]
+    return (pd.DataFrame(v, index=columns, columns=columns),
+            pd.DataFrame(p, index=columns, columns=columns))
+
+def summary_metrics(df, row_mask=None):
+    """Scalar KPIs shown on the Analytics and Key Metrics tabs, as a one-row frame"""
+    col = lambda name: masked(df[name], row_mask)
+    total = len(df) if row_mask is None else int(row_mask.sum())
+    outcome = col(OUTCOME_COL).value_counts()
+    return pd.DataFrame([{
+        'Total_Patients': total,
+        'Age_Mean': col('Age').mean(),
+        'Age_Median': col('Age').median(),
+        'Age_Min': col('Age').min(),
+        'Age_Max': col('Age').max(),
+        'WBC_Mean': col(WBC_COL).mean(),
+        'WBC_Median': col(WBC_COL).median(),
+        'Platelet_Mean': col(PLATELET_COL).mean(),
+        'Cancer_Types': col(CANCER_COL).nunique(),
+        'Treatment_Types': col(TREATMENT_COL).nunique(),
+        'Cured': int(outcome.get('Cured', 0)),
+        'Ongoing': int(outcome.get('Ongoing', 0)),
+        'Deceased': int(outcome.get('Deceased', 0)),
+        'Confirmed': int((col(DIAGNOSIS_COL) == 'Confirmed').sum()),
+        'Severe_Side_Effects': int((col(SIDE_EFFECTS_COL) == 'Severe').sum())
+    }])
+
+def compute_page_aggregates(df, nbins=30, row_mask=None):
+    """
+    Every aggregate behind the Analytics and Clinical Insights pages
+    Returns a dict of small DataFrames (O(categories) or O(bins) each), so
+    the pages can render without touching raw rows. row_mask, if given,
+    restricts every aggregate to the selected rows: each aggregate reads only
+    the masked cells of the columns it needs, the frame is never filtered.
+    """
+    col = lambda name: masked(df[name], row_mask)
+    aggregates = {'summary': summary_metrics(df, row_mask)}
+    for name, column in COUNT_COLUMNS.items():
+        aggregates[name] = counts_frame(col(column))
+
+    aggregates['cancer_by_diagnosis'] = pd.crosstab(col(CANCER_COL), col(DIAGNOSIS_COL))
+    aggregates['side_effects_by_treatment'] = pd.crosstab(col(TREATMENT_COL), col(SIDE_EFFECTS_COL))
+    aggregates['outcome_by_cancer'] = pd.crosstab(col(CANCER_COL), col(OUTCOME_COL), margins=True)
+    aggregates['outcome_by_treatment'] = pd.crosstab(col(TREATMENT_COL), col(OUTCOME_COL))
+
+    cure_rate = ((col(OUTCOME_COL) == 'Cured').groupby(col(CANCER_COL)).mean() * 100).sort_values(ascending=False)
+    aggregates['cure_rate_by_cancer'] = pd.DataFrame({'Cancer Type': cure_rate.index,
+                                                      'Cure Rate': cure_rate.values})
+
+    numeric_cols = df.select_dtypes(include=[np.number]).columns
+    aggregates['correlation'] = (pd.DataFrame({name: col(name) for name in numeric_cols}).corr()
+                                 if len(numeric_cols) > 1 else pd.DataFrame())
+    aggregates['association'], aggregates['association_p'] = categorical_association(df, row_mask=row_mask)
+
+    aggregates['wbc_by_outcome'] = box_stats(col(WBC_COL), col(OUTCOME_COL))
+
+    scatter_cols = ['Age', PLATELET_COL, OUTCOME_COL, CANCER_COL, TREATMENT_COL]
+    scatter = pd.DataFrame({name: col(name) for name in scatter_cols})
+    if len(scatter) > SCATTER_MAX_POINTS:
+        scatter = scatter.sample(n=SCATTER_MAX_POINTS, random_state=0)
+    aggregates['scatter_sample'] = scatter.reset_index(drop=True)
+
+    histograms = []
+    for strata_label, strata_col in HISTOGRAM_STRATA.items():
+        for column, hist in precompute_histograms(df, strata_col=strata_col, nbins=nbins,
+                                                  row_mask=row_mask).items():
+            histograms.append(hist.assign(Strata=strata_label, Column=column))
+    aggregates['histograms'] = pd.concat(histograms, ignore_index=True)
+    return aggregates
+
+def cached_page_aggregates(df, fingerprint, nbins=30, row_mask=None, mask_key=None):
+    """
+    compute_page_aggregates backed by the disk cache, keyed by dataset fingerprint
+    A row_mask must come with a mask_key naming it (e.g. 'no_outliers'),
+    since the mask itself is not part of the key.
+    """
+    if row_mask is not None and mask_key is None:
+        raise ValueError("A row mask needs a mask_key to be cached")
+    return disk_cache.get_or_compute(('page_aggregates', AGGREGATES_VERSION, fingerprint, nbins, mask_key),
+                                     lambda: compute_page_aggregates(df, nbins=nbins, row_mask=row_mask))
@@ -0,0 +1,284 @@
+#!/usr/bin/env python3
+"""
+Blood Cancer Dashboard - Local JSON Aggregate API
+Serves the numbers shown on the Clinical Insights and Analytics pages as JSON,
+using the same loader, cleaning cache, aggregation code and snapshots as the
+dashboard. Responses are cached per dataset fingerprint and carry ETags, so
+clients polling with If-None-Match get a 304 until the data changes.
+
+Usage:
+    python api_server.py [--port 8502] [--data <file|folder|glob>]
+    curl http://localhost:8502/api/kpis
+
+Endpoints:
+    /api/health               liveness check
+    /api/dataset              fingerprint, row count and where the numbers come from
+    /api/kpis                 key metrics (patients, outcomes, averages)
+    /api/cure-rates           cure rate by cancer type
+    /api/side-effects         side effect distribution and profile by treatment
+    /api/outcomes             outcomes by cancer type and by treatment type
+    /api/aggregates           names of all aggregates
+    /api/aggregates/<name>    any aggregate as JSON records
+"""
+
+import argparse
+import hashlib
+import json
+import math
+import os
+import sys
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import urlsplit
+
+import numpy as np
+import pandas as pd
+
+import disk_cache
+from aggregations import cached_page_aggregates
+from data_pipeline import clean_data_cached, dataset_fingerprint
+from ingest import file_cache_key, load_sources, resolve_sources
+from precompute import latest_snapshot_version, load_snapshot
+
+API_VERSION = 1
+DEFAULT_PORT = int(os.environ.get('DASHBOARD_API_PORT', '8502'))
+DEFAULT_DATA_FILE = str(Path(__file__).parent / "Blood Cancer Diseases dataset  - Sheet1.csv")
+
+# ============================================================================
+# JSON HELPERS
+# ============================================================================
+def _json_default(value):
+    """Convert NumPy/pandas scalars that json cannot serialize natively"""
+    if isinstance(value, (np.integer, np.floating, np.bool_)):
+        return value.item()
+    if isinstance(value, pd.Timestamp):
+        return value.isoformat()
+    return str(value)
+
+def json_safe(value):
+    """Payload with non-finite floats (NaN, inf) mapped to null, which strict JSON cannot encode"""
+    if isinstance(value, dict):
+        return {key: json_safe(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [json_safe(item) for item in value]
+    if isinstance(value, (float, np.floating)) and not math.isfinite(value):
+        return None
+    return value
+
+def frame_records(frame, index_name=None):
+    """DataFrame as a list of records with NaN mapped to null"""
+    if index_name is not None:
+        frame = frame.rename_axis(index_name).reset_index()
+    frame = frame.astype(object).where(frame.notna(), None)
+    frame.columns = [str(col) for col in frame.columns]
+    return frame.to_dict(orient='records')
+
+def _percent(part, total):
+    return round(part / total * 100, 2) if total else None
+
+# ============================================================================
+# PAYLOADS
+# ============================================================================
+def kpi_payload(aggregates):
+    """Key metrics mirroring the Key Metrics tab"""
+    summary = aggregates['summary'].iloc[0]
+    total = int(summary['Total_Patients'])
+    return {
+        'total_patients': total,
+        'outcomes': {
+            outcome: {'count': int(summary[outcome]), 'percent': _percent(int(summary[outcome]), total)}
+            for outcome in ('Cured', 'Ongoing', 'Deceased')
+        },
+        'treatment_success_rate': _percent(int(summary['Cured']), total),
+        'average_age': summary['Age_Mean'],
+        'median_age': summary['Age_Median'],
+        'average_wbc_count': summary['WBC_Mean'],
+        'median_wbc_count': summary['WBC_Median'],
+        'average_platelet_count': summary['Platelet_Mean'],
+        'cancer_types': int(summary['Cancer_Types']),
+        'treatment_types': int(summary['Treatment_Types']),
+        'confirmed_diagnoses': {'count': int(summary['Confirmed']),
+                                'percent': _percent(int(summary['Confirmed']), total)},
+        'severe_side_effects': {'count': int(summary['Severe_Side_Effects']),
+                                'percent': _percent(int(summary['Severe_Side_Effects']), total)}
+    }
+
+ENDPOINTS = {
+    '/api/kpis': kpi_payload,
+    '/api/cure-rates': lambda a: frame_records(a['cure_rate_by_cancer']),
+    '/api/side-effects': lambda a: {
+        'distribution': frame_records(a['side_effect_counts']),
+        'by_treatment': frame_records(a['side_effects_by_treatment'], 'Treatment Type')
+    },
+    '/api/outcomes': lambda a: {
+        'by_cancer_type': frame_records(a['outcome_by_cancer'], 'Cancer Type'),
+        'by_treatment_type': frame_records(a['outcome_by_treatment'], 'Treatment Type')
+    },
+    '/api/aggregates': lambda a: sorted(a.keys())
+}
+
+# ============================================================================
+# AGGREGATE SERVICE
+# ============================================================================
+class AggregateService:
+    """
+    Resolves the current dataset and its aggregates, and caches rendered
+    responses per dataset fingerprint. The source files are re-checked by
+    size and modification time on every request; the pipeline only runs
+    again when they change.
+    """
+
+    def __init__(self, source=DEFAULT_DATA_FILE):
+        self.source = source
+        self._lock = threading.Lock()
+        self._signature = None
+        self._state = None
+        self._responses = {}
+
+    def _source_signature(self):
+        return tuple(file_cache_key(path) for path in resolve_sources(self.source))
+
+    def current(self):
+        """Dataset state {'fingerprint', 'rows', 'origin', 'aggregates'}, refreshed if the files changed"""
+        signature = self._source_signature()
+        with self._lock:
+            if signature == self._signature and self._state is not None:
+                return self._state
+            df, load_report = load_sources(self.source)
+            if df is None:
+                raise LookupError("; ".join(load_report['Errors']))
+            df_cleaned, report, missing_report = clean_data_cached(df, dataset_fingerprint(df))
+            fingerprint = dataset_fingerprint(df_cleaned)
+
+            version = latest_snapshot_version()
+            snapshot = load_snapshot(version) if version else None
+            if snapshot is not None and snapshot['manifest']['Cleaned_Fingerprint'] == fingerprint:
+                aggregates, origin = snapshot['aggregates'], f"snapshot {version}"
+            else:
+                aggregates, origin = cached_page_aggregates(df_cleaned, fingerprint), 'live'
+
+            self._signature = signature
+            self._state = {'fingerprint': fingerprint, 'rows': len(df_cleaned),
+                           'origin': origin, 'aggregates': aggregates}
+            self._responses = {}
+            return self._state
+
+    def response(self, path):
+        """(etag, body) for an endpoint, rendered once per dataset fingerprint"""
+        state = self.current()
+        key = (path, state['fingerprint'])
+        with self._lock:
+            cached = self._responses.get(key)
+        if cached is not None:
+            return cached
+
+        aggregates = state['aggregates']
+        if path == '/api/dataset':
+            payload = {'fingerprint': state['fingerprint'], 'rows': state['rows'],
+                       'origin': state['origin'], 'source': self.source}
+        elif path in ENDPOINTS:
+            payload = ENDPOINTS[path](aggregates)
+        elif path.startswith('/api/aggregates/') and path.split('/', 3)[3] in aggregates:
+            name = path.split('/', 3)[3]
+            frame = aggregates[name]
+            index_name = None if isinstance(frame.index, pd.RangeIndex) else (frame.index.name or 'index')
+            payload = frame_records(frame, index_name)
+        else:
+            raise KeyError(path)
+
+        body = json.dumps({'api_version': API_VERSION, 'fingerprint': state['fingerprint'],
+                           'data': json_safe(payload)}, default=_json_default, allow_nan=False).encode()
+        # The code version changes the numbers as much as the data does
+        tag = f"{API_VERSION}:{disk_cache.CODE_VERSION}:{state['fingerprint']}:{path}"
+        etag = '"' + hashlib.sha256(tag.encode()).hexdigest()[:32] + '"'
+        with self._lock:
+            self._responses[key] = (etag, body)
+        return etag, body
+
+# ============================================================================
+# HTTP SERVER
+# ============================================================================
+def make_handler(service):
+    """Request handler class bound to an AggregateService"""
+
+    class AggregateHandler(BaseHTTPRequestHandler):
+        server_version = f"BloodCancerDashboardAPI/{API_VERSION}"
+
+        def _send_json(self, status, payload, headers=None):
+            body = json.dumps(payload).encode()
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            for name, value in (headers or {}).items():
+                self.send_header(name, value)
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_GET(self):
+            path = urlsplit(self.path).path.rstrip('/') or '/'
+            if path == '/api/health':
+                self._send_json(200, {'status': 'ok'})
+                return
+            try:
+                etag, body = service.response(path)
+            except KeyError:
+                self._send_json(404, {'error': f"Unknown endpoint {path}"})
+                return
+            except LookupError as e:
+                self._send_json(503, {'error': f"Dataset unavailable: {e}"})
+                return
+            except Exception as e:
+                self._send_json(500, {'error': f"Internal error: {type(e).__name__}: {e}"})
+                return
+
+            if etag in [tag.strip() for tag in self.headers.get('If-None-Match', '').split(',')]:
+                self.send_response(304)
+                self.send_header('ETag', etag)
+                self.end_headers()
+                return
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            self.send_header('ETag', etag)
+            self.send_header('Cache-Control', 'no-cache')
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            # Keep the Streamlit console quiet when running in-process
+            pass
+
+    return AggregateHandler
+
+def create_server(port=DEFAULT_PORT, source=DEFAULT_DATA_FILE, host='127.0.0.1'):
+    """HTTP server for the aggregate API (bound to localhost by default)"""
+    return ThreadingHTTPServer((host, port), make_handler(AggregateService(source)))
+
+def serve_in_background(port=DEFAULT_PORT, source=DEFAULT_DATA_FILE, host='127.0.0.1'):
+    """Start the API on a daemon thread and return the server"""
+    server = create_server(port, source, host)
+    thread = threading.Thread(target=server.serve_forever, name='aggregate-api', daemon=True)
+    thread.start()
+    return server
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve dashboard aggregates as JSON")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--host", default='127.0.0.1')
+    parser.add_argument("--data", default=DEFAULT_DATA_FILE,
+                        help="dataset file, folder or glob pattern")
+    args = parser.parse_args(argv)
+
+    server = create_server(args.port, args.data, args.host)
+    print(f"🔌 Aggregate API listening on http://{args.host}:{args.port}/api/kpis")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\n👋 API stopped.")
+    finally:
+        server.server_close()
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,219 @@
+"""
+Blood Cancer Dashboard - Approximate Query Mode
+Instant, approximate page aggregates for very large datasets. A stratified
+sample (per cancer type) is drawn once per dataset and the regular page
+aggregates are computed on it, then scaled back to the full dataset with 95%
+confidence intervals attached. The exact aggregates can be computed in the
+background at any time.
+
+Strata get rows in proportion to their size (every cancer type gets at least
+one), so the sample is self-weighting up to rounding and counts scale by
+N / n. Intervals use the simple-random-sampling variance with finite
+population correction, which is conservative for a proportionally
+stratified sample.
+"""
+
+import numpy as np
+import pandas as pd
+from scipy import stats
+
+from aggregations import CANCER_COL, COUNT_COLUMNS, cached_page_aggregates, compute_page_aggregates
+
+# Datasets larger than this open in approximate mode by default
+APPROXIMATE_THRESHOLD = 200_000
+DEFAULT_SAMPLE_ROWS = 50_000
+CONFIDENCE = 0.95
+Z = stats.norm.ppf(0.5 + CONFIDENCE / 2)
+
+CROSSTABS = ['cancer_by_diagnosis', 'side_effects_by_treatment', 'outcome_by_cancer', 'outcome_by_treatment']
+SUMMARY_COUNTS = ['Cured', 'Ongoing', 'Deceased', 'Confirmed', 'Severe_Side_Effects']
+SUMMARY_MEANS = {'Age_Mean': 'Age', 'WBC_Mean': 'Total WBC count(/cumm)',
+                 'Platelet_Mean': 'Platelet Count( (/cumm)'}
+SUMMARY_MEDIANS = {'Age_Median': 'Age', 'WBC_Median': 'Total WBC count(/cumm)'}
+
+# ============================================================================
+# STRATIFIED SAMPLE
+# ============================================================================
+class StratifiedSample:
+    """Row positions of a stratified sample plus the per-stratum allocation"""
+
+    def __init__(self, n_rows, positions, allocation, strata_col):
+        self.n_rows = n_rows
+        self.positions = positions
+        self.allocation = allocation
+        self.strata_col = strata_col
+
+    @property
+    def n_sampled(self):
+        return len(self.positions)
+
+    @property
+    def is_exact(self):
+        """Whether the 'sample' is simply every row"""
+        return self.n_sampled == self.n_rows
+
+    @property
+    def nbytes(self):
+        return self.positions.nbytes
+
+def _allocate(population, sample_rows):
+    """Proportional (largest remainder) quotas, at least one row for every non-empty stratum"""
+    ideal = population * sample_rows / population.sum()
+    quotas = np.floor(ideal).astype(np.int64)
+    shortfall = sample_rows - quotas.sum()
+    if shortfall > 0:
+        quotas[np.argsort(quotas - ideal, kind='stable')[:shortfall]] += 1
+    quotas = np.maximum(quotas, (population > 0).astype(np.int64))
+    return np.minimum(quotas, population)
+
+def build_sample(df, strata_col=CANCER_COL, sample_rows=DEFAULT_SAMPLE_ROWS, seed=0):
+    """
+    Draw a stratified random sample without replacement
+    Rows are ordered by stratum code plus a random key in [0, 1) with one
+    argsort, and the first quota rows of each stratum are kept, so no
+    per-stratum loop touches rows.
+    """
+    n_rows = len(df)
+    if strata_col in df.columns:
+        codes, labels = pd.factorize(df[strata_col])
+        labels = list(labels)
+    else:
+        codes, labels = np.zeros(n_rows, dtype=np.int64), []
+    # Missing strata values form their own stratum
+    missing = codes < 0
+    if missing.any():
+        codes = np.where(missing, len(labels), codes)
+        labels.append('Missing')
+    if not labels:
+        labels = ['All']
+    population = np.bincount(codes, minlength=len(labels))
+
+    if n_rows <= sample_rows:
+        positions = np.arange(n_rows)
+        quotas = population
+    else:
+        quotas = _allocate(population, sample_rows)
+        keys = np.random.default_rng(seed).random(n_rows)
+        order = np.argsort(codes + keys)
+        starts = np.concatenate([[0], np.cumsum(population)[:-1]])
+        rank = np.arange(n_rows) - np.repeat(starts, population)
+        sorted_codes = codes[order]
+        positions = np.sort(order[rank < quotas[sorted_codes]])
+
+    allocation = pd.DataFrame({'Stratum': labels, 'Population': population, 'Sampled': quotas})
+    return StratifiedSample(n_rows, positions, allocation, strata_col)
+
+# ============================================================================
+# APPROXIMATE AGGREGATES
+# ============================================================================
+def _count_estimates(counts, n, N):
+    """Scaled estimates and interval half-widths for sample counts out of n sampled rows"""
+    counts = np.asarray(counts, dtype=float)
+    p = counts / n
+    fpc = np.sqrt(max(1 - n / N, 0.0))
+    return counts * N / n, Z * N * np.sqrt(p * (1 - p) / n) * fpc
+
+def _with_interval(frame, column, n, N):
+    """Scale a count column and add CI_Low / CI_High columns"""
+    frame = frame.copy()
+    estimate, half = _count_estimates(frame[column].to_numpy(), n, N)
+    frame[column] = estimate.round()
+    frame['CI_Low'] = np.maximum(estimate - half, 0).round()
+    frame['CI_High'] = (estimate + half).round()
+    return frame
+
+def _median_interval(values):
+    """Distribution-free interval for the median from order statistics"""
+    values = np.sort(values[np.isfinite(values)])
+    n = len(values)
+    if n == 0:
+        return np.nan, np.nan
+    half = Z * np.sqrt(n) / 2
+    low, high = int(max(np.floor(n / 2 - half), 0)), int(min(np.ceil(n / 2 + half), n - 1))
+    return values[low], values[high]
+
+def approximate_page_aggregates(df, sample, nbins=30, row_mask=None):
+    """
+    compute_page_aggregates on a stratified sample, scaled to the full frame
+    Count aggregates are scaled by N / n and get CI_Low / CI_High columns
+    (crosstabs get a parallel '<name>_margin' frame of ± half-widths);
+    'summary_margin' holds the ± half-width for every summary metric and
+    'cure_rate_by_cancer' gets CI columns. Heatmaps, box plots and the
+    scatter sample are plain sample estimates. 'approximation' describes
+    the sample.
+    """
+    frame = df.take(sample.positions)
+    sample_mask = None if row_mask is None else row_mask[sample.positions]
+    aggregates = compute_page_aggregates(frame, nbins=nbins, row_mask=sample_mask)
+    n, N = sample.n_sampled, sample.n_rows
+    if n == 0:
+        return aggregates
+
+    for name in COUNT_COLUMNS:
+        aggregates[name] = _with_interval(aggregates[name], 'Count', n, N)
+    histograms = aggregates['histograms']
+    aggregates['histograms'] = _with_interval(histograms, 'Count', n, N)
+    for name in CROSSTABS:
+        table = aggregates[name]
+        estimate, half = _count_estimates(table.to_numpy(), n, N)
+        aggregates[name] = pd.DataFrame(estimate.round(), index=table.index, columns=table.columns)
+        aggregates[f"{name}_margin"] = pd.DataFrame(half.round(), index=table.index, columns=table.columns)
+
+    # Cure rate per cancer type: a proportion within each sampled group
+    cure = aggregates['cure_rate_by_cancer']
+    group_sizes = frame[CANCER_COL] if sample_mask is None else frame[CANCER_COL][sample_mask]
+    group_sizes = group_sizes.value_counts()
+    n_group = cure['Cancer Type'].map(group_sizes).to_numpy(dtype=float)
+    p = cure['Cure Rate'].to_numpy(dtype=float) / 100
+    half = Z * np.sqrt(p * (1 - p) / n_group) * np.sqrt(max(1 - n / N, 0.0)) * 100
+    cure = cure.assign(CI_Low=np.clip(cure['Cure Rate'] - half, 0, 100),
+                       CI_High=np.clip(cure['Cure Rate'] + half, 0, 100))
+    aggregates['cure_rate_by_cancer'] = cure
+
+    # Summary: scaled counts, normal intervals for means, order-statistic intervals for medians
+    summary = aggregates['summary'].copy()
+    margin = pd.DataFrame(np.nan, index=summary.index, columns=summary.columns)
+    kept = n if sample_mask is None else int(sample_mask.sum())
+    if sample_mask is None:
+        summary['Total_Patients'] = N
+        margin['Total_Patients'] = 0.0
+    else:
+        estimate, half = _count_estimates([kept], n, N)
+        summary['Total_Patients'], margin['Total_Patients'] = estimate.round(), half.round()
+    for col in SUMMARY_COUNTS:
+        estimate, half = _count_estimates([summary[col].iloc[0]], n, N)
+        summary[col], margin[col] = estimate.round(), half.round()
+    for metric, col in SUMMARY_MEANS.items():
+        values = pd.to_numeric(frame[col], errors='coerce').to_numpy(dtype=float)
+        if sample_mask is not None:
+            values = values[sample_mask]
+        values = values[np.isfinite(values)]
+        if len(values) > 1:
+            margin[metric] = Z * values.std(ddof=1) / np.sqrt(len(values)) * np.sqrt(max(1 - n / N, 0.0))
+    for metric, col in SUMMARY_MEDIANS.items():
+        if sample.is_exact:
+            margin[metric] = 0.0
+            continue
+        values = pd.to_numeric(frame[col], errors='coerce').to_numpy(dtype=float)
+        low, high = _median_interval(values if sample_mask is None else values[sample_mask])
+        margin[metric] = max(summary[metric].iloc[0] - low, high - summary[metric].iloc[0])
+    if sample.strata_col == CANCER_COL and sample_mask is None:
+        # Every cancer type is in the sample, so this count is exact
+        margin['Cancer_Types'] = 0.0
+    aggregates['summary'] = summary
+    aggregates['summary_margin'] = margin
+
+    aggregates['approximation'] = pd.DataFrame([{
+        'Sampled_Rows': n,
+        'Total_Rows': N,
+        'Strata_Column': sample.strata_col,
+        'Confidence': CONFIDENCE
+    }])
+    return aggregates
+
+def compute_exact_aggregates(df, fingerprint, row_mask=None, mask_key=None, progress_callback=None):
+    """Background 'refine to exact' job: fill the exact aggregate cache; returns (fingerprint, mask_key)"""
+    if progress_callback is not None:
+        progress_callback(0.1, "Computing exact aggregates")
+    cached_page_aggregates(df, fingerprint, row_mask=row_mask, mask_key=mask_key)
+    return fingerprint, mask_key
@@ -0,0 +1,111 @@
+"""
+Blood Cancer Dashboard - Cleaning Change Sets
+Cleaning only drops duplicate rows and rewrites a minority of cells (imputed
+values, canonicalized spellings, coerced numbers), so a cleaned frame is
+stored as its raw frame plus a sparse change set: a packed bitmap of dropped
+rows and, per column, the positions of changed cells with their new values.
+The full cleaned frame is materialized only when a consumer needs it, and the
+change set doubles as a cell-level audit of what cleaning did.
+"""
+
+import numpy as np
+import pandas as pd
+
+def _equal_cells(before, after):
+    """Element-wise equality that treats two missing values as equal"""
+    with np.errstate(invalid='ignore'):
+        equal = np.asarray(before == after, dtype=bool)
+    return equal | (pd.isna(before) & pd.isna(after))
+
+class ChangeSet:
+    """
+    Dropped-row bitmap plus per-column (positions, new values) against a raw frame
+    fingerprint identifies the cleaned frame, raw_fingerprint the raw frame
+    the change set was computed against.
+    """
+
+    def __init__(self, n_rows, dropped_bits, changes, dtypes, fingerprint=None, raw_fingerprint=None):
+        self.n_rows = n_rows
+        self.dropped_bits = dropped_bits
+        self.changes = changes
+        self.dtypes = dtypes
+        self.fingerprint = fingerprint
+        self.raw_fingerprint = raw_fingerprint
+
+    @property
+    def dropped_mask(self):
+        return np.unpackbits(self.dropped_bits, count=self.n_rows).astype(bool)
+
+    @property
+    def dropped_rows(self):
+        return int(np.unpackbits(self.dropped_bits, count=self.n_rows).sum())
+
+    @property
+    def changed_cells(self):
+        return sum(len(positions) for positions, _ in self.changes.values())
+
+    @property
+    def nbytes(self):
+        """Approximate memory held by the change set itself"""
+        total = self.dropped_bits.nbytes
+        for positions, values in self.changes.values():
+            total += positions.nbytes + int(pd.Series(values).memory_usage(deep=True, index=False))
+        return total
+
+    def materialize(self, raw):
+        """Rebuild the cleaned frame from the raw frame it was computed against"""
+        if len(raw) != self.n_rows:
+            raise ValueError("Change set does not belong to this frame")
+        kept = np.flatnonzero(~self.dropped_mask)
+        frame = raw.take(kept)
+        for col, dtype in self.dtypes.items():
+            if col not in self.changes and raw[col].dtype == dtype:
+                continue
+            positions, values = self.changes.get(col, (np.empty(0, dtype=np.int64), []))
+            numeric = pd.api.types.is_numeric_dtype(raw[col]) and pd.api.types.is_numeric_dtype(dtype)
+            column = raw[col].to_numpy(dtype=dtype if numeric else object, copy=True)
+            column[positions] = values
+            frame[col] = pd.Series(column[kept], index=frame.index).astype(dtype)
+        return frame
+
+    def summary(self):
+        """Changed cells per column (plus dropped rows), largest first"""
+        rows = [{'Column': '(dropped duplicate rows)', 'Changed_Cells': self.dropped_rows}]
+        rows += [{'Column': col, 'Changed_Cells': len(positions)} for col, (positions, _) in self.changes.items()]
+        summary = pd.DataFrame(rows)
+        return summary[summary['Changed_Cells'] > 0].sort_values('Changed_Cells', ascending=False,
+                                                                   ignore_index=True)
+
+    def audit(self, raw, column, limit=500):
+        """Cell-level before/after table for one column (first `limit` changes)"""
+        positions, values = self.changes.get(column, (np.empty(0, dtype=np.int64), []))
+        positions, values = positions[:limit], values[:limit]
+        return pd.DataFrame({
+            'Row': raw.index[positions],
+            'Before': raw[column].to_numpy()[positions],
+            'After': values
+        })
+
+def build_change_set(raw, cleaned, fingerprint=None, raw_fingerprint=None):
+    """
+    Diff a cleaned frame against the raw frame it came from
+    The cleaned frame must keep the raw columns and a subset of the raw
+    (unique) index labels, which is what clean_data produces. Raises
+    ValueError otherwise.
+    """
+    if not raw.index.is_unique or list(cleaned.columns) != list(raw.columns):
+        raise ValueError("Cleaned frame cannot be expressed as changes to the raw frame")
+    positions = raw.index.get_indexer(cleaned.index)
+    if (positions < 0).any() or (np.diff(positions) <= 0).any():
+        raise ValueError("Cleaned rows must be a subset of the raw rows in their original order")
+
+    dropped = np.ones(len(raw), dtype=bool)
+    dropped[positions] = False
+    changes = {}
+    for col in cleaned.columns:
+        before = raw[col].to_numpy()[positions]
+        after = cleaned[col].to_numpy()
+        changed = np.flatnonzero(~_equal_cells(before, after))
+        if len(changed):
+            changes[col] = (positions[changed].astype(np.int64), after[changed])
+    return ChangeSet(len(raw), np.packbits(dropped), changes, dict(cleaned.dtypes), fingerprint, raw_fingerprint)
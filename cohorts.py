@@ -0,0 +1,209 @@
+"""
+Blood Cancer Dashboard - Cohort Comparison Engine
+Compares two patient cohorts across the Key Metrics and Risk Analysis
+measures: outcome rates, lab-value statistics and side-effect / diagnosis
+distributions, each with a significance test. Cohorts are declared as lists
+of (column, operator, value) conditions, so they are plain data that can be
+cached and reused outside of Streamlit.
+"""
+
+import numpy as np
+import pandas as pd
+from scipy import stats
+
+from aggregations import (CANCER_COL, DIAGNOSIS_COL, GENETIC_COL, OUTCOME_COL, PLATELET_COL,
+                          SIDE_EFFECTS_COL, TREATMENT_COL, WBC_COL)
+
+LAB_COLUMNS = {'Age': 'Age', 'WBC Count': WBC_COL, 'Platelet Count': PLATELET_COL}
+RATE_METRICS = [
+    ('Outcome', OUTCOME_COL, 'Cured'),
+    ('Outcome', OUTCOME_COL, 'Ongoing'),
+    ('Outcome', OUTCOME_COL, 'Deceased'),
+    ('Diagnosis', DIAGNOSIS_COL, 'Confirmed'),
+    ('Side Effects', SIDE_EFFECTS_COL, 'Severe')
+]
+DISTRIBUTION_COLUMNS = {'Treatment Outcome': OUTCOME_COL, 'Side Effects': SIDE_EFFECTS_COL,
+                        'Diagnosis Result': DIAGNOSIS_COL}
+
+# Columns offered in the cohort builder (label -> column)
+COHORT_FIELDS = {
+    'Genetic Marker': GENETIC_COL,
+    'Cancer Type': CANCER_COL,
+    'Treatment Type': TREATMENT_COL,
+    'Gender': 'Gender',
+    'Age': 'Age'
+}
+
+PRESETS = {
+    'FLT3 vs BCR-ABL': (('FLT3', [(GENETIC_COL, '==', 'FLT3')]),
+                        ('BCR-ABL', [(GENETIC_COL, '==', 'BCR-ABL')])),
+    'Age < 40 vs Age ≥ 60': (('Age < 40', [('Age', '<', 40)]),
+                             ('Age ≥ 60', [('Age', '>=', 60)])),
+    'Chemotherapy vs Targeted Therapy': (('Chemotherapy', [(TREATMENT_COL, '==', 'Chemotherapy')]),
+                                         ('Targeted Therapy', [(TREATMENT_COL, '==', 'Targeted Therapy')]))
+}
+
+SIGNIFICANCE_LEVEL = 0.05
+MIN_EXPECTED_COUNT = 5
+
+OPERATORS = {
+    '==': lambda s, v: s == v,
+    '!=': lambda s, v: s != v,
+    '<': lambda s, v: s < v,
+    '<=': lambda s, v: s <= v,
+    '>': lambda s, v: s > v,
+    '>=': lambda s, v: s >= v,
+    'in': lambda s, v: s.isin(list(v)),
+    'between': lambda s, v: s.between(v[0], v[1])
+}
+
+# ============================================================================
+# COHORT MASKS
+# ============================================================================
+def _condition_series(df, column, value):
+    """Column values, coerced to numbers when compared against numbers"""
+    series = df[column]
+    numeric_value = isinstance(value, (int, float)) or (
+        isinstance(value, (list, tuple)) and value and all(isinstance(v, (int, float)) for v in value))
+    if numeric_value and not pd.api.types.is_numeric_dtype(series):
+        series = pd.to_numeric(series, errors='coerce')
+    return series
+
+def cohort_masks(df, cohorts):
+    """
+    Evaluate cohort definitions as boolean masks
+    Each distinct (column, operator, value) condition is evaluated once and
+    shared between cohorts; a cohort's mask is the AND of its conditions.
+    """
+    condition_cache = {}
+    masks = []
+    for conditions in cohorts:
+        mask = np.ones(len(df), dtype=bool)
+        for column, op, value in conditions:
+            key = (column, op, repr(value))
+            if key not in condition_cache:
+                series = _condition_series(df, column, value)
+                condition_cache[key] = OPERATORS[op](series, value).fillna(False).to_numpy(dtype=bool)
+            mask &= condition_cache[key]
+        masks.append(mask)
+    return masks
+
+def describe_cohort(conditions):
+    """Human readable cohort definition, e.g. 'Age 18-39 and Gender: Female'"""
+    if not conditions:
+        return 'All patients'
+    parts = []
+    for column, op, value in conditions:
+        if op == 'between':
+            parts.append(f"{column} {value[0]}-{value[1]}")
+        elif op == 'in':
+            parts.append(f"{column}: {', '.join(str(v) for v in value) or 'none'}")
+        else:
+            parts.append(f"{column} {op} {value}")
+    return ' and '.join(parts)
+
+# ============================================================================
+# SIGNIFICANCE TESTS
+# ============================================================================
+def _table_test(table):
+    """Chi-square test of independence, or Fisher's exact test for sparse 2x2 tables"""
+    table = table[:, table.sum(axis=0) > 0]
+    if table.shape[1] < 2 or (table.sum(axis=1) == 0).any():
+        return 'n/a', np.nan, np.nan
+    expected = stats.contingency.expected_freq(table)
+    if table.shape == (2, 2) and (expected < MIN_EXPECTED_COUNT).any():
+        statistic, p_value = stats.fisher_exact(table)
+        return "Fisher's exact", statistic, p_value
+    statistic, p_value, _, _ = stats.chi2_contingency(table)
+    return 'Chi-square', statistic, p_value
+
+def _lab_test(a, b):
+    """Mann-Whitney U test (lab values are skewed, so no normality assumption)"""
+    if len(a) == 0 or len(b) == 0:
+        return 'n/a', np.nan, np.nan
+    statistic, p_value = stats.mannwhitneyu(a, b, alternative='two-sided')
+    return 'Mann-Whitney U', statistic, p_value
+
+# ============================================================================
+# COMPARISON
+# ============================================================================
+def compare_cohorts(df, cohort_a, cohort_b, name_a='Cohort A', name_b='Cohort B', row_mask=None):
+    """
+    Compare two cohorts across outcome rates, lab values and distributions
+    Both cohorts are stacked into one frame (rows in both cohorts appear
+    twice), so every statistic comes from a single grouped pass over the
+    stacked rows. row_mask, if given, is AND-ed into both cohort masks.
+    Returns a report dict with the metrics table.
+    """
+    if name_a == name_b:
+        name_b = f"{name_b} (2)"
+    mask_a, mask_b = cohort_masks(df, [cohort_a, cohort_b])
+    if row_mask is not None:
+        mask_a, mask_b = mask_a & row_mask, mask_b & row_mask
+    idx_a, idx_b = np.flatnonzero(mask_a), np.flatnonzero(mask_b)
+
+    columns = [col for col in set(LAB_COLUMNS.values()) | set(DISTRIBUTION_COLUMNS.values())
+               | {col for _, col, _ in RATE_METRICS} if col in df.columns]
+    stacked = df.iloc[np.concatenate([idx_a, idx_b])][columns].reset_index(drop=True)
+    group = np.repeat([0, 1], [len(idx_a), len(idx_b)])
+    for col in LAB_COLUMNS.values():
+        if col in stacked.columns and not pd.api.types.is_numeric_dtype(stacked[col]):
+            stacked[col] = pd.to_numeric(stacked[col], errors='coerce')
+
+    rows = [{'Section': 'Cohort', 'Metric': 'Patients', name_a: len(idx_a), name_b: len(idx_b),
+             'Difference': len(idx_b) - len(idx_a), 'Test': '', 'Statistic': np.nan, 'P_Value': np.nan}]
+
+    # Outcome, diagnosis and side-effect rates (percent of cohort)
+    sizes = np.array([len(idx_a), len(idx_b)])
+    for section, col, value in RATE_METRICS:
+        if col not in stacked.columns:
+            continue
+        hits = np.bincount(group[(stacked[col] == value).to_numpy()], minlength=2)
+        rates = np.divide(hits * 100, sizes, out=np.full(2, np.nan), where=sizes > 0)
+        test, statistic, p_value = _table_test(np.column_stack([hits, sizes - hits]))
+        rows.append({'Section': section, 'Metric': f"{value} Rate (%)", name_a: rates[0], name_b: rates[1],
+                     'Difference': rates[1] - rates[0], 'Test': test, 'Statistic': statistic,
+                     'P_Value': p_value})
+
+    # Lab values: one groupby for every statistic of every lab column
+    lab_cols = [col for col in LAB_COLUMNS.values() if col in stacked.columns]
+    lab_stats = stacked[lab_cols].groupby(group).agg(['mean', 'median', 'std']).reindex([0, 1])
+    for label, col in LAB_COLUMNS.items():
+        if col not in lab_cols:
+            continue
+        values = stacked[col].to_numpy(dtype=float)
+        valid = np.isfinite(values)
+        test, statistic, p_value = _lab_test(values[valid & (group == 0)], values[valid & (group == 1)])
+        for stat_name, stat_label in (('mean', 'Mean'), ('median', 'Median'), ('std', 'Std Dev')):
+            a, b = lab_stats[(col, stat_name)].to_numpy()
+            rows.append({'Section': 'Lab Values', 'Metric': f"{label} {stat_label}", name_a: a, name_b: b,
+                         'Difference': b - a, 'Test': test if stat_name == 'median' else '',
+                         'Statistic': statistic if stat_name == 'median' else np.nan,
+                         'P_Value': p_value if stat_name == 'median' else np.nan})
+
+    # Category distributions (percent of cohort) with one test per distribution
+    distributions = {}
+    for label, col in DISTRIBUTION_COLUMNS.items():
+        if col not in stacked.columns:
+            continue
+        table = pd.crosstab(group, stacked[col].fillna('Missing')).reindex([0, 1], fill_value=0)
+        test, statistic, p_value = _table_test(table.to_numpy())
+        percents = table.div(table.sum(axis=1).replace(0, np.nan), axis=0) * 100
+        percents.index = [name_a, name_b]
+        distributions[label] = {'Table': percents, 'Test': test, 'Statistic': statistic, 'P_Value': p_value}
+        rows.append({'Section': 'Distribution', 'Metric': label, name_a: np.nan, name_b: np.nan,
+                     'Difference': np.nan, 'Test': test, 'Statistic': statistic, 'P_Value': p_value})
+
+    metrics = pd.DataFrame(rows)
+    metrics['Significant'] = metrics['P_Value'] < SIGNIFICANCE_LEVEL
+    return {
+        'Cohort_A': name_a,
+        'Cohort_B': name_b,
+        'Definition_A': describe_cohort(cohort_a),
+        'Definition_B': describe_cohort(cohort_b),
+        'Rows_A': len(idx_a),
+        'Rows_B': len(idx_b),
+        'Overlap': int((mask_a & mask_b).sum()),
+        'Metrics': metrics,
+        'Distributions': distributions
+    }
@@ -9,14 +9,29 @@ Version: 1.0
 
 import streamlit as st
 import pandas as pd
-import numpy as np
 import plotly.express as px
-import plotly.graph_objects as go
 from plotly.subplots import make_subplots
 import seaborn as sns
 import matplotlib.pyplot as plt
 from datetime import datetime
+import time
 import warnings
+import disk_cache
+from aggregations import HISTOGRAM_STRATA, cached_page_aggregates
+from api_server import serve_in_background
+from approximate import APPROXIMATE_THRESHOLD, approximate_page_aggregates, build_sample, compute_exact_aggregates
+from cohorts import COHORT_FIELDS, PRESETS, SIGNIFICANCE_LEVEL, cohort_masks, compare_cohorts, describe_cohort
+from risk_model import NUMERIC_FEATURES, cached_risk_model, cohort_risk_summary, score_patient, score_patients
+from data_pipeline import CLEANED_CACHE, clean_data_changes, load_fingerprinted, materialize_cleaned
+from ingest import load_sources, load_upload, DEFAULT_MAX_UPLOAD_BYTES, TYPED_CACHE, TypedFrameCache
+from memory_budget import MemoryBudget, apply_release, format_bytes
+from imputation import IMPUTATION_STRATEGIES
+from outliers import cached_outlier_flags
+from validation import validation_summary
+from jobs import JobManager, FAILED, FINISHED_STATES
+from figures import build_figures, histogram_figures
+from precompute import latest_snapshot_version, load_snapshot
+from profiling import cached_profile, default_profile_mode, EXACT, SAMPLED
 warnings.filterwarnings('ignore')
 
 # ============================================================================
@@ -101,10 +116,11 @@ st.markdown("""
 # ============================================================================
 # SESSION STATE & INITIALIZATION
 # ============================================================================
-@st.cache_resource
 def initialize_app():
-    """Initialize app with default settings"""
+    """Initialize this session's app state with default settings"""
+    import uuid
     return {
+        'session_id': uuid.uuid4().hex,
         'data_loaded': False,
         'data_cleaned': False,
         'df': None
@@ -113,116 +129,406 @@ def initialize_app():
 if 'app_state' not in st.session_state:
     st.session_state.app_state = initialize_app()
 
+# App-state describing the cleaning of the loaded frame, reset whenever another frame is loaded
+CLEANING_STATE = {
+    'cleaning_changes': None, 'df_cleaned_fingerprint': None, 'cleaning_report': None,
+    'data_cleaned': False, 'cleaning_finished': False
+}
+
+def reset_cleaning(state):
+    """Forget the cleaning results (and refined exact views) of the previous frame"""
+    state.update(CLEANING_STATE)
+    state.pop('refined', None)
+
 # ============================================================================
 # DATA LOADING & CLEANING FUNCTIONS
 # ============================================================================
-@st.cache_data
-def load_data(file_path):
-    """Load CSV data with error handling"""
+DEFAULT_DATA_FILE = "Blood Cancer Diseases dataset  - Sheet1.csv"
+
+def default_data_source():
+    """Bundled dataset path: relative first (Streamlit Cloud), then the local absolute path"""
+    import os
+    if os.path.exists(DEFAULT_DATA_FILE):
+        return DEFAULT_DATA_FILE
+    return r"c:\Users\User\Desktop\assignment\Assignment\Blood Cancer Diseases dataset  - Sheet1.csv"
+
+# ============================================================================
+# BACKGROUND JOBS
+# ============================================================================
+JOB_LABELS = {
+    'load_job': "📂 Loading dataset",
+    'clean_job': "🧹 Cleaning data",
+    'refine_job': "🎯 Refining to exact"
+}
+
+@st.cache_resource
+def get_job_manager():
+    """Process-wide background job runner shared by all sessions"""
+    return JobManager(max_workers=2)
+
+def apply_finished_jobs():
+    """Move results of this session's finished background jobs into the app state"""
+    state = st.session_state.app_state
+    manager = get_job_manager()
+    for key, label in JOB_LABELS.items():
+        job_id = state.get(key)
+        if job_id is None:
+            continue
+        job = manager.collect(job_id)
+        if job is None:
+            # Forget jobs the runner no longer knows about (e.g. after a restart)
+            if manager.status(job_id) is None:
+                state[key] = None
+            continue
+        state[key] = None
+        
+        if job['status'] == FAILED:
+            state['job_error'] = f"{label} failed: {job['error'].splitlines()[0]}"
+        elif key == 'load_job':
+            df, load_report, fingerprint = job['result']
+            state['load_report'] = load_report
+            if df is None:
+                state['job_error'] = "Error loading data: " + "; ".join(load_report['Errors'])
+            else:
+                state['df'] = df
+                state['df_fingerprint'] = fingerprint
+                state['data_loaded'] = True
+                reset_cleaning(state)
+                state['job_success'] = "✅ Data loaded successfully!"
+                # Large datasets open in approximate mode, with their sample drawn right away
+                st.session_state['approximate_mode'] = len(df) > APPROXIMATE_THRESHOLD
+                if st.session_state['approximate_mode']:
+                    get_sample(df, state['df_fingerprint'])
+                # Reset the uploader so Streamlit releases the uploaded bytes
+                state['upload_nonce'] = state.get('upload_nonce', 0) + 1
+        elif key == 'refine_job':
+            state.setdefault('refined', set()).add(job['result'])
+            state['job_success'] = "🎯 Exact results are ready."
+        else:
+            changes, report, missing_report = job['result']
+            if changes.raw_fingerprint != state.get('df_fingerprint'):
+                state['job_error'] = ("Cleaning finished for a dataset that has since been replaced - "
+                                      "please run it again.")
+                continue
+            state['cleaning_changes'] = changes
+            state['df_cleaned_fingerprint'] = changes.fingerprint
+            state['data_cleaned'] = True
+            state['cleaning_report'] = report
+            state['cleaning_finished'] = True
+            if st.session_state.get('approximate_mode'):
+                get_sample(cleaned_data(), changes.fingerprint)
+
+def has_running_jobs():
+    """Whether this session is waiting on any background job"""
+    return any(st.session_state.app_state.get(key) for key in JOB_LABELS)
+
+@st.fragment(run_every=1.0)
+def show_job_progress():
+    """Auto-refreshing progress bars for this session's background jobs"""
+    state = st.session_state.app_state
+    manager = get_job_manager()
+    for key, label in JOB_LABELS.items():
+        job_id = state.get(key)
+        status = manager.status(job_id) if job_id else None
+        if status is None:
+            continue
+        if status['status'] in FINISHED_STATES:
+            # Full rerun so every page section picks up the result
+            st.rerun()
+        st.progress(status['progress'], text=f"{label}: {status['message']}")
+
+@st.cache_resource
+def start_api_server():
+    """Serve the aggregate JSON API in-process when DASHBOARD_API_PORT is set (once per server)"""
+    import os
+    port = os.environ.get('DASHBOARD_API_PORT')
+    if not port:
+        return None
     try:
-        df = pd.read_csv(file_path)
-        # Convert numeric columns
-        for col in df.columns:
-            if 'WBC' in col or 'Platelet' in col or 'Age' in col:
-                df[col] = pd.to_numeric(df[col], errors='coerce')
-        return df, None
-    except Exception as e:
-        return None, f"Error loading data: {str(e)}"
-
-def analyze_missing_values(df):
-    """Analyze missing values in the dataset"""
-    # Convert numeric columns to proper types
-    for col in df.columns:
-        if 'WBC' in col or 'Platelet' in col or 'Age' in col:
-            df[col] = pd.to_numeric(df[col], errors='coerce')
-    
-    missing_data = {
-        'Column': df.columns,
-        'Missing_Count': df.isnull().sum().values,
-        'Missing_Percentage': (df.isnull().sum().values / len(df) * 100).round(2)
-    }
-    return pd.DataFrame(missing_data)
+        server = serve_in_background(int(port), source=default_data_source())
+    except (OSError, ValueError):
+        return None
+    return f"http://127.0.0.1:{server.server_address[1]}/api"
+
+# ============================================================================
+# MEMORY BUDGET
+# ============================================================================
+@st.cache_resource
+def get_derived_caches():
+    """Outlier flags and samples derived from a dataset, shared by all sessions"""
+    return {'outliers': TypedFrameCache(max_entries=8), 'samples': TypedFrameCache(max_entries=16)}
+
+@st.cache_resource
+def get_memory_budget():
+    """Process-wide memory accounting shared by all sessions"""
+    budget = MemoryBudget()
+    budget.add_cache('Frame cache', TYPED_CACHE.frames, TYPED_CACHE.evict_oldest)
+    budget.add_cache('Cleaned frames', CLEANED_CACHE.frames, CLEANED_CACHE.evict_oldest)
+    derived = get_derived_caches()
+    budget.add_cache('Outlier flags', derived['outliers'].frames, derived['outliers'].evict_oldest)
+    budget.add_cache('Samples', derived['samples'].frames, derived['samples'].evict_oldest)
+    return budget
 
-def clean_data(df):
+def track_memory():
+    """Drop data the budget released, register this session's activity and enforce the budget"""
+    state = st.session_state.app_state
+    apply_release(state)
+    budget = get_memory_budget()
+    budget.touch(state['session_id'], state)
+    budget.enforce(current_session=state['session_id'])
+
+def start_fragment():
     """
-    Comprehensive data cleaning function
-    Steps:
-    1. Remove duplicate rows
-    2. Handle missing values intelligently
-    3. Standardize categorical values
-    4. Remove outliers in numeric columns
-    5. Fix data types
+    Fragment reruns skip main(), so they record activity here as well. If the
+    budget released this session's data, the whole app reruns to show it.
     """
-    df_clean = df.copy()
-    
-    cleaning_report = {
-        'Original_Rows': len(df),
-        'Actions': []
-    }
-    
-    # Step 1: Remove duplicates
-    initial_rows = len(df_clean)
-    df_clean = df_clean.drop_duplicates()
-    duplicates_removed = initial_rows - len(df_clean)
-    if duplicates_removed > 0:
-        cleaning_report['Actions'].append(f"✓ Removed {duplicates_removed} duplicate rows")
-    
-    # Step 2: Handle missing values
-    missing_report = analyze_missing_values(df_clean)
-    
-    for col in df_clean.columns:
-        if df_clean[col].isnull().sum() > 0:
-            if df_clean[col].dtype == 'object':
-                # For categorical columns, fill with mode or 'Unknown'
-                mode_val = df_clean[col].mode()
-                if len(mode_val) > 0:
-                    df_clean[col].fillna(mode_val[0], inplace=True)
-                else:
-                    df_clean[col].fillna('Unknown', inplace=True)
-            else:
-                # For numeric columns, fill with median
-                df_clean[col].fillna(df_clean[col].median(), inplace=True)
-    
-    cleaning_report['Actions'].append(f"✓ Handled missing values using median/mode imputation")
-    
-    # Step 3: Standardize categorical values
-    categorical_cols = df_clean.select_dtypes(include=['object']).columns
-    for col in categorical_cols:
-        df_clean[col] = df_clean[col].str.strip()
-    
-    cleaning_report['Actions'].append(f"✓ Standardized {len(categorical_cols)} categorical columns")
-    
-    # Step 4: Handle outliers in numeric columns (using IQR method)
-    numeric_cols = df_clean.select_dtypes(include=[np.number]).columns
-    outliers_removed = 0
-    
-    for col in numeric_cols:
-        Q1 = df_clean[col].quantile(0.25)
-        Q3 = df_clean[col].quantile(0.75)
-        IQR = Q3 - Q1
-        lower_bound = Q1 - 1.5 * IQR
-        upper_bound = Q3 + 1.5 * IQR
-        
-        # Keep track of outliers but don't remove, just flag them
-        outlier_mask = (df_clean[col] < lower_bound) | (df_clean[col] > upper_bound)
-        outliers_removed += outlier_mask.sum()
-    
-    cleaning_report['Actions'].append(f"✓ Analyzed {len(numeric_cols)} numeric columns for outliers")
-    
-    # Step 5: Data type optimization
-    for col in df_clean.columns:
-        # Convert numeric columns
-        if col.lower() in ['age', 'wbc', 'platelet']:
-            df_clean[col] = pd.to_numeric(df_clean[col], errors='coerce')
-        # Convert any column with numbers in header
-        if 'WBC' in col or 'Platelet' in col or 'Age' in col:
-            df_clean[col] = pd.to_numeric(df_clean[col], errors='coerce')
-    
-    cleaning_report['Actions'].append("✓ Optimized data types")
-    cleaning_report['Final_Rows'] = len(df_clean)
-    cleaning_report['Rows_Removed'] = len(df) - len(df_clean)
-    
-    return df_clean, cleaning_report, missing_report
+    track_memory()
+    if 'memory_released' in st.session_state.app_state:
+        st.rerun(scope='app')
+
+def fragment_data_ready(needs_cleaning=False):
+    """start_fragment() plus a check that the session data a fragment reads is still loaded"""
+    start_fragment()
+    state = st.session_state.app_state
+    if not state['data_loaded'] or (needs_cleaning and cleaned_data() is None):
+        st.warning("⚠️ The data for this section is no longer loaded. Please reload it from the Home page.")
+        return False
+    return True
+
+def show_memory_usage():
+    """Sidebar memory usage for operators"""
+    usage = get_memory_budget().usage(st.session_state.app_state['session_id'])
+    fraction = min(usage['Total_Bytes'] / usage['Budget_Bytes'], 1.0) if usage['Budget_Bytes'] else 0.0
+    with st.expander(f"🧠 Memory: {format_bytes(usage['Total_Bytes'])} / {format_bytes(usage['Budget_Bytes'])}"):
+        st.progress(fraction)
+        st.caption(f"This session: {format_bytes(usage['Session_Bytes'])}")
+        st.caption(f"Active sessions: {usage['Sessions']}")
+        for name, nbytes in usage['Caches'].items():
+            st.caption(f"{name}: {format_bytes(nbytes)}")
+        st.caption(f"Sessions released: {usage['Evictions']}")
+        cache = disk_cache.stats()
+        hit_rate = f"{cache['Hit_Rate']:.0%}" if cache['Hit_Rate'] is not None else "n/a"
+        st.caption(f"💾 Disk cache: {format_bytes(cache['Bytes'])} / {format_bytes(cache['Max_Bytes'])} "
+                   f"in {cache['Entries']} entries, hit rate {hit_rate} "
+                   f"({cache['Hits']} hits, {cache['Misses']} misses)")
+
+# ============================================================================
+# AGGREGATION & CHART HELPERS
+# ============================================================================
+def cleaned_data():
+    """
+    This session's cleaned frame, materialized from its change set on demand
+    None when the data is not cleaned. A change set left over from a frame
+    that has since been replaced counts as not cleaned and is dropped.
+    """
+    state = st.session_state.app_state
+    if state.get('cleaning_changes') is None:
+        return None
+    df_cleaned = materialize_cleaned(state['df'], state['cleaning_changes'], state.get('df_fingerprint'))
+    if df_cleaned is None:
+        reset_cleaning(state)
+    return df_cleaned
+
+def analysis_data():
+    """Cleaned data if available, otherwise the raw data, together with its fingerprint"""
+    state = st.session_state.app_state
+    df_cleaned = cleaned_data()
+    if df_cleaned is not None:
+        return df_cleaned, state['df_cleaned_fingerprint']
+    return state['df'], state['df_fingerprint']
+
+def get_outlier_flags(df, fingerprint):
+    """Outlier bitsets for a dataset that was not cleaned (cleaning keeps its own in the report)"""
+    cache = get_derived_caches()['outliers']
+    flags = cache.get(fingerprint)
+    if flags is None:
+        flags = cached_outlier_flags(df, fingerprint)
+        cache.put(fingerprint, flags)
+    return flags
+
+def outlier_flags():
+    """Outlier flags matching analysis_data()"""
+    state = st.session_state.app_state
+    report = state.get('cleaning_report')
+    if cleaned_data() is not None and report and report.get('Outlier_Flags') is not None:
+        return report['Outlier_Flags']
+    df, fingerprint = analysis_data()
+    return get_outlier_flags(df, fingerprint)
+
+def analysis_mask():
+    """
+    (row mask, mask key) restricting analyses to the rows the user selected
+    Currently the outlier toggle: (None, None) when every row is included.
+    Callers AND the mask into their own masks instead of filtering the frame.
+    """
+    if not st.session_state.get('exclude_outliers'):
+        return None, None
+    return outlier_flags().keep_mask(), 'no_outliers'
+
+def show_outlier_note():
+    """Caption stating how many rows the outlier toggle leaves out"""
+    row_mask, _ = analysis_mask()
+    if row_mask is not None:
+        excluded = len(row_mask) - int(row_mask.sum())
+        st.caption(f"🚫 Outliers excluded: {excluded:,} of {len(row_mask):,} patients have an Age, WBC or "
+                   f"Platelet value outside 1.5 × IQR and are left out of every chart and metric.")
+
+@st.cache_data(max_entries=8)
+def get_live_view(_df, fingerprint, _row_mask=None, mask_key=None):
+    """Page aggregates and figures computed from session data, cached per dataset fingerprint and mask"""
+    aggregates = cached_page_aggregates(_df, fingerprint, row_mask=_row_mask, mask_key=mask_key)
+    return {'manifest': None, 'aggregates': aggregates, 'figures': build_figures(aggregates)}
+
+def get_sample(df, fingerprint):
+    """Stratified sample (per cancer type) of a dataset, drawn once and shared by all sessions"""
+    cache = get_derived_caches()['samples']
+    sample = cache.get(('sample', fingerprint))
+    if sample is None:
+        sample = build_sample(df)
+        cache.put(('sample', fingerprint), sample)
+    return sample
+
+def get_sample_frame(df, fingerprint):
+    """The sampled rows of a dataset as a frame"""
+    cache = get_derived_caches()['samples']
+    frame = cache.get(('frame', fingerprint))
+    if frame is None:
+        frame = df.take(get_sample(df, fingerprint).positions)
+        cache.put(('frame', fingerprint), frame)
+    return frame
+
+@st.cache_data(max_entries=8)
+def get_approximate_view(_df, fingerprint, _row_mask=None, mask_key=None):
+    """Page aggregates and figures estimated from the dataset's sample, with confidence intervals"""
+    aggregates = approximate_page_aggregates(_df, get_sample(_df, fingerprint), row_mask=_row_mask)
+    return {'manifest': None, 'aggregates': aggregates, 'figures': build_figures(aggregates),
+            'approximation': (fingerprint, mask_key)}
+
+def approximate_active(fingerprint, mask_key):
+    """Whether approximate mode is on and the user has not refined this view to exact results"""
+    refined = st.session_state.app_state.get('refined', set())
+    return bool(st.session_state.get('approximate_mode')) and (fingerprint, mask_key) not in refined
+
+@st.cache_resource(max_entries=2)
+def get_snapshot(version):
+    """A precomputed snapshot, read from disk once per server process"""
+    return load_snapshot(version)
+
+def analysis_view():
+    """
+    Aggregates and figures behind the Analytics and Clinical Insights pages
+    The latest offline snapshot is used when no data is loaded, or when it was
+    built from exactly the data this session is analyzing (with every row
+    included); otherwise the view is estimated from the dataset's sample in
+    approximate mode, or computed from the session's data.
+    Returns None if neither exists.
+    """
+    version = latest_snapshot_version()
+    snapshot = get_snapshot(version) if version else None
+    if not st.session_state.app_state['data_loaded']:
+        return snapshot
+    df, fingerprint = analysis_data()
+    row_mask, mask_key = analysis_mask()
+    if snapshot is not None and row_mask is None and snapshot['manifest']['Cleaned_Fingerprint'] == fingerprint:
+        return snapshot
+    if approximate_active(fingerprint, mask_key):
+        return get_approximate_view(df, fingerprint, row_mask, mask_key)
+    return get_live_view(df, fingerprint, row_mask, mask_key)
+
+def show_view_source(view):
+    """Caption telling the user whether they are looking at a snapshot or approximate results"""
+    manifest = view['manifest']
+    if manifest is not None:
+        st.caption(f"📦 Served from precomputed snapshot {manifest['Version']} "
+                   f"({manifest['Cleaned_Rows']:,} rows, built {manifest['Created']})")
+    if view.get('approximation') is not None:
+        show_refine_control(view)
+
+def show_refine_control(view):
+    """Approximate-mode caption with the 'refine to exact' button"""
+    approximation = view['aggregates']['approximation'].iloc[0]
+    col1, col2 = st.columns([0.75, 0.25])
+    with col1:
+        st.caption(f"⚡ Approximate: estimated from a stratified sample of {approximation['Sampled_Rows']:,} of "
+                   f"{approximation['Total_Rows']:,} patients (per cancer type). Error bars and ± values are "
+                   f"{approximation['Confidence']:.0%} confidence intervals.")
+    with col2:
+        refining = st.session_state.app_state.get('refine_job') is not None
+        if st.button("🎯 Refine to exact", key='refine_btn', use_container_width=True, disabled=refining):
+            df, fingerprint = analysis_data()
+            row_mask, mask_key = analysis_mask()
+            st.session_state.app_state['refine_job'] = get_job_manager().submit(
+                'refine', compute_exact_aggregates, df, fingerprint, row_mask, mask_key
+            )
+            st.rerun()
+        if refining:
+            st.caption("⏳ Computing exact results in the background...")
+
+def margin_text(aggregates, metric, fmt="{:,.0f}", scale=1.0):
+    """' ± margin' for a summary metric of approximate aggregates ('' when the value is exact)"""
+    margins = aggregates.get('summary_margin')
+    if margins is None or metric not in margins:
+        return ""
+    margin = margins[metric].iloc[0] * scale
+    return "" if pd.isna(margin) or margin == 0 else f" ± {fmt.format(margin)}"
+
+def with_margins(aggregates, name):
+    """A count table with '± margin' appended to every cell when the aggregates are approximate"""
+    table = aggregates[name]
+    margin = aggregates.get(f"{name}_margin")
+    if margin is None:
+        return table
+    return table.astype(int).astype(str) + " ± " + margin.astype(int).astype(str)
+
+def show_count_intervals(counts):
+    """Caption with the confidence interval of each category count, when approximate"""
+    if 'CI_Low' in counts:
+        st.caption(" · ".join(f"{row.Value}: {row.CI_Low:,.0f}-{row.CI_High:,.0f}"
+                              for row in counts.itertuples()) + " (95% CI)")
+
+PROFILE_MODES = {'Exact': EXACT, 'Sampled (fast)': SAMPLED}
+
+@st.cache_data(max_entries=16)
+def get_profile(_df, fingerprint, mode):
+    """Data-quality profile, cached per dataset fingerprint and profiling mode"""
+    return cached_profile(_df, fingerprint, mode)
+
+def current_profile(df, fingerprint):
+    """Profile of the loaded dataset in the session's chosen (or size-based default) mode"""
+    mode = st.session_state.app_state.get('profile_mode') or default_profile_mode(len(df))
+    return get_profile(df, fingerprint, mode)
+
+def missing_values_table(profile):
+    """Missing-value summary (Column, Missing_Count, Missing_Percentage) from a profile"""
+    columns = profile['Columns']
+    return pd.DataFrame({
+        'Column': columns['Column Name'],
+        'Missing_Count': columns['Null Count'],
+        'Missing_Percentage': columns['Null %']
+    })
+
+@st.cache_data(max_entries=32)
+def get_cohort_comparison(_df, fingerprint, cohort_a, cohort_b, name_a, name_b, _row_mask=None, mask_key=None):
+    """Cohort comparison, cached per dataset fingerprint, cohort definitions and mask"""
+    return compare_cohorts(_df, cohort_a, cohort_b, name_a, name_b, row_mask=_row_mask)
+
+@st.cache_resource(max_entries=4, show_spinner="Training outcome risk model...")
+def get_risk_model(_df, fingerprint):
+    """Outcome risk model, trained once per dataset and shared by all sessions"""
+    return cached_risk_model(_df, fingerprint)
+
+@st.cache_data(max_entries=32)
+def get_cohort_risk(_df, fingerprint, cohort_name, conditions, _row_mask=None, mask_key=None):
+    """Predicted vs observed outcome rates and per-patient scores for one cohort"""
+    model = get_risk_model(_df, fingerprint)
+    mask = cohort_masks(_df, [conditions])[0]
+    if _row_mask is not None:
+        mask &= _row_mask
+    cohort = _df[mask]
+    if len(cohort) == 0:
+        return None, None
+    scores = score_patients(model, cohort)
+    return cohort_risk_summary(model, cohort, scores), scores
 
 # ============================================================================
 # MAIN APP LAYOUT
@@ -237,6 +543,18 @@ def main():
     
     st.markdown("---")
     
+    apply_finished_jobs()
+    track_memory()
+    released = st.session_state.app_state.pop('memory_released', None)
+    if released:
+        st.warning("♻️ Your loaded data was released to free server memory "
+                   f"({'session idle' if released == 'idle' else 'memory budget reached'}). "
+                   "Please load it again from the Home page.")
+    if st.session_state.app_state.get('job_error'):
+        st.error(f"❌ {st.session_state.app_state.pop('job_error')}")
+    if st.session_state.app_state.get('job_success'):
+        st.success(st.session_state.app_state.pop('job_success'))
+    
     # Sidebar Navigation
     with st.sidebar:
         st.markdown("## 📋 Navigation Menu")
@@ -253,6 +571,25 @@ def main():
             st.success("✓ Data Loaded Successfully")
             st.info(f"📊 Total Records: {len(st.session_state.app_state['df'])}")
             st.info(f"📋 Total Columns: {len(st.session_state.app_state['df'].columns)}")
+            st.toggle("🚫 Exclude outliers", key='exclude_outliers',
+                      help="Leave out patients whose Age, WBC or Platelet count lies outside 1.5 × IQR "
+                           "from every Analytics and Clinical Insights chart and metric")
+            st.toggle("⚡ Approximate mode", key='approximate_mode',
+                      help="Estimate Analytics and Clinical Insights from a stratified sample per cancer "
+                           "type, with confidence intervals. On by default for datasets over "
+                           f"{APPROXIMATE_THRESHOLD:,} rows.")
+        
+        api_url = start_api_server()
+        if api_url:
+            st.caption(f"🔌 JSON API: {api_url}")
+        
+        if has_running_jobs():
+            st.markdown("---")
+            st.markdown("### ⏳ Background Jobs")
+            show_job_progress()
+        
+        st.markdown("---")
+        show_memory_usage()
     
     # Route to pages
     if page == "🏠 Home":
@@ -285,24 +622,43 @@ def show_home():
     st.markdown("---")
     
     # Load Dataset Button
+    source = st.text_input(
+        "📁 Data source (CSV file, folder of CSVs, or glob pattern)",
+        value=default_data_source(),
+        key="data_source",
+        help="Per-hospital exports can be loaded together, e.g. exports/ or exports/*_2024.csv"
+    )
     col1, col2, col3 = st.columns([1, 1, 1])
     with col2:
-        if st.button("🔄 Load Dataset", key="load_btn", use_container_width=True):
-            with st.spinner("Loading data..."):
-                # Try relative path first (for Streamlit Cloud), then absolute path (for local)
-                import os
-                file_path = "Blood Cancer Diseases dataset  - Sheet1.csv"
-                if not os.path.exists(file_path):
-                    file_path = r"c:\Users\User\Desktop\assignment\Assignment\Blood Cancer Diseases dataset  - Sheet1.csv"
-                df, error = load_data(file_path)
-                
-                if error:
-                    st.error(f"❌ {error}")
-                else:
-                    st.session_state.app_state['df'] = df
-                    st.session_state.app_state['data_loaded'] = True
-                    st.success("✅ Data loaded successfully!")
-                    st.rerun()
+        loading = st.session_state.app_state.get('load_job') is not None
+        if st.button("🔄 Load Dataset", key="load_btn", use_container_width=True, disabled=loading):
+            st.session_state.app_state['load_job'] = get_job_manager().submit('load', load_fingerprinted, load_sources, source)
+            st.rerun()
+        if loading:
+            st.info("⏳ Loading in the background - you can keep browsing, progress is shown in the sidebar.")
+    
+    # Upload Path - the file is parsed straight from the upload buffer
+    uploader_key = f"upload_{st.session_state.app_state.get('upload_nonce', 0)}"
+    uploaded = st.file_uploader(
+        f"📤 Or upload your own registry export (CSV, up to {DEFAULT_MAX_UPLOAD_BYTES // (1024 * 1024)} MB)",
+        type=['csv'],
+        key=uploader_key
+    )
+    if uploaded is not None:
+        loading = st.session_state.app_state.get('load_job') is not None
+        if st.button("📥 Load Uploaded File", key="upload_btn", use_container_width=True, disabled=loading):
+            st.session_state.app_state['load_job'] = get_job_manager().submit(
+                'upload', load_fingerprinted, load_upload, uploaded, uploaded.name, DEFAULT_MAX_UPLOAD_BYTES
+            )
+            st.rerun()
+    
+    load_report = st.session_state.app_state.get('load_report')
+    if load_report is not None and load_report['Files']:
+        with st.expander(f"📄 Load report: {len(load_report['Files'])} file(s), "
+                         f"{load_report['Total_Rows']:,} rows in {load_report['Seconds']:.2f}s",
+                         expanded=bool(load_report['Errors'])):
+            st.dataframe(pd.DataFrame(load_report['Files']), use_container_width=True, hide_index=True)
+            show_validation(load_report)
     
     st.markdown("---")
     
@@ -331,6 +687,17 @@ def show_home():
     6. **Learn More** - Read 'Tutorial & Help' for detailed explanations
     """)
 
+def show_validation(load_report):
+    """One line per broken validation rule of a load, with sample row numbers"""
+    violations = validation_summary(load_report.get('Validation', []), violations_only=True)
+    if violations.empty:
+        st.caption("🩺 Validation: every rule passed.")
+        return
+    st.caption(f"🩺 Validation: {int(violations['Violations'].sum()):,} violations of "
+               f"{len(violations)} rule(s). Values are kept as loaded (malformed numbers become "
+               f"missing); see Data Overview > Data Quality for every rule.")
+    st.dataframe(violations, use_container_width=True, hide_index=True)
+
 # ============================================================================
 # PAGE: DATA OVERVIEW
 # ============================================================================
@@ -341,8 +708,22 @@ def show_data_overview():
         st.warning("⚠️ Please load the dataset first from the Home page!")
         return
     
+    show_overview_sections()
+
+@st.fragment
+def show_overview_sections():
+    """Profiling mode and the overview tabs; switching the mode reruns only this section"""
+    if not fragment_data_ready():
+        return
     df = st.session_state.app_state['df']
     
+    current_mode = st.session_state.app_state.get('profile_mode') or default_profile_mode(len(df))
+    mode_label = st.radio("Profiling mode:", list(PROFILE_MODES.keys()), horizontal=True,
+                          index=list(PROFILE_MODES.values()).index(current_mode),
+                          help="Sampled mode profiles a random subset of rows - much faster on huge files")
+    st.session_state.app_state['profile_mode'] = PROFILE_MODES[mode_label]
+    profile = current_profile(df, st.session_state.app_state['df_fingerprint'])
+    
     # Tabs for different views
     tab1, tab2, tab3, tab4 = st.tabs(["📋 Raw Data", "📊 Statistics", "ℹ️ Column Info", "🔍 Data Quality"])
     
@@ -357,18 +738,13 @@ def show_data_overview():
     
     with tab3:
         st.markdown("### Column Information")
-        col_info = pd.DataFrame({
-            'Column Name': df.columns,
-            'Data Type': df.dtypes.values,
-            'Non-Null Count': df.count().values,
-            'Null Count': df.isnull().sum().values,
-            'Unique Values': [df[col].nunique() for col in df.columns]
-        })
-        st.dataframe(col_info, use_container_width=True)
+        st.caption(f"Profiled {profile['Rows_Profiled']:,} of {profile['Total_Rows']:,} rows "
+                   f"({profile['Mode']} mode, distinct counts: {profile['Distinct_Method']})")
+        st.dataframe(profile['Columns'], use_container_width=True, hide_index=True)
     
     with tab4:
         st.markdown("### Data Quality Assessment")
-        missing = analyze_missing_values(df)
+        missing = missing_values_table(profile)
         
         # Visualize missing data
         fig = px.bar(
@@ -383,13 +759,39 @@ def show_data_overview():
         st.plotly_chart(fig, use_container_width=True)
         
         # Data quality score
-        completeness = (1 - df.isnull().sum().sum() / (len(df) * len(df.columns))) * 100
-        st.metric("Data Completeness Score", f"{completeness:.2f}%")
+        st.metric("Data Completeness Score", f"{profile['Completeness']:.2f}%")
         st.dataframe(missing, use_container_width=True)
+        
+        st.markdown("### 🩺 Validation Rules")
+        load_report = st.session_state.app_state.get('load_report')
+        if load_report is not None:
+            st.dataframe(validation_summary(load_report.get('Validation', [])),
+                         use_container_width=True, hide_index=True)
+            st.caption("Checked while loading: category sets, Age 0-120 and plausible WBC / Platelet "
+                       "ranges. Sample_Rows are row numbers in the loaded data.")
 
 # ============================================================================
 # PAGE: DATA CLEANING
 # ============================================================================
+@st.fragment
+def show_cleaning_audit():
+    """Cell-level view of what cleaning changed, read straight from the change set"""
+    if not fragment_data_ready(needs_cleaning=True):
+        return
+    df, changes = st.session_state.app_state['df'], st.session_state.app_state['cleaning_changes']
+    with st.expander(f"🔍 What did cleaning change? ({changes.changed_cells:,} cells, "
+                     f"{changes.dropped_rows:,} dropped rows)"):
+        summary = changes.summary()
+        if summary.empty:
+            st.info("ℹ️ Cleaning did not change any values.")
+            return
+        st.dataframe(summary, use_container_width=True, hide_index=True)
+        columns = list(changes.changes)
+        if columns:
+            column = st.selectbox("Show changed cells in column", columns, key='audit_column')
+            st.dataframe(changes.audit(df, column), use_container_width=True, hide_index=True)
+            st.caption("Showing up to the first 500 changed cells; Row is the row number in the loaded data.")
+
 def show_data_cleaning():
     st.markdown("## 🧹 Data Cleaning & Preprocessing")
     
@@ -407,9 +809,10 @@ def show_data_cleaning():
         1. **Remove Duplicates**: Identifies and removes exact duplicate rows that might skew analysis
         2. **Handle Missing Values**: 
            - Categorical: Filled with mode (most frequent value)
-           - Numeric: Filled with median (resistant to outliers)
-        3. **Standardize Text**: Removes extra spaces from categorical data
-        4. **Outlier Detection**: Uses IQR method to identify unusual values
+           - Numeric: Filled with median (resistant to outliers), or estimated from similar patients
+             with KNN / iterative imputation for Age, WBC and Platelet counts
+        3. **Standardize Text**: Removes extra spaces and unifies spellings of categorical values
+        4. **Outlier Detection**: Uses IQR method to flag unusual values (kept, and can be excluded from analyses with the sidebar toggle)
         5. **Data Type Optimization**: Ensures columns have correct data types
         
         #### Why It Matters:
@@ -426,13 +829,13 @@ def show_data_cleaning():
         st.metric("Total Rows", len(df))
     with col2:
         st.metric("Total Columns", len(df.columns))
+    profile = current_profile(df, st.session_state.app_state['df_fingerprint'])
     with col3:
-        missing_pct = (df.isnull().sum().sum() / (len(df) * len(df.columns)) * 100)
-        st.metric("Missing Data %", f"{missing_pct:.2f}%")
+        st.metric("Missing Data %", f"{100 - profile['Completeness']:.2f}%")
     
     # Missing values visualization
     st.markdown("### Missing Values Heatmap")
-    missing_data = analyze_missing_values(df)
+    missing_data = missing_values_table(profile)
     fig = px.bar(
         missing_data[missing_data['Missing_Count'] > 0],
         x='Column',
@@ -447,71 +850,142 @@ def show_data_cleaning():
     st.markdown("---")
     st.markdown("### 🔄 Clean the Data")
     
-    if st.button("🚀 Start Data Cleaning Process", use_container_width=True, type="primary"):
-        with st.spinner("🔄 Cleaning data... This may take a moment..."):
-            df_cleaned, report, missing_report = clean_data(df)
-            st.session_state.app_state['df_cleaned'] = df_cleaned
-            st.session_state.app_state['data_cleaned'] = True
-            
-            # Display cleaning report
-            st.success("✅ Data Cleaning Completed Successfully!")
-            
-            st.markdown("### 📋 Cleaning Report")
-            col1, col2, col3, col4 = st.columns(4)
-            with col1:
-                st.metric("Original Rows", report['Original_Rows'])
-            with col2:
-                st.metric("Final Rows", report['Final_Rows'])
-            with col3:
-                st.metric("Rows Removed", report['Rows_Removed'])
-            with col4:
-                removal_pct = (report['Rows_Removed'] / report['Original_Rows'] * 100)
-                st.metric("Removal %", f"{removal_pct:.2f}%")
-            
-            st.markdown("#### Actions Performed:")
-            for action in report['Actions']:
-                st.info(action)
-            
-            # Comparison Table
-            st.markdown("#### Before vs After Cleaning")
-            comparison = pd.DataFrame({
-                'Metric': ['Total Rows', 'Total Columns', 'Missing Values'],
-                'Before': [len(df), len(df.columns), df.isnull().sum().sum()],
-                'After': [len(df_cleaned), len(df_cleaned.columns), df_cleaned.isnull().sum().sum()]
-            })
-            st.dataframe(comparison, use_container_width=True)
-            
+    cleaning = st.session_state.app_state.get('clean_job') is not None
+    imputation = st.selectbox(
+        "🩹 Imputation of missing Age, WBC and Platelet values", list(IMPUTATION_STRATEGIES),
+        format_func=IMPUTATION_STRATEGIES.get, key='imputation_strategy', disabled=cleaning,
+        help="Median filling is instant but piles missing values onto one spike; KNN and iterative "
+             "imputation estimate each value from similar patients and keep the distributions' shape"
+    )
+    if st.button("🚀 Start Data Cleaning Process", use_container_width=True, type="primary",
+                 disabled=cleaning):
+        st.session_state.app_state['clean_job'] = get_job_manager().submit(
+            'clean', clean_data_changes, df, st.session_state.app_state['df_fingerprint'],
+            imputation=imputation
+        )
+        st.rerun()
+    if cleaning:
+        st.info("⏳ Cleaning runs in the background - you can navigate away and come back.")
+    
+    df_cleaned = cleaned_data()
+    report = st.session_state.app_state.get('cleaning_report')
+    if report is not None and df_cleaned is not None:
+        
+        # Display cleaning report
+        st.success("✅ Data Cleaning Completed Successfully!")
+        
+        st.markdown("### 📋 Cleaning Report")
+        col1, col2, col3, col4 = st.columns(4)
+        with col1:
+            st.metric("Original Rows", report['Original_Rows'])
+        with col2:
+            st.metric("Final Rows", report['Final_Rows'])
+        with col3:
+            st.metric("Rows Removed", report['Rows_Removed'])
+        with col4:
+            removal_pct = (report['Rows_Removed'] / report['Original_Rows'] * 100)
+            st.metric("Removal %", f"{removal_pct:.2f}%")
+        
+        st.markdown("#### Actions Performed:")
+        for action in report['Actions']:
+            st.info(action)
+        
+        if report.get('Value_Mappings'):
+            with st.expander(f"🔤 Canonicalized values ({len(report['Value_Mappings'])})"):
+                st.dataframe(pd.DataFrame(report['Value_Mappings']), use_container_width=True, hide_index=True)
+        
+        if report.get('Outlier_Flags') is not None:
+            with st.expander("📏 Outlier bounds (IQR)"):
+                st.dataframe(report['Outlier_Flags'].summary(), use_container_width=True, hide_index=True)
+                st.caption("Outliers are flagged, not removed. Use 🚫 Exclude outliers in the sidebar "
+                           "to leave them out of the analysis pages.")
+        
+        # Comparison Table
+        st.markdown("#### Before vs After Cleaning")
+        comparison = pd.DataFrame({
+            'Metric': ['Total Rows', 'Total Columns', 'Missing Values'],
+            'Before': [len(df), len(df.columns), df.isnull().sum().sum()],
+            'After': [len(df_cleaned), len(df_cleaned.columns), df_cleaned.isnull().sum().sum()]
+        })
+        st.dataframe(comparison, use_container_width=True)
+        
+        show_cleaning_audit()
+        
+        if st.session_state.app_state.pop('cleaning_finished', False):
             st.balloons()
     
     # Show cleaned data preview if available
     if st.session_state.app_state['data_cleaned']:
-        st.markdown("---")
-        st.markdown("### 👁️ Cleaned Data Preview")
-        df_cleaned = st.session_state.app_state['df_cleaned']
-        st.dataframe(df_cleaned.head(50), use_container_width=True, height=400)
-        
-        # Download cleaned data
-        csv = df_cleaned.to_csv(index=False)
-        st.download_button(
-            label="📥 Download Cleaned Data (CSV)",
-            data=csv,
-            file_name=f"blood_cancer_cleaned_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv",
-            mime="text/csv",
-            use_container_width=True
-        )
+        show_cleaned_preview()
+
+@st.fragment
+def show_cleaned_preview():
+    """Cleaned data preview and download, isolated from the rest of the cleaning page"""
+    if not fragment_data_ready(needs_cleaning=True):
+        return
+    st.markdown("---")
+    st.markdown("### 👁️ Cleaned Data Preview")
+    df_cleaned = cleaned_data()
+    st.dataframe(df_cleaned.head(50), use_container_width=True, height=400)
+    
+    # Download cleaned data (the CSV is only built when the button is clicked, without a rerun)
+    st.download_button(
+        label="📥 Download Cleaned Data (CSV)",
+        data=lambda: df_cleaned.to_csv(index=False),
+        file_name=f"blood_cancer_cleaned_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv",
+        mime="text/csv",
+        on_click='ignore',
+        use_container_width=True
+    )
 
 # ============================================================================
 # PAGE: ANALYTICS
 # ============================================================================
+@st.fragment
+def show_distributions(aggregates, figures):
+    """
+    Distribution tab; changing the stratification reruns only this tab
+    The page's aggregates and figures are passed by reference, so a rerun
+    reuses them instead of fetching the view again.
+    """
+    start_fragment()
+    summary = aggregates['summary'].iloc[0]
+    st.markdown("### Age Distribution")
+    strata_label = st.selectbox("Stratify distributions by:", list(HISTOGRAM_STRATA.keys()),
+                                key="hist_strata")
+    histograms = figures if strata_label == 'None' else histogram_figures(aggregates, strata_label)
+    st.plotly_chart(histograms['histogram:Age'], use_container_width=True)
+    
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        st.metric("Average Age", f"{summary['Age_Mean']:.1f}{margin_text(aggregates, 'Age_Mean', '{:.1f}')} years")
+    with col2:
+        st.metric("Median Age",
+                  f"{summary['Age_Median']:.1f}{margin_text(aggregates, 'Age_Median', '{:.1f}')} years")
+    with col3:
+        st.metric("Age Range", f"{summary['Age_Min']}-{summary['Age_Max']} years")
+    
+    st.markdown("### Lab Value Distributions")
+    col1, col2 = st.columns(2)
+    with col1:
+        st.plotly_chart(histograms['histogram:Total WBC count(/cumm)'], use_container_width=True)
+    with col2:
+        st.plotly_chart(histograms['histogram:Platelet Count( (/cumm)'], use_container_width=True)
+    
+    st.markdown("### Gender Distribution")
+    st.plotly_chart(figures['gender_pie'], use_container_width=True)
+
 def show_analytics():
     st.markdown("## 📈 Analytics & Visualizations")
     
-    if not st.session_state.app_state['data_loaded']:
+    view = analysis_view()
+    if view is None:
         st.warning("⚠️ Please load the dataset first from the Home page!")
         return
-    
-    # Use cleaned data if available, otherwise original
-    df = st.session_state.app_state.get('df_cleaned', st.session_state.app_state['df'])
+    show_view_source(view)
+    show_outlier_note()
+    aggregates, figures = view['aggregates'], view['figures']
+    summary = aggregates['summary'].iloc[0]
     
     st.markdown("### 📚 Tutorial: Understanding the Visualizations")
     with st.expander("ℹ️ Learn how to interpret charts", expanded=False):
@@ -529,162 +1003,253 @@ def show_analytics():
     ])
     
     with tab1:
-        st.markdown("### Age Distribution")
-        fig = px.histogram(df, x='Age', nbins=30, title="Age Distribution of Patients",
-                          labels={'Age': 'Age (years)', 'count': 'Number of Patients'},
-                          color_discrete_sequence=['#1f77b4'])
-        st.plotly_chart(fig, use_container_width=True)
-        
-        col1, col2, col3 = st.columns(3)
-        with col1:
-            st.metric("Average Age", f"{df['Age'].mean():.1f} years")
-        with col2:
-            st.metric("Median Age", f"{df['Age'].median():.1f} years")
-        with col3:
-            st.metric("Age Range", f"{df['Age'].min()}-{df['Age'].max()} years")
-        
-        st.markdown("### Gender Distribution")
-        gender_counts = df['Gender'].value_counts()
-        fig = px.pie(values=gender_counts.values, names=gender_counts.index,
-                     title="Gender Distribution", color_discrete_sequence=['#FF6B9D', '#4A90E2'])
-        st.plotly_chart(fig, use_container_width=True)
+        show_distributions(aggregates, figures)
     
     with tab2:
         st.markdown("### Cancer Type Distribution")
-        cancer_counts = df['Cancer_Type(AML, ALL, CLL)'].value_counts()
-        fig = px.bar(x=cancer_counts.index, y=cancer_counts.values,
-                     title="Number of Patients by Cancer Type",
-                     labels={'x': 'Cancer Type', 'y': 'Number of Patients'},
-                     color=cancer_counts.values,
-                     color_continuous_scale='Viridis')
-        st.plotly_chart(fig, use_container_width=True)
+        st.plotly_chart(figures['cancer_bar'], use_container_width=True)
         
         st.markdown("### Cancer Type by Diagnosis Result")
-        cancer_diagnosis = pd.crosstab(df['Cancer_Type(AML, ALL, CLL)'], df['Diagnosis_Result'])
-        fig = px.bar(cancer_diagnosis, barmode='group', title="Cancer Type by Diagnosis Result",
-                     labels={'value': 'Count', 'index': 'Cancer Type'})
-        st.plotly_chart(fig, use_container_width=True)
+        st.plotly_chart(figures['cancer_by_diagnosis'], use_container_width=True)
     
     with tab3:
         st.markdown("### Treatment Type Distribution")
-        treatment_counts = df['Treatment_Type(Chemotherapy, Radiation)'].value_counts()
-        fig = px.bar(x=treatment_counts.index, y=treatment_counts.values,
-                     title="Number of Patients by Treatment Type",
-                     labels={'x': 'Treatment Type', 'y': 'Number of Patients'},
-                     color=treatment_counts.values,
-                     color_continuous_scale='Blues')
-        st.plotly_chart(fig, use_container_width=True)
+        st.plotly_chart(figures['treatment_bar'], use_container_width=True)
         
         st.markdown("### Treatment Outcomes")
-        outcome_counts = df['Treatment_Outcome'].value_counts()
-        colors_map = {'Cured': '#2ecc71', 'Ongoing': '#f39c12', 'Deceased': '#e74c3c'}
-        colors = [colors_map.get(x, '#95a5a6') for x in outcome_counts.index]
-        fig = px.pie(values=outcome_counts.values, names=outcome_counts.index,
-                     title="Treatment Outcomes Distribution",
-                     color_discrete_sequence=colors)
-        st.plotly_chart(fig, use_container_width=True)
+        st.plotly_chart(figures['outcome_pie'], use_container_width=True)
         
         # Success rate
-        success_rate = (outcome_counts.get('Cured', 0) / len(df) * 100)
-        st.metric("Treatment Success Rate (Cured)", f"{success_rate:.2f}%")
+        success_rate = (summary['Cured'] / summary['Total_Patients'] * 100)
+        st.metric("Treatment Success Rate (Cured)",
+                  f"{success_rate:.2f}"
+                  f"{margin_text(aggregates, 'Cured', '{:.2f}', scale=100 / summary['Total_Patients'])}%")
     
     with tab4:
         st.markdown("### Genetic Data Distribution")
-        genetic_counts = df['Genetic_Data(BCR-ABL, FLT3)'].value_counts()
-        fig = px.bar(x=genetic_counts.index, y=genetic_counts.values,
-                     title="Genetic Markers in Patients",
-                     labels={'x': 'Genetic Marker', 'y': 'Number of Patients'},
-                     color=genetic_counts.values,
-                     color_continuous_scale='Greens')
-        st.plotly_chart(fig, use_container_width=True)
+        st.plotly_chart(figures['genetic_bar'], use_container_width=True)
         
         st.markdown("### Side Effects by Treatment Type")
-        side_effects = pd.crosstab(df['Treatment_Type(Chemotherapy, Radiation)'], df['Side_Effects'])
-        fig = px.bar(side_effects, barmode='stack', title="Side Effects by Treatment Type",
-                     labels={'value': 'Count'})
-        st.plotly_chart(fig, use_container_width=True)
+        st.plotly_chart(figures['side_effects_by_treatment'], use_container_width=True)
     
     with tab5:
         st.markdown("### Correlation Heatmap")
+        if 'correlation' in figures:
+            st.plotly_chart(figures['correlation'], use_container_width=True)
         
-        # Select numeric columns for correlation
-        numeric_cols = df.select_dtypes(include=[np.number]).columns
-        if len(numeric_cols) > 1:
-            corr_matrix = df[numeric_cols].corr()
-            
-            fig = go.Figure(data=go.Heatmap(
-                z=corr_matrix.values,
-                x=corr_matrix.columns,
-                y=corr_matrix.columns,
-                colorscale='RdBu',
-                zmid=0,
-                text=corr_matrix.values.round(2),
-                texttemplate='%{text}',
-                textfont={"size": 10}
-            ))
-            fig.update_layout(title="Correlation Matrix of Numeric Variables", height=500)
-            st.plotly_chart(fig, use_container_width=True)
+        st.markdown("### Categorical Association Heatmap")
+        if 'association' in figures:
+            st.plotly_chart(figures['association'], use_container_width=True)
+            st.caption("Cramér's V from a chi-square test on each pair of categorical columns: "
+                       "0 = independent, 1 = perfectly associated. Hover a cell for its p-value.")
         
         # Age vs Platelet Count
         st.markdown("### Age vs Platelet Count Scatter Plot")
-        fig = px.scatter(df, x='Age', y='Platelet Count( (/cumm)',
-                         color='Treatment_Outcome',
-                         title="Relationship between Age and Platelet Count",
-                         hover_data=['Cancer_Type(AML, ALL, CLL)', 'Treatment_Type(Chemotherapy, Radiation)'],
-                         color_discrete_map={'Cured': '#2ecc71', 'Ongoing': '#f39c12', 'Deceased': '#e74c3c'})
-        st.plotly_chart(fig, use_container_width=True)
+        st.plotly_chart(figures['age_platelet_scatter'], use_container_width=True)
 
 # ============================================================================
 # PAGE: CLINICAL INSIGHTS
 # ============================================================================
+def cohort_builder(label, df, key, default_index=0):
+    """Widgets defining one cohort; returns (name, conditions)"""
+    field = st.selectbox(f"{label} - Filter By", list(COHORT_FIELDS), key=f"{key}_field")
+    column = COHORT_FIELDS[field]
+    if column == 'Age':
+        ages = pd.to_numeric(df['Age'], errors='coerce').dropna()
+        low, high = (int(ages.min()), int(ages.max())) if len(ages) else (0, 100)
+        age_range = st.slider(f"{label} - Age Range", low, high, (low, high), key=f"{key}_age")
+        conditions = [('Age', 'between', [age_range[0], age_range[1]])]
+    else:
+        options = sorted(df[column].dropna().astype(str).unique())
+        values = st.multiselect(f"{label} - {field}", options, default=options[default_index:default_index + 1],
+                                key=f"{key}_values")
+        conditions = [(column, 'in', values)]
+    return describe_cohort([(field, op, value) for _, op, value in conditions]), conditions
+
+@st.fragment
+def show_cohort_comparison():
+    """Side-by-side comparison of two cohorts with significance tests; cohort edits rerun only this tab"""
+    start_fragment()
+    st.markdown("### Cohort Comparison")
+    if not st.session_state.app_state['data_loaded']:
+        st.info("ℹ️ Load the dataset on the Home page to compare patient cohorts.")
+        return
+    df, fingerprint = analysis_data()
+    row_mask, mask_key = analysis_mask()
+    sampled = approximate_active(fingerprint, mask_key)
+    if sampled:
+        # Approximate mode compares the cohorts within the dataset's stratified sample
+        positions = get_sample(df, fingerprint).positions
+        df = get_sample_frame(df, fingerprint)
+        row_mask = None if row_mask is None else row_mask[positions]
+        fingerprint = f"{fingerprint}:sample"
+    
+    preset = st.selectbox("Comparison", list(PRESETS) + ['Custom'], key='cohort_preset')
+    if preset == 'Custom':
+        col1, col2 = st.columns(2)
+        with col1:
+            name_a, cohort_a = cohort_builder("Cohort A", df, 'cohort_a')
+        with col2:
+            name_b, cohort_b = cohort_builder("Cohort B", df, 'cohort_b', default_index=1)
+    else:
+        (name_a, cohort_a), (name_b, cohort_b) = PRESETS[preset]
+    
+    result = get_cohort_comparison(df, fingerprint, cohort_a, cohort_b, name_a, name_b, row_mask, mask_key)
+    name_a, name_b = result['Cohort_A'], result['Cohort_B']
+    
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        st.metric(f"👥 {name_a}", f"{result['Rows_A']:,} patients")
+    with col2:
+        st.metric(f"👥 {name_b}", f"{result['Rows_B']:,} patients")
+    with col3:
+        st.metric("🔁 In Both Cohorts", f"{result['Overlap']:,}")
+    
+    if min(result['Rows_A'], result['Rows_B']) == 0:
+        st.warning("⚠️ One of the cohorts is empty; adjust its definition to compare.")
+        return
+    
+    metrics = result['Metrics'][result['Metrics']['Section'] != 'Distribution']
+    st.dataframe(
+        metrics, use_container_width=True, hide_index=True,
+        column_config={
+            name_a: st.column_config.NumberColumn(format="%.2f"),
+            name_b: st.column_config.NumberColumn(format="%.2f"),
+            'Difference': st.column_config.NumberColumn(f"Difference ({name_b} - {name_a})", format="%.2f"),
+            'Statistic': st.column_config.NumberColumn(format="%.3f"),
+            'P_Value': st.column_config.NumberColumn("p-value", format="%.4f")
+        }
+    )
+    st.caption(f"Rates use chi-square (Fisher's exact for small counts) and lab values the "
+               f"Mann-Whitney U test; p-values are unadjusted, significant below {SIGNIFICANCE_LEVEL}.")
+    if sampled:
+        st.caption(f"⚡ Approximate mode: cohorts are compared within the stratified sample of {len(df):,} "
+                   f"patients, so patient counts are sample counts. Turn approximate mode off for the full data.")
+    
+    cols = st.columns(len(result['Distributions']) or 1)
+    for col, (label, dist) in zip(cols, result['Distributions'].items()):
+        with col:
+            st.markdown(f"#### {label} (%)")
+            st.dataframe(dist['Table'].T.round(1), use_container_width=True)
+            st.caption(f"{dist['Test']}: p = {dist['P_Value']:.4f}")
+
+def feature_label(column):
+    """Short display name for a dataset column, e.g. 'Platelet Count( (/cumm)' -> 'Platelet Count'"""
+    return column.split('(')[0].strip().replace('_', ' ')
+
+@st.fragment
+def show_what_if(model, df):
+    """Per-patient what-if scoring; only this panel reruns when an input changes"""
+    if not fragment_data_ready(needs_cleaning=True):
+        return
+    st.markdown("#### What-If Patient")
+    patient = {}
+    cols = st.columns(3)
+    for i, (column, vocabulary) in enumerate(model['Categories'].items()):
+        with cols[i % 3]:
+            patient[column] = st.selectbox(feature_label(column), vocabulary, key=f"whatif_{column}")
+    cols = st.columns(len(NUMERIC_FEATURES))
+    for col, column in zip(cols, NUMERIC_FEATURES):
+        values = pd.to_numeric(df[column], errors='coerce').dropna()
+        low, high = (int(values.min()), int(values.max())) if len(values) else (0, 1)
+        with col:
+            patient[column] = st.slider(feature_label(column), low, high,
+                                        int(values.median()) if len(values) else low,
+                                        key=f"whatif_{column}")
+    
+    started = time.perf_counter()
+    probabilities = score_patient(model, patient)
+    elapsed_ms = (time.perf_counter() - started) * 1000
+    
+    cols = st.columns(len(probabilities))
+    for col, (outcome, probability) in zip(cols, probabilities.items()):
+        with col:
+            st.metric(f"P({outcome})", f"{probability * 100:.1f}%")
+    st.caption(f"⚡ Scored in {elapsed_ms:.1f} ms")
+
+def show_outcome_risk():
+    """Outcome risk model card, cohort batch scoring and the what-if panel"""
+    st.markdown("### Outcome Risk Model")
+    if cleaned_data() is None:
+        st.info("ℹ️ The risk model is trained on cleaned data. Run Data Cleaning first.")
+        return
+    df, fingerprint = analysis_data()
+    model = get_risk_model(df, fingerprint)
+    if model is None:
+        st.warning("⚠️ Not enough patients with a known outcome to train the model.")
+        return
+    
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        st.metric("🎯 Holdout Accuracy", f"{model['Holdout_Accuracy'] * 100:.1f}%",
+                  f"{(model['Holdout_Accuracy'] - model['Baseline_Accuracy']) * 100:+.1f} pts vs majority class")
+    with col2:
+        st.metric("📉 Holdout Log Loss", f"{model['Holdout_Log_Loss']:.3f}")
+    with col3:
+        st.metric("🧮 Training Rows", f"{model['Trained_Rows']:,}")
+    st.caption(f"Gradient-boosted trees on category codes plus Age, WBC and Platelet counts; "
+               f"trained in {model['Seconds']:.2f}s once per dataset and reused by every session.")
+    
+    show_cohort_risk_scoring(model)
+    
+    st.markdown("---")
+    show_what_if(model, df)
+
+@st.fragment
+def show_cohort_risk_scoring(model):
+    """Batch risk scoring of a preset cohort; picking a cohort reruns only this panel"""
+    if not fragment_data_ready(needs_cleaning=True):
+        return
+    df, fingerprint = analysis_data()
+    st.markdown("#### Cohort Risk Scoring")
+    cohorts = {'All patients': []}
+    for (name_a, cohort_a), (name_b, cohort_b) in PRESETS.values():
+        cohorts[name_a], cohorts[name_b] = cohort_a, cohort_b
+    cohort_name = st.selectbox("Cohort", list(cohorts), key='risk_cohort')
+    summary, scores = get_cohort_risk(df, fingerprint, cohort_name, cohorts[cohort_name], *analysis_mask())
+    if summary is None:
+        st.warning("⚠️ No patients in this cohort.")
+    else:
+        col1, col2 = st.columns([0.6, 0.4])
+        with col1:
+            fig = px.bar(summary.melt(id_vars='Outcome', var_name='Rate', value_name='Percent'),
+                         x='Outcome', y='Percent', color='Rate', barmode='group',
+                         title=f"Predicted vs Observed Outcomes - {cohort_name} ({len(scores):,} patients)")
+            st.plotly_chart(fig, use_container_width=True)
+        with col2:
+            st.dataframe(summary.round(1), use_container_width=True, hide_index=True)
+            if 'P(Deceased)' in scores:
+                st.markdown("**Highest predicted mortality risk**")
+                st.dataframe(scores.nlargest(10, 'P(Deceased)').round(3), use_container_width=True)
+
 def show_clinical_insights():
     st.markdown("## 🎯 Clinical Insights & Analysis")
     
-    if not st.session_state.app_state['data_loaded']:
+    view = analysis_view()
+    if view is None:
         st.warning("⚠️ Please load the dataset first from the Home page!")
         return
-    
-    df = st.session_state.app_state.get('df_cleaned', st.session_state.app_state['df'])
-    
-    tab1, tab2, tab3, tab4 = st.tabs([
-        "👨‍⚕️ Treatment Outcomes", "🔬 Diagnostic Data", "⚠️ Risk Analysis", "📊 Key Metrics"
+    show_view_source(view)
+    show_outlier_note()
+    aggregates, figures = view['aggregates'], view['figures']
+    summary = aggregates['summary'].iloc[0]
+    
+    tab1, tab2, tab3, tab4, tab5, tab6 = st.tabs([
+        "👨‍⚕️ Treatment Outcomes", "🔬 Diagnostic Data", "⚠️ Risk Analysis", "📊 Key Metrics",
+        "⚖️ Cohort Comparison", "🧮 Outcome Risk"
     ])
     
     with tab1:
         st.markdown("### Treatment Outcome Analysis by Cancer Type")
-        
-        outcome_by_cancer = pd.crosstab(
-            df['Cancer_Type(AML, ALL, CLL)'],
-            df['Treatment_Outcome'],
-            margins=True
-        )
-        st.dataframe(outcome_by_cancer, use_container_width=True)
+        st.dataframe(with_margins(aggregates, 'outcome_by_cancer'), use_container_width=True)
         
         # Success rate by cancer type
         st.markdown("### Treatment Success Rate by Cancer Type")
-        success_by_cancer = df.groupby('Cancer_Type(AML, ALL, CLL)').apply(
-            lambda x: (len(x[x['Treatment_Outcome'] == 'Cured']) / len(x) * 100)
-        ).sort_values(ascending=False)
-        
-        fig = px.bar(
-            x=success_by_cancer.index,
-            y=success_by_cancer.values,
-            title="Cure Rate by Cancer Type (%)",
-            labels={'x': 'Cancer Type', 'y': 'Cure Rate (%)'},
-            color=success_by_cancer.values,
-            color_continuous_scale='Greens'
-        )
-        st.plotly_chart(fig, use_container_width=True)
+        st.plotly_chart(figures['cure_rate_bar'], use_container_width=True)
         
         # Outcome by treatment type
         st.markdown("### Treatment Outcomes by Treatment Type")
-        outcome_by_treatment = pd.crosstab(
-            df['Treatment_Type(Chemotherapy, Radiation)'],
-            df['Treatment_Outcome']
-        )
-        fig = px.bar(outcome_by_treatment, barmode='group', title="Outcomes by Treatment Type",
-                     color_discrete_sequence=['#2ecc71', '#f39c12', '#e74c3c'])
-        st.plotly_chart(fig, use_container_width=True)
+        st.plotly_chart(figures['outcome_by_treatment'], use_container_width=True)
     
     with tab2:
         st.markdown("### Diagnostic Test Results Summary")
@@ -692,86 +1257,67 @@ def show_clinical_insights():
         col1, col2, col3 = st.columns(3)
         with col1:
             st.markdown("#### Bone Marrow Aspiration")
-            bma = df['Bone Marrow Aspiration(Positive / Negative / Not Done)'].value_counts()
-            st.bar_chart(bma)
+            st.bar_chart(aggregates['bma_counts'].set_index('Value')['Count'])
+            show_count_intervals(aggregates['bma_counts'])
         
         with col2:
             st.markdown("#### SPEP Results")
-            spep = df['Serum Protein Electrophoresis (SPEP)(Normal / Abnormal)'].value_counts()
-            st.bar_chart(spep)
+            st.bar_chart(aggregates['spep_counts'].set_index('Value')['Count'])
+            show_count_intervals(aggregates['spep_counts'])
         
         with col3:
             st.markdown("#### Lymph Node Biopsy")
-            lnb = df['Lymph Node Biopsy(Positive / Negative / Not Done)'].value_counts()
-            st.bar_chart(lnb)
+            st.bar_chart(aggregates['lnb_counts'].set_index('Value')['Count'])
+            show_count_intervals(aggregates['lnb_counts'])
         
         st.markdown("### Diagnosis Result Distribution")
-        diagnosis_dist = df['Diagnosis_Result'].value_counts()
-        colors = {'Confirmed': '#27ae60', 'Suspected': '#f39c12', 'Ruled Out': '#e74c3c'}
-        color_list = [colors.get(x, '#95a5a6') for x in diagnosis_dist.index]
-        fig = px.pie(values=diagnosis_dist.values, names=diagnosis_dist.index,
-                     title="Diagnosis Result Distribution",
-                     color_discrete_sequence=color_list)
-        st.plotly_chart(fig, use_container_width=True)
+        st.plotly_chart(figures['diagnosis_pie'], use_container_width=True)
     
     with tab3:
         st.markdown("### Risk Factors Analysis")
         
         st.markdown("#### Side Effects Distribution")
-        side_effects = df['Side_Effects'].value_counts()
-        colors_se = {'None': '#27ae60', 'Mild': '#3498db', 'Moderate': '#f39c12', 'Severe': '#e74c3c'}
-        color_list = [colors_se.get(x, '#95a5a6') for x in side_effects.index]
-        fig = px.bar(x=side_effects.index, y=side_effects.values,
-                     title="Distribution of Side Effects",
-                     labels={'x': 'Side Effect Severity', 'y': 'Number of Patients'},
-                     color=side_effects.values,
-                     color_discrete_sequence=color_list)
-        st.plotly_chart(fig, use_container_width=True)
+        st.plotly_chart(figures['side_effects_bar'], use_container_width=True)
         
         st.markdown("#### Side Effects by Treatment Type")
-        side_by_treatment = pd.crosstab(
-            df['Treatment_Type(Chemotherapy, Radiation)'],
-            df['Side_Effects']
-        )
-        fig = px.bar(side_by_treatment, barmode='stack', title="Side Effects Profile by Treatment")
-        st.plotly_chart(fig, use_container_width=True)
+        st.plotly_chart(figures['side_effects_profile'], use_container_width=True)
         
         # WBC count analysis
         st.markdown("#### White Blood Cell Count Analysis")
-        st.metric("Average WBC Count", f"{df['Total WBC count(/cumm)'].mean():,.0f} /cumm")
-        st.metric("Median WBC Count", f"{df['Total WBC count(/cumm)'].median():,.0f} /cumm")
-        
-        fig = px.box(df, y='Total WBC count(/cumm)', x='Treatment_Outcome',
-                     title="WBC Count Distribution by Treatment Outcome",
-                     color='Treatment_Outcome',
-                     color_discrete_map={'Cured': '#2ecc71', 'Ongoing': '#f39c12', 'Deceased': '#e74c3c'})
-        st.plotly_chart(fig, use_container_width=True)
+        st.metric("Average WBC Count", f"{summary['WBC_Mean']:,.0f}{margin_text(aggregates, 'WBC_Mean')} /cumm")
+        st.metric("Median WBC Count", f"{summary['WBC_Median']:,.0f}{margin_text(aggregates, 'WBC_Median')} /cumm")
+        st.plotly_chart(figures['wbc_box'], use_container_width=True)
     
     with tab4:
         st.markdown("### Key Performance Metrics")
         
         col1, col2, col3, col4 = st.columns(4)
+        total_patients = int(summary['Total_Patients'])
         
         with col1:
-            total_patients = len(df)
-            st.metric("📊 Total Patients", total_patients)
+            st.metric("📊 Total Patients", f"{total_patients}{margin_text(aggregates, 'Total_Patients')}")
         
         with col2:
-            cured = len(df[df['Treatment_Outcome'] == 'Cured'])
-            st.metric("✅ Cured Patients", cured, f"{(cured/total_patients*100):.1f}%")
+            cured = int(summary['Cured'])
+            st.metric("✅ Cured Patients", f"{cured}{margin_text(aggregates, 'Cured')}",
+                      f"{(cured/total_patients*100):.1f}%")
         
         with col3:
-            ongoing = len(df[df['Treatment_Outcome'] == 'Ongoing'])
-            st.metric("⏳ Ongoing Treatment", ongoing, f"{(ongoing/total_patients*100):.1f}%")
+            ongoing = int(summary['Ongoing'])
+            st.metric("⏳ Ongoing Treatment", f"{ongoing}{margin_text(aggregates, 'Ongoing')}",
+                      f"{(ongoing/total_patients*100):.1f}%")
         
         with col4:
-            deceased = len(df[df['Treatment_Outcome'] == 'Deceased'])
-            st.metric("⚠️ Deceased", deceased, f"{(deceased/total_patients*100):.1f}%")
+            deceased = int(summary['Deceased'])
+            st.metric("⚠️ Deceased", f"{deceased}{margin_text(aggregates, 'Deceased')}",
+                      f"{(deceased/total_patients*100):.1f}%")
         
         st.markdown("---")
         
         st.markdown("### Advanced Metrics Table")
         
+        confirmed = int(summary['Confirmed'])
+        severe = int(summary['Severe_Side_Effects'])
         metrics_data = {
             'Metric': [
                 'Average Age',
@@ -784,18 +1330,24 @@ def show_clinical_insights():
                 'Severe Side Effects'
             ],
             'Value': [
-                f"{df['Age'].mean():.1f} years",
-                f"{df['Age'].median():.1f} years",
-                f"{df['Total WBC count(/cumm)'].mean():,.0f} /cumm",
-                f"{df['Platelet Count( (/cumm)'].mean():,.0f} /cumm",
-                f"{df['Cancer_Type(AML, ALL, CLL)'].nunique()} types",
-                f"{df['Treatment_Type(Chemotherapy, Radiation)'].nunique()} types",
-                f"{len(df[df['Diagnosis_Result'] == 'Confirmed'])} ({len(df[df['Diagnosis_Result'] == 'Confirmed'])/len(df)*100:.1f}%)",
-                f"{len(df[df['Side_Effects'] == 'Severe'])} ({len(df[df['Side_Effects'] == 'Severe'])/len(df)*100:.1f}%)"
+                f"{summary['Age_Mean']:.1f}{margin_text(aggregates, 'Age_Mean', '{:.1f}')} years",
+                f"{summary['Age_Median']:.1f}{margin_text(aggregates, 'Age_Median', '{:.1f}')} years",
+                f"{summary['WBC_Mean']:,.0f}{margin_text(aggregates, 'WBC_Mean')} /cumm",
+                f"{summary['Platelet_Mean']:,.0f}{margin_text(aggregates, 'Platelet_Mean')} /cumm",
+                f"{int(summary['Cancer_Types'])} types",
+                f"{int(summary['Treatment_Types'])} types",
+                f"{confirmed}{margin_text(aggregates, 'Confirmed')} ({confirmed/total_patients*100:.1f}%)",
+                f"{severe}{margin_text(aggregates, 'Severe_Side_Effects')} ({severe/total_patients*100:.1f}%)"
             ]
         }
         
         st.dataframe(pd.DataFrame(metrics_data), use_container_width=True, hide_index=True)
+    
+    with tab5:
+        show_cohort_comparison()
+    
+    with tab6:
+        show_outcome_risk()
 
 # ============================================================================
 # PAGE: TUTORIAL & HELP
@@ -816,7 +1368,8 @@ def show_tutorial():
         The Home page is your entry point to the dashboard.
         
         **What to do:**
-        1. Click the "Load Dataset" button to import the blood cancer data
+        1. Click the "Load Dataset" button to import the blood cancer data,
+           or upload your own registry export (CSV) and click "Load Uploaded File"
         2. You'll see a green checkmark when data is loaded successfully
         3. The sidebar will show you basic dataset information
         
@@ -845,6 +1398,8 @@ def show_tutorial():
            - Column name and data type
            - Number of non-null and null values
            - Number of unique values in each column
+           - Min/max, most frequent values and values that failed numeric parsing
+           - Switch to "Sampled (fast)" profiling mode for very large files
         
         4. **Data Quality**: Assess data completeness
            - Visual representation of missing values
@@ -872,16 +1427,19 @@ def show_tutorial():
            - Categorical columns: Filled with mode (most common value)
            - Numeric columns: Filled with median (middle value)
            - Why median? It's not affected by extreme values
+           - Age, WBC and Platelet counts can instead be imputed with KNN or iterative
+             imputation, which keeps their distributions intact (slower on large files)
         
         3. **Standardize Categorical Data**
            - Removes extra spaces
-           - Ensures consistent text values
-           - Example: "AML " becomes "AML"
+           - Maps spelling variants to one canonical value
+           - Example: "AML " and "aml" become "AML"
         
         4. **Detect Outliers**
            - Uses IQR (Interquartile Range) method
            - Flags unusual but potentially valid values
            - Helps identify data entry errors
+           - Flagged patients can be left out of every chart with the 🚫 Exclude outliers toggle in the sidebar
         
         5. **Optimize Data Types**
            - Ensures numeric columns are recognized as numbers
@@ -890,7 +1448,8 @@ def show_tutorial():
         
         **How to Use:**
         - Click "Start Data Cleaning Process"
-        - Wait for the process to complete
+        - Cleaning runs in the background; progress is shown in the sidebar
+        - You can browse other pages while it runs
         - Review the cleaning report
         - Download the cleaned data if needed
         
@@ -909,6 +1468,7 @@ def show_tutorial():
         
         1. **Distribution** 🔍
            - Age histogram: Shows age distribution shape
+           - WBC and Platelet histograms, optionally stratified by category
            - Gender pie chart: Shows male/female ratio
            - Insights: Identify age groups and gender balance
         
@@ -930,6 +1490,7 @@ def show_tutorial():
         
         5. **Correlations** 🔗
            - Correlation heatmap of numeric variables
+           - Cramér's V association heatmap of categorical variables
            - Age vs Platelet Count scatter plot
            - Insights: Which variables are related?
         
@@ -943,13 +1504,19 @@ def show_tutorial():
         - Hover over data points to see exact values
         - Click legend items to show/hide data series
         - Use zoom buttons to focus on areas
+        
+        **⚡ Approximate Mode (large datasets):**
+        - Turns on automatically for datasets over 200,000 rows, or use the sidebar toggle
+        - Charts and metrics are estimated from a stratified sample per cancer type
+        - Error bars and ± values are 95% confidence intervals
+        - Click 🎯 Refine to exact to compute the full results in the background
         """)
     
     with st.expander("🎯 **Clinical Insights - Medical Analysis**"):
         st.markdown("""
         Deep dive into clinical outcomes and medical indicators.
         
-        **Four Analysis Sections:**
+        **Six Analysis Sections:**
         
         1. **Treatment Outcomes** 👨‍⚕️
            - Success rates by cancer type
@@ -975,6 +1542,16 @@ def show_tutorial():
            - Key performance indicators
            - Advanced metrics table
         
+        5. **Cohort Comparison** ⚖️
+           - Pick a preset (e.g. FLT3 vs BCR-ABL) or define two custom cohorts
+           - Outcome rates, lab values and distributions side by side
+           - p-values below 0.05 are marked as significant
+        
+        6. **Outcome Risk** 🧮 (after Data Cleaning)
+           - Model accuracy compared with always guessing the most common outcome
+           - Predicted vs observed outcome rates for a cohort
+           - What-if panel: change a patient's details and see the outcome probabilities
+        
         **What Each Metric Means:**
         - **WBC Count**: White blood cells (higher = stronger immune system)
         - **Platelet Count**: Blood clotting cells (lower = bleeding risk)
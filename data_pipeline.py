@@ -0,0 +1,272 @@
+"""
+Blood Cancer Dashboard - Data Pipeline
+Loading and cleaning functions shared by the dashboard and background jobs.
+This module has no Streamlit dependency so it can run off the script thread.
+"""
+
+import hashlib
+import time
+
+import pandas as pd
+
+import disk_cache
+from changeset import build_change_set
+from imputation import IMPUTATION_STRATEGIES, MEDIAN, impute_frame
+from ingest import read_clinical_csv, is_numeric_column, load_sources, TypedFrameCache
+from outliers import flag_outliers
+from vocabulary import canonicalize_frame, load_vocabulary, vocabulary_fingerprint
+
+# ============================================================================
+# DATA LOADING
+# ============================================================================
+def load_dataset(file_path, progress_callback=None):
+    """Load CSV data with error handling"""
+    try:
+        if progress_callback is not None:
+            progress_callback(0.0, "Reading CSV file")
+        df = read_clinical_csv(file_path)
+        return df, None
+    except Exception as e:
+        return None, f"Error loading data: {str(e)}"
+
+def load_fingerprinted(loader, *args, progress_callback=None, **kwargs):
+    """
+    Run a loader returning (df, load_report) and fingerprint the frame in the same call
+    Returns (df, load_report, fingerprint), fingerprint None when loading
+    failed. Background load jobs use it so the full-frame hash stays off
+    the script thread.
+    """
+    df, load_report = loader(*args, progress_callback=progress_callback, **kwargs)
+    return df, load_report, dataset_fingerprint(df) if df is not None else None
+
+# ============================================================================
+# DATA CLEANING
+# ============================================================================
+CLEANING_STEPS = [
+    "Removing duplicates",
+    "Handling missing values",
+    "Standardizing categorical values",
+    "Analyzing outliers",
+    "Optimizing data types"
+]
+
+def _report_progress(progress_callback, step, message=None):
+    """Forward cleaning progress (fraction complete, message) to an optional callback"""
+    if progress_callback is not None:
+        progress_callback(step / len(CLEANING_STEPS), message or CLEANING_STEPS[min(step, len(CLEANING_STEPS) - 1)])
+
+def analyze_missing_values(df):
+    """Analyze missing values in the dataset without modifying it"""
+    missing_counts = df.isnull().sum()
+    # Numeric columns that were never coerced count unparseable values as missing
+    for col in df.columns:
+        if is_numeric_column(col) and not pd.api.types.is_numeric_dtype(df[col]):
+            missing_counts[col] = pd.to_numeric(df[col], errors='coerce').isnull().sum()
+
+    missing_data = {
+        'Column': df.columns,
+        'Missing_Count': missing_counts.values,
+        'Missing_Percentage': (missing_counts.values / max(len(df), 1) * 100).round(2)
+    }
+    return pd.DataFrame(missing_data)
+
+def dataset_fingerprint(df):
+    """Content hash of a frame (values, columns and dtypes) used as a cache key"""
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(repr(list(zip(df.columns, df.dtypes.astype(str)))).encode())
+    digest.update(pd.util.hash_pandas_object(df, index=False).to_numpy().tobytes())
+    return digest.hexdigest()
+
+def clean_data(df, progress_callback=None, vocabulary=None, imputation=MEDIAN, fingerprint=None):
+    """
+    Comprehensive data cleaning function
+    Steps:
+    1. Remove duplicate rows
+    2. Handle missing values intelligently (median/mode, or KNN / iterative
+       imputation of Age, WBC and Platelet counts, see imputation.py)
+    3. Standardize categorical values (see vocabulary.py)
+    4. Flag outliers in numeric columns (see outliers.py)
+    5. Fix data types
+
+    progress_callback, if given, is called as callback(fraction, message)
+    before each step and once more when cleaning completes. fingerprint, if
+    given, caches the fitted imputer for the input dataset.
+    """
+    df_clean = df.copy()
+
+    cleaning_report = {
+        'Original_Rows': len(df),
+        'Actions': []
+    }
+
+    # Step 1: Remove duplicates
+    _report_progress(progress_callback, 0)
+    initial_rows = len(df_clean)
+    df_clean = df_clean.drop_duplicates()
+    duplicates_removed = initial_rows - len(df_clean)
+    if duplicates_removed > 0:
+        cleaning_report['Actions'].append(f"✓ Removed {duplicates_removed} duplicate rows")
+
+    # Step 2: Handle missing values
+    _report_progress(progress_callback, 1)
+    missing_report = analyze_missing_values(df_clean)
+
+    if imputation != MEDIAN:
+        # Model-based imputation of the lab values first; the rest falls back to median/mode
+        # Per-block imputation progress fills this step's share of the bar
+        def block_progress(fraction, message):
+            _report_progress(progress_callback, 1 + fraction, f"{CLEANING_STEPS[1]}: {message}")
+        imputation_report = impute_frame(df_clean, imputation, fingerprint, progress_callback=block_progress)
+        cleaning_report['Imputation'] = imputation_report
+        cleaning_report['Actions'].append(
+            f"✓ Imputed {sum(imputation_report['Imputed_Cells'].values()):,} Age/WBC/Platelet values "
+            f"with {IMPUTATION_STRATEGIES[imputation]} imputation "
+            f"({imputation_report['Blocks']} blocks on {imputation_report['Workers']} worker(s))"
+        )
+
+    for col in df_clean.columns:
+        if df_clean[col].isnull().sum() > 0:
+            if df_clean[col].dtype == 'object':
+                # For categorical columns, fill with mode or 'Unknown'
+                mode_val = df_clean[col].mode()
+                if len(mode_val) > 0:
+                    df_clean[col] = df_clean[col].fillna(mode_val[0])
+                else:
+                    df_clean[col] = df_clean[col].fillna('Unknown')
+            else:
+                # For numeric columns, fill with median
+                df_clean[col] = df_clean[col].fillna(df_clean[col].median())
+
+    if imputation == MEDIAN:
+        cleaning_report['Actions'].append("✓ Handled missing values using median/mode imputation")
+    else:
+        cleaning_report['Actions'].append("✓ Filled remaining missing values with median/mode")
+
+    # Step 3: Standardize categorical values
+    _report_progress(progress_callback, 2)
+    categorical_cols = df_clean.select_dtypes(include=['object']).columns
+    mappings = canonicalize_frame(df_clean, categorical_cols, vocabulary)
+    cleaning_report['Value_Mappings'] = mappings
+
+    cleaning_report['Actions'].append(f"✓ Standardized {len(categorical_cols)} categorical columns")
+    if mappings:
+        cleaning_report['Actions'].append(
+            f"✓ Canonicalized {len(mappings)} value spellings across "
+            f"{sum(m['Rows'] for m in mappings):,} cells"
+        )
+
+    # Step 4: Flag outliers in numeric columns (IQR method); rows are kept and
+    # the flags travel with the report so analyses can exclude them on demand
+    _report_progress(progress_callback, 3)
+    outlier_flags = flag_outliers(df_clean)
+    cleaning_report['Outlier_Flags'] = outlier_flags
+    outlier_counts = outlier_flags.counts()
+    cleaning_report['Actions'].append(
+        f"✓ Flagged {sum(outlier_counts.values()):,} outlier values across {len(outlier_counts)} "
+        f"numeric columns (kept; exclude them with the outlier toggle)"
+    )
+
+    # Step 5: Data type optimization
+    _report_progress(progress_callback, 4)
+    for col in df_clean.columns:
+        # Convert numeric columns
+        if col.lower() in ['age', 'wbc', 'platelet']:
+            df_clean[col] = pd.to_numeric(df_clean[col], errors='coerce')
+        # Convert any column with numbers in header
+        if 'WBC' in col or 'Platelet' in col or 'Age' in col:
+            df_clean[col] = pd.to_numeric(df_clean[col], errors='coerce')
+
+    cleaning_report['Actions'].append("✓ Optimized data types")
+    cleaning_report['Final_Rows'] = len(df_clean)
+    cleaning_report['Rows_Removed'] = len(df) - len(df_clean)
+    _report_progress(progress_callback, len(CLEANING_STEPS), "Cleaning complete")
+
+    return df_clean, cleaning_report, missing_report
+
+def clean_data_cached(df, fingerprint=None, progress_callback=None, imputation=MEDIAN):
+    """clean_data backed by the disk cache, keyed by the input's fingerprint, the vocabulary and imputation"""
+    vocabulary = load_vocabulary()
+    fingerprint = fingerprint or dataset_fingerprint(df)
+    key = ('clean', fingerprint, vocabulary_fingerprint(vocabulary), imputation)
+    result = disk_cache.get(key)
+    if result is not None:
+        _report_progress(progress_callback, len(CLEANING_STEPS), "Loaded cleaned data from cache")
+        return result
+    result = clean_data(df, progress_callback, vocabulary, imputation, fingerprint)
+    try:
+        disk_cache.put(key, result)
+    except OSError:
+        pass
+    return result
+
+# ============================================================================
+# CLEANED FRAMES / CHANGE SETS
+# ============================================================================
+# Materialized cleaned frames shared by all sessions, keyed by cleaned fingerprint
+CLEANED_CACHE = TypedFrameCache(max_entries=4)
+
+def clean_data_changes(df, fingerprint=None, progress_callback=None, imputation=MEDIAN):
+    """
+    clean_data_cached, returned as a sparse change set against the input frame
+    Sessions keep the raw frame plus the change set; the cleaned frame itself
+    lives in CLEANED_CACHE and is rebuilt on demand if it was evicted.
+    """
+    fingerprint = fingerprint or dataset_fingerprint(df)
+    df_cleaned, report, missing_report = clean_data_cached(df, fingerprint, progress_callback, imputation)
+    changes = build_change_set(df, df_cleaned, dataset_fingerprint(df_cleaned), fingerprint)
+    CLEANED_CACHE.put(changes.fingerprint, df_cleaned)
+    return changes, report, missing_report
+
+def materialize_cleaned(raw, changes, raw_fingerprint=None):
+    """
+    The cleaned frame for a change set, from the shared cache or rebuilt from the raw frame
+    Returns None when raw_fingerprint shows the change set was computed
+    against a different raw frame.
+    """
+    if raw_fingerprint is not None and changes.raw_fingerprint != raw_fingerprint:
+        return None
+    df_cleaned = CLEANED_CACHE.get(changes.fingerprint)
+    if df_cleaned is None:
+        df_cleaned = changes.materialize(raw)
+        CLEANED_CACHE.put(changes.fingerprint, df_cleaned)
+    return df_cleaned
+
+# ============================================================================
+# CACHE PRE-WARMING
+# ============================================================================
+def prewarm_caches(source, log=print):
+    """
+    Run load, clean, the default-view aggregations and the risk model once so
+    their results sit in the disk cache before the first user connects
+    Returns a summary dict, or None when the source could not be loaded.
+    """
+    from aggregations import cached_page_aggregates
+    from profiling import cached_profile, default_profile_mode
+    from risk_model import cached_risk_model
+
+    started = time.perf_counter()
+    df, load_report = load_sources(source)
+    if df is None:
+        log(f"   Could not load {source}: {'; '.join(load_report['Errors'])}")
+        return None
+    fingerprint = dataset_fingerprint(df)
+    log(f"   Loaded {len(df):,} rows ({load_report['Seconds']:.2f}s)")
+
+    cached_profile(df, fingerprint, default_profile_mode(len(df)))
+    df_cleaned, report, missing_report = clean_data_cached(df, fingerprint)
+    cleaned_fingerprint = dataset_fingerprint(df_cleaned)
+    log(f"   Cleaned data: {report['Final_Rows']:,} rows")
+
+    for frame, frame_fingerprint in [(df, fingerprint), (df_cleaned, cleaned_fingerprint)]:
+        cached_page_aggregates(frame, frame_fingerprint)
+    log("   Aggregates computed")
+
+    cached_risk_model(df_cleaned, cleaned_fingerprint)
+    log("   Outcome risk model ready")
+
+    return {
+        'Rows': len(df),
+        'Fingerprint': fingerprint,
+        'Cleaned_Fingerprint': cleaned_fingerprint,
+        'Seconds': round(time.perf_counter() - started, 3)
+    }
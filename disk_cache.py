@@ -0,0 +1,169 @@
+"""
+Blood Cancer Dashboard - Disk Cache
+A small on-disk key/value store for parsed frames, cleaning results and
+aggregates, so results computed by one process (for example the launcher's
+pre-warm step) are served hot by the Streamlit server and survive restarts.
+Only the standard library is used so the launcher can import it before
+dependencies exist.
+
+Callers key entries by data hash (the dataset fingerprint); every key is
+additionally versioned with CODE_VERSION, a hash of the modules that produce
+cached results, so a deploy with changed pipeline code never reads results
+of the old code. Superseded entries are never read again and age out through
+the size bound: once the store exceeds DASHBOARD_CACHE_MAX_MB, the least
+recently used entries are deleted.
+"""
+
+import hashlib
+import os
+import pickle
+import tempfile
+import threading
+
+CACHE_DIR = os.environ.get(
+    'DASHBOARD_CACHE_DIR',
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), '.dashboard_cache')
+)
+MAX_BYTES = int(float(os.environ.get('DASHBOARD_CACHE_MAX_MB', '2048')) * 1024 * 1024)
+
+# Bump when the on-disk entry layout changes
+CACHE_FORMAT = 2
+# Modules whose code determines cached values
+VERSIONED_MODULES = ['ingest.py', 'data_pipeline.py', 'vocabulary.py', 'changeset.py',
+                     'aggregations.py', 'profiling.py', 'risk_model.py', 'imputation.py',
+                     'validation.py', 'outliers.py']
+
+_MISSING = object()
+
+def code_version():
+    """Hash of the cache format and the source of the modules that produce cached values"""
+    digest = hashlib.blake2b(str(CACHE_FORMAT).encode(), digest_size=8)
+    base_dir = os.path.dirname(os.path.abspath(__file__))
+    for name in VERSIONED_MODULES:
+        try:
+            with open(os.path.join(base_dir, name), 'rb') as f:
+                digest.update(name.encode() + f.read())
+        except OSError:
+            continue
+    return digest.hexdigest()
+
+CODE_VERSION = os.environ.get('DASHBOARD_CACHE_VERSION') or code_version()
+
+_lock = threading.Lock()
+_counters = {'Hits': 0, 'Misses': 0, 'Writes': 0, 'Evictions': 0}
+_counters_by_kind = {}
+
+def _count(counter, key=None):
+    """Increment a process-wide counter (and the per-kind counter for the key's first element)"""
+    with _lock:
+        _counters[counter] += 1
+        if key:
+            kind = _counters_by_kind.setdefault(str(key[0]), {'Hits': 0, 'Misses': 0})
+            kind[counter] += 1
+
+def _entry_path(key):
+    """File holding the value for a key (keys are tuples of plain values)"""
+    digest = hashlib.sha256(repr((CODE_VERSION, key)).encode()).hexdigest()
+    return os.path.join(CACHE_DIR, f"{digest}.pkl")
+
+def get(key, default=None):
+    """Return the cached value for a key, or default on a miss or unreadable entry"""
+    path = _entry_path(key)
+    try:
+        with open(path, 'rb') as f:
+            value = pickle.load(f)
+    except (OSError, pickle.UnpicklingError, EOFError, AttributeError, ImportError):
+        _count('Misses', key)
+        return default
+    try:
+        # The modification time doubles as the last-used time for eviction
+        os.utime(path)
+    except OSError:
+        pass
+    _count('Hits', key)
+    return value
+
+def put(key, value):
+    """Store a value atomically (write to a temp file, then rename over the entry)"""
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=CACHE_DIR, suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            pickle.dump(value, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, _entry_path(key))
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    _count('Writes')
+    evict()
+
+def get_or_compute(key, compute):
+    """Return the cached value for a key, computing and storing it on a miss"""
+    value = get(key, _MISSING)
+    if value is _MISSING:
+        value = compute()
+        try:
+            put(key, value)
+        except OSError:
+            # A read-only or full disk only costs the cache, not the result
+            pass
+    return value
+
+def _entries():
+    """(mtime, size, path) for every stored entry"""
+    entries = []
+    try:
+        names = os.listdir(CACHE_DIR)
+    except OSError:
+        return entries
+    for name in names:
+        if not name.endswith('.pkl'):
+            continue
+        path = os.path.join(CACHE_DIR, name)
+        try:
+            stat = os.stat(path)
+        except OSError:
+            continue
+        entries.append((stat.st_mtime, stat.st_size, path))
+    return entries
+
+def evict(max_bytes=None):
+    """Delete least recently used entries until the store fits max_bytes; returns the number deleted"""
+    max_bytes = MAX_BYTES if max_bytes is None else max_bytes
+    entries = sorted(_entries())
+    total = sum(size for _, size, _ in entries)
+    deleted = 0
+    for _, size, path in entries:
+        if total <= max_bytes:
+            break
+        try:
+            os.remove(path)
+        except OSError:
+            continue
+        total -= size
+        deleted += 1
+    if deleted:
+        with _lock:
+            _counters['Evictions'] += deleted
+    return deleted
+
+def clear():
+    """Delete every stored entry"""
+    return evict(max_bytes=0)
+
+def stats():
+    """Hit/miss/write/eviction counters for this process plus the store's current size"""
+    entries = _entries()
+    with _lock:
+        report = dict(_counters)
+        report['By_Kind'] = {kind: dict(counts) for kind, counts in _counters_by_kind.items()}
+    lookups = report['Hits'] + report['Misses']
+    report.update({
+        'Hit_Rate': report['Hits'] / lookups if lookups else None,
+        'Entries': len(entries),
+        'Bytes': sum(size for _, size, _ in entries),
+        'Max_Bytes': MAX_BYTES,
+        'Code_Version': CODE_VERSION
+    })
+    return report
@@ -0,0 +1,208 @@
+"""
+Blood Cancer Dashboard - Figure Builders
+Plotly figures for the Analytics and Clinical Insights pages, built from the
+small aggregate frames produced by aggregations.compute_page_aggregates. The
+same builders serve the live dashboard and the offline snapshot job.
+"""
+
+import plotly.express as px
+import plotly.graph_objects as go
+
+from aggregations import HISTOGRAM_COLUMNS
+
+OUTCOME_COLORS = {'Cured': '#2ecc71', 'Ongoing': '#f39c12', 'Deceased': '#e74c3c'}
+DIAGNOSIS_COLORS = {'Confirmed': '#27ae60', 'Suspected': '#f39c12', 'Ruled Out': '#e74c3c'}
+SIDE_EFFECT_COLORS = {'None': '#27ae60', 'Mild': '#3498db', 'Moderate': '#f39c12', 'Severe': '#e74c3c'}
+
+HISTOGRAM_TITLES = {
+    'Age': ("Age Distribution of Patients", 'Age (years)'),
+    'Total WBC count(/cumm)': ("Total WBC Count Distribution", 'WBC Count (/cumm)'),
+    'Platelet Count( (/cumm)': ("Platelet Count Distribution", 'Platelet Count (/cumm)')
+}
+
+# ============================================================================
+# BUILDING BLOCKS
+# ============================================================================
+def error_bars(frame, value_col):
+    """Asymmetric error bars from the CI_Low / CI_High columns of approximate aggregates (else None)"""
+    if 'CI_Low' not in frame:
+        return None
+    return dict(type='data', symmetric=False,
+                array=(frame['CI_High'] - frame[value_col]).to_numpy(),
+                arrayminus=(frame[value_col] - frame['CI_Low']).to_numpy())
+
+def add_margin_bars(fig, margin):
+    """Error bars on a grouped bar chart built from a wide frame, from its '<name>_margin' frame"""
+    if margin is None:
+        return fig
+    for trace in fig.data:
+        if trace.name in margin.columns.astype(str):
+            column = margin.columns[list(margin.columns.astype(str)).index(trace.name)]
+            trace.error_y = dict(type='data', array=margin[column].to_numpy())
+    return fig
+
+def histogram_figure(hist, title, x_label):
+    """Build a histogram chart from precomputed bin counts"""
+    stratified = hist['Stratum'].nunique() > 1
+    hover_data = {'Bin_Start': ':,.0f', 'Bin_End': ':,.0f'}
+    if 'CI_Low' in hist:
+        hover_data.update({'CI_Low': ':,.0f', 'CI_High': ':,.0f'})
+    fig = px.bar(hist, x='Bin_Center', y='Count',
+                 color='Stratum' if stratified else None,
+                 title=title,
+                 labels={'Bin_Center': x_label, 'Count': 'Number of Patients'},
+                 hover_data=hover_data,
+                 color_discrete_sequence=None if stratified else ['#1f77b4'])
+    bin_width = (hist['Bin_End'] - hist['Bin_Start']).iloc[0] if len(hist) else 1
+    fig.update_traces(width=bin_width)
+    if not stratified and error_bars(hist, 'Count') is not None:
+        # Stacked strata would stack their intervals too, so only the unstratified view gets bars
+        fig.update_traces(error_y=error_bars(hist, 'Count'))
+    fig.update_layout(bargap=0, barmode='stack')
+    return fig
+
+def histogram_figures(aggregates, strata_label='None'):
+    """Histogram charts for every histogram column, for one stratification"""
+    histograms = aggregates['histograms']
+    figures = {}
+    for col in HISTOGRAM_COLUMNS:
+        hist = histograms[(histograms['Strata'] == strata_label) & (histograms['Column'] == col)]
+        if len(hist):
+            title, x_label = HISTOGRAM_TITLES[col]
+            figures[f"histogram:{col}"] = histogram_figure(hist, title, x_label)
+    return figures
+
+def counts_bar(counts, title, x_label, scale):
+    """Bar chart of category counts colored by count"""
+    fig = px.bar(x=counts['Value'], y=counts['Count'], title=title,
+                 labels={'x': x_label, 'y': 'Number of Patients'},
+                 color=counts['Count'], color_continuous_scale=scale)
+    if error_bars(counts, 'Count') is not None:
+        fig.update_traces(error_y=error_bars(counts, 'Count'))
+    return fig
+
+def counts_pie(counts, title, color_map=None, colors=None):
+    """Pie chart of category counts"""
+    if color_map is not None:
+        colors = [color_map.get(x, '#95a5a6') for x in counts['Value']]
+    fig = px.pie(values=counts['Count'], names=counts['Value'], title=title,
+                 color_discrete_sequence=colors)
+    if 'CI_Low' in counts:
+        fig.update_traces(customdata=counts[['CI_Low', 'CI_High']].to_numpy(),
+                          hovertemplate="%{label}: %{value:,.0f} (95% CI %{customdata[0][0]:,.0f}"
+                                        "-%{customdata[0][1]:,.0f})<extra></extra>")
+    return fig
+
+def box_figure(stats, title, y_label):
+    """Box plot per group from precomputed quartiles and fences"""
+    fig = go.Figure()
+    for _, row in stats.iterrows():
+        fig.add_trace(go.Box(
+            name=str(row['Group']), x=[str(row['Group'])],
+            q1=[row['Q1']], median=[row['Median']], q3=[row['Q3']],
+            lowerfence=[row['Lower_Fence']], upperfence=[row['Upper_Fence']],
+            mean=[row['Mean']],
+            marker_color=OUTCOME_COLORS.get(row['Group'], '#95a5a6')
+        ))
+    fig.update_layout(title=title, yaxis_title=y_label, xaxis_title='Treatment_Outcome')
+    return fig
+
+def correlation_figure(corr_matrix):
+    """Heatmap of a correlation matrix"""
+    fig = go.Figure(data=go.Heatmap(
+        z=corr_matrix.values,
+        x=corr_matrix.columns,
+        y=corr_matrix.columns,
+        colorscale='RdBu',
+        zmid=0,
+        text=corr_matrix.values.round(2),
+        texttemplate='%{text}',
+        textfont={"size": 10}
+    ))
+    fig.update_layout(title="Correlation Matrix of Numeric Variables", height=500)
+    return fig
+
+def association_figure(cramers_v, p_values):
+    """Heatmap of Cramér's V between categorical columns, with chi-square p-values on hover"""
+    # 'Cancer_Type(AML, ALL, CLL)' -> 'Cancer_Type'
+    labels = [col.split('(')[0].strip() for col in cramers_v.columns]
+    fig = go.Figure(data=go.Heatmap(
+        z=cramers_v.values,
+        x=labels,
+        y=labels,
+        customdata=p_values.values,
+        colorscale='Blues',
+        zmin=0,
+        zmax=1,
+        text=cramers_v.values.round(2),
+        texttemplate='%{text}',
+        textfont={"size": 10},
+        hovertemplate="%{y} × %{x}<br>Cramér's V: %{z:.3f}<br>p-value: %{customdata:.3g}<extra></extra>"
+    ))
+    fig.update_layout(title="Association Between Categorical Variables (Cramér's V)", height=600)
+    return fig
+
+# ============================================================================
+# PAGE FIGURES
+# ============================================================================
+def build_figures(aggregates):
+    """All default-view figures for the Analytics and Clinical Insights pages"""
+    figures = histogram_figures(aggregates)
+
+    figures['gender_pie'] = counts_pie(aggregates['gender_counts'], "Gender Distribution",
+                                       colors=['#FF6B9D', '#4A90E2'])
+    figures['cancer_bar'] = counts_bar(aggregates['cancer_counts'], "Number of Patients by Cancer Type",
+                                       'Cancer Type', 'Viridis')
+    figures['cancer_by_diagnosis'] = add_margin_bars(
+        px.bar(aggregates['cancer_by_diagnosis'], barmode='group', title="Cancer Type by Diagnosis Result",
+               labels={'value': 'Count', 'index': 'Cancer Type'}),
+        aggregates.get('cancer_by_diagnosis_margin'))
+    figures['treatment_bar'] = counts_bar(aggregates['treatment_counts'], "Number of Patients by Treatment Type",
+                                          'Treatment Type', 'Blues')
+    figures['outcome_pie'] = counts_pie(aggregates['outcome_counts'], "Treatment Outcomes Distribution",
+                                        color_map=OUTCOME_COLORS)
+    figures['genetic_bar'] = counts_bar(aggregates['genetic_counts'], "Genetic Markers in Patients",
+                                        'Genetic Marker', 'Greens')
+    figures['side_effects_by_treatment'] = px.bar(aggregates['side_effects_by_treatment'], barmode='stack',
+                                                  title="Side Effects by Treatment Type",
+                                                  labels={'value': 'Count'})
+    if len(aggregates['correlation']):
+        figures['correlation'] = correlation_figure(aggregates['correlation'])
+    if len(aggregates['association']) > 1:
+        figures['association'] = association_figure(aggregates['association'], aggregates['association_p'])
+    figures['age_platelet_scatter'] = px.scatter(
+        aggregates['scatter_sample'], x='Age', y='Platelet Count( (/cumm)',
+        color='Treatment_Outcome',
+        title="Relationship between Age and Platelet Count",
+        hover_data=['Cancer_Type(AML, ALL, CLL)', 'Treatment_Type(Chemotherapy, Radiation)'],
+        color_discrete_map=OUTCOME_COLORS
+    )
+
+    cure_rate = aggregates['cure_rate_by_cancer']
+    figures['cure_rate_bar'] = px.bar(x=cure_rate['Cancer Type'], y=cure_rate['Cure Rate'],
+                                      title="Cure Rate by Cancer Type (%)",
+                                      labels={'x': 'Cancer Type', 'y': 'Cure Rate (%)'},
+                                      color=cure_rate['Cure Rate'], color_continuous_scale='Greens')
+    if error_bars(cure_rate, 'Cure Rate') is not None:
+        figures['cure_rate_bar'].update_traces(error_y=error_bars(cure_rate, 'Cure Rate'))
+    figures['outcome_by_treatment'] = add_margin_bars(
+        px.bar(aggregates['outcome_by_treatment'], barmode='group', title="Outcomes by Treatment Type",
+               color_discrete_sequence=['#2ecc71', '#f39c12', '#e74c3c']),
+        aggregates.get('outcome_by_treatment_margin'))
+    figures['diagnosis_pie'] = counts_pie(aggregates['diagnosis_counts'], "Diagnosis Result Distribution",
+                                          color_map=DIAGNOSIS_COLORS)
+    side_effects = aggregates['side_effect_counts']
+    figures['side_effects_bar'] = px.bar(x=side_effects['Value'], y=side_effects['Count'],
+                                         title="Distribution of Side Effects",
+                                         labels={'x': 'Side Effect Severity', 'y': 'Number of Patients'},
+                                         color=side_effects['Count'],
+                                         color_discrete_sequence=[SIDE_EFFECT_COLORS.get(x, '#95a5a6')
+                                                                  for x in side_effects['Value']])
+    if error_bars(side_effects, 'Count') is not None:
+        figures['side_effects_bar'].update_traces(error_y=error_bars(side_effects, 'Count'))
+    figures['side_effects_profile'] = px.bar(aggregates['side_effects_by_treatment'], barmode='stack',
+                                             title="Side Effects Profile by Treatment")
+    figures['wbc_box'] = box_figure(aggregates['wbc_by_outcome'],
+                                    "WBC Count Distribution by Treatment Outcome",
+                                    'Total WBC count(/cumm)')
+    return figures
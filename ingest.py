@@ -0,0 +1,349 @@
+"""
+Blood Cancer Dashboard - Data Ingest
+CSV parsing and multi-source loading. A source can be a single file, a
+directory of per-hospital exports, a glob pattern or an uploaded file; files
+are parsed concurrently on a bounded worker pool, checked against the clinical
+schema and the validation rules (see validation.py), and kept in a
+process-wide typed cache shared by all sessions.
+"""
+
+import glob
+import hashlib
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import pandas as pd
+
+import disk_cache
+from validation import default_rules_fingerprint, merge_validation, validate_frame
+
+# ============================================================================
+# CLINICAL SCHEMA
+# ============================================================================
+CLINICAL_COLUMNS = [
+    'Age',
+    'Gender',
+    'Cancer_Type(AML, ALL, CLL)',
+    'Treatment_Type(Chemotherapy, Radiation)',
+    'Bone Marrow Aspiration(Positive / Negative / Not Done)',
+    'Total WBC count(/cumm)',
+    'Serum Protein Electrophoresis (SPEP)(Normal / Abnormal)',
+    'Lymph Node Biopsy(Positive / Negative / Not Done)',
+    'Lumbar Puncture (Spinal Tap)',
+    'Platelet Count( (/cumm)',
+    'Treatment_Outcome',
+    'Genetic_Data(BCR-ABL, FLT3)',
+    'Side_Effects',
+    'Diagnosis_Result',
+    'Comments'
+]
+
+DEFAULT_MAX_WORKERS = 4
+CHUNK_ROWS = 100_000
+DEFAULT_MAX_UPLOAD_BYTES = int(os.environ.get('DASHBOARD_MAX_UPLOAD_MB', '200')) * 1024 * 1024
+
+def is_numeric_column(col):
+    """Columns holding numeric lab values or age"""
+    return 'WBC' in col or 'Platelet' in col or 'Age' in col
+
+def coerce_numeric_columns(df, failed=None):
+    """
+    Convert numeric columns in place, turning unparseable values into NaN
+    The number of values lost per column is kept in df.attrs['coercion_failures']
+    so profiling can still report them after the raw strings are gone. If a
+    dict is passed as failed, the mask of lost values is stored per column.
+    """
+    failures = dict(df.attrs.get('coercion_failures', {}))
+    for col in df.columns:
+        if is_numeric_column(col) and not pd.api.types.is_numeric_dtype(df[col]):
+            converted = pd.to_numeric(df[col], errors='coerce')
+            lost = (converted.isna() & df[col].notna()).to_numpy()
+            failures[col] = failures.get(col, 0) + int(lost.sum())
+            if failed is not None:
+                failed[col] = lost
+            df[col] = converted
+    df.attrs['coercion_failures'] = failures
+    return df
+
+def coerce_and_validate(df):
+    """
+    coerce_numeric_columns plus the validation rules, evaluated on the same pass
+    Results are kept in df.attrs['validation'] (see validation.validate_frame).
+    """
+    failed = {}
+    coerce_numeric_columns(df, failed)
+    df.attrs['validation'] = validate_frame(df, failed=failed)
+    return df
+
+def combine_attrs(df, frames):
+    """Set the coercion and validation attrs of a frame concatenated from frames"""
+    offsets = [0]
+    for frame in frames[:-1]:
+        offsets.append(offsets[-1] + len(frame))
+    df.attrs['coercion_failures'] = merge_coercion_failures(frames)
+    df.attrs['validation'] = merge_validation([frame.attrs.get('validation') for frame in frames], offsets)
+    return df
+
+def merge_coercion_failures(frames):
+    """Sum the per-column coercion failure counts of several parsed frames"""
+    totals = {}
+    for frame in frames:
+        for col, count in frame.attrs.get('coercion_failures', {}).items():
+            totals[col] = totals.get(col, 0) + count
+    return totals
+
+def read_clinical_csv(source):
+    """Parse one CSV (path or file-like object), coerce its numeric columns and validate it"""
+    df = pd.read_csv(source)
+    return coerce_and_validate(df)
+
+def read_clinical_csv_chunked(source, chunksize=CHUNK_ROWS, progress_callback=None, total_bytes=None):
+    """
+    Parse a CSV chunk by chunk, coercing and validating each chunk as it arrives
+    Only one chunk of raw strings is alive at a time, and the chunks are
+    concatenated once at the end.
+    """
+    frames = []
+    for chunk in pd.read_csv(source, chunksize=chunksize):
+        frames.append(coerce_and_validate(chunk))
+        if progress_callback is not None and total_bytes and hasattr(source, 'tell'):
+            progress_callback(min(source.tell() / total_bytes, 1.0), f"Parsed {sum(len(f) for f in frames):,} rows")
+    if not frames:
+        return pd.DataFrame()
+    if len(frames) == 1:
+        return frames[0]
+    return combine_attrs(pd.concat(frames, ignore_index=True), frames)
+
+def check_schema(columns):
+    """Compare a file's header with the clinical columns"""
+    present = set(columns)
+    return {
+        'missing': [col for col in CLINICAL_COLUMNS if col not in present],
+        'extra': [col for col in columns if col not in CLINICAL_COLUMNS]
+    }
+
+# ============================================================================
+# SHARED TYPED CACHE
+# ============================================================================
+class TypedFrameCache:
+    """Small thread-safe LRU of parsed, typed frames shared across sessions"""
+
+    def __init__(self, max_entries=8):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            if key not in self._entries:
+                return None
+            self._entries.move_to_end(key)
+            return self._entries[key]
+
+    def put(self, key, df):
+        with self._lock:
+            self._entries[key] = df
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def evict_oldest(self):
+        """Drop the least recently used frame; False if the cache was empty"""
+        with self._lock:
+            if not self._entries:
+                return False
+            self._entries.popitem(last=False)
+            return True
+
+    def frames(self):
+        with self._lock:
+            return list(self._entries.values())
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+TYPED_CACHE = TypedFrameCache()
+
+def get_cached_frame(key):
+    """Look a parsed frame up in memory first, then in the disk cache"""
+    df = TYPED_CACHE.get(key)
+    if df is None:
+        df = disk_cache.get(('typed_frame', default_rules_fingerprint()) + key)
+        if df is not None:
+            TYPED_CACHE.put(key, df)
+    return df
+
+def store_cached_frame(key, df):
+    """Keep a parsed frame in memory and, best effort, on disk"""
+    TYPED_CACHE.put(key, df)
+    try:
+        disk_cache.put(('typed_frame', default_rules_fingerprint()) + key, df)
+    except OSError:
+        pass
+
+def file_cache_key(path):
+    """Cache key for a file on disk: its path plus size and modification time"""
+    stat = os.stat(path)
+    return ('file', os.path.abspath(path), stat.st_size, stat.st_mtime_ns)
+
+def content_cache_key(file_obj, block_size=1024 * 1024):
+    """Cache key for an uploaded buffer: a streaming hash of its bytes"""
+    digest = hashlib.blake2b(digest_size=16)
+    file_obj.seek(0)
+    for block in iter(lambda: file_obj.read(block_size), b''):
+        digest.update(block)
+    file_obj.seek(0)
+    return ('content', digest.hexdigest())
+
+# ============================================================================
+# MULTI-SOURCE LOADING
+# ============================================================================
+def resolve_sources(source):
+    """Expand a file path, directory or glob pattern into a sorted list of CSV files"""
+    if os.path.isdir(source):
+        return sorted(glob.glob(os.path.join(source, '*.csv')))
+    if os.path.isfile(source):
+        return [source]
+    return sorted(path for path in glob.glob(source) if os.path.isfile(path))
+
+def _read_source_file(path):
+    """Parse one file and validate its schema, returning (frame, file report)"""
+    started = time.perf_counter()
+    file_report = {'File': os.path.basename(path), 'Rows': 0, 'Seconds': 0.0,
+                   'Status': 'OK', 'Cached': False, 'Error': ''}
+    df = None
+    try:
+        key = file_cache_key(path)
+        df = get_cached_frame(key)
+        if df is not None:
+            file_report.update(Rows=len(df), Cached=True,
+                               Seconds=round(time.perf_counter() - started, 4))
+            return df, file_report
+        df = pd.read_csv(path)
+        schema = check_schema(df.columns)
+        if schema['missing']:
+            file_report['Status'] = 'Rejected'
+            file_report['Error'] = f"Missing columns: {', '.join(schema['missing'])}"
+            df = None
+        else:
+            if schema['extra']:
+                file_report['Error'] = f"Ignored extra columns: {', '.join(schema['extra'])}"
+            if list(df.columns) != CLINICAL_COLUMNS:
+                df = df.reindex(columns=CLINICAL_COLUMNS)
+            df = coerce_and_validate(df)
+            file_report['Rows'] = len(df)
+            store_cached_frame(key, df)
+    except Exception as e:
+        file_report['Status'] = 'Failed'
+        file_report['Error'] = str(e)
+        df = None
+    file_report['Seconds'] = round(time.perf_counter() - started, 4)
+    return df, file_report
+
+def load_sources(source, max_workers=DEFAULT_MAX_WORKERS, progress_callback=None):
+    """
+    Load and concatenate every CSV matched by a file path, directory or glob
+    Returns (df, load_report). df is None when no file could be loaded;
+    load_report lists per-file timings and errors, and the validation results
+    of the combined frame.
+    """
+    started = time.perf_counter()
+    paths = resolve_sources(source)
+    load_report = {'Source': source, 'Files': [], 'Errors': [], 'Validation': [],
+                   'Total_Rows': 0, 'Seconds': 0.0}
+    if not paths:
+        load_report['Errors'].append(f"No CSV files found for '{source}'")
+        return None, load_report
+
+    # Results are slotted by input order so the concatenation is deterministic
+    frames = [None] * len(paths)
+    file_reports = [None] * len(paths)
+    workers = max(1, min(max_workers, len(paths)))
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='ingest') as executor:
+        futures = {executor.submit(_read_source_file, path): i for i, path in enumerate(paths)}
+        for done, future in enumerate(as_completed(futures), start=1):
+            i = futures[future]
+            frames[i], file_reports[i] = future.result()
+            if progress_callback is not None:
+                progress_callback(done / len(paths), f"Parsed {done}/{len(paths)} files")
+
+    load_report['Files'] = file_reports
+    load_report['Errors'] = [f"{r['File']}: {r['Error']}" for r in file_reports if r['Status'] != 'OK']
+    frames = [frame for frame in frames if frame is not None]
+    if not frames:
+        load_report['Seconds'] = round(time.perf_counter() - started, 4)
+        return None, load_report
+
+    # A single concat at the end avoids repeated reallocation; a lone file is used as-is
+    if len(frames) == 1:
+        df = frames[0]
+    else:
+        df = combine_attrs(pd.concat(frames, ignore_index=True), frames)
+    del frames
+    load_report['Validation'] = df.attrs.get('validation', [])
+    load_report['Total_Rows'] = len(df)
+    load_report['Seconds'] = round(time.perf_counter() - started, 4)
+    return df, load_report
+
+# ============================================================================
+# UPLOADS
+# ============================================================================
+def load_upload(file_obj, name, max_bytes=DEFAULT_MAX_UPLOAD_BYTES, progress_callback=None):
+    """
+    Parse an uploaded CSV directly from its buffer through the typed cache
+    The bytes are hashed and parsed in blocks; no decoded copy of the raw file
+    is kept next to the frame. Returns (df, load_report) like load_sources.
+    """
+    started = time.perf_counter()
+    file_report = {'File': name, 'Rows': 0, 'Seconds': 0.0,
+                   'Status': 'OK', 'Cached': False, 'Error': ''}
+    load_report = {'Source': name, 'Files': [file_report], 'Errors': [], 'Validation': [],
+                   'Total_Rows': 0, 'Seconds': 0.0}
+
+    def finish(df):
+        file_report['Seconds'] = load_report['Seconds'] = round(time.perf_counter() - started, 4)
+        if file_report['Status'] != 'OK':
+            load_report['Errors'].append(f"{name}: {file_report['Error']}")
+        else:
+            load_report['Total_Rows'] = file_report['Rows'] = len(df)
+            load_report['Validation'] = df.attrs.get('validation', [])
+        return df, load_report
+
+    size = getattr(file_obj, 'size', None)
+    if size is None:
+        size = file_obj.seek(0, os.SEEK_END)
+    if max_bytes is not None and size > max_bytes:
+        file_report['Status'] = 'Rejected'
+        file_report['Error'] = (f"File is {size / 1024 / 1024:.1f} MB, "
+                                f"above the {max_bytes / 1024 / 1024:.0f} MB upload limit")
+        return finish(None)
+
+    try:
+        if progress_callback is not None:
+            progress_callback(0.0, "Hashing upload")
+        key = content_cache_key(file_obj)
+        df = get_cached_frame(key)
+        if df is not None:
+            file_report['Cached'] = True
+            return finish(df)
+
+        df = read_clinical_csv_chunked(file_obj, progress_callback=progress_callback, total_bytes=size)
+        schema = check_schema(df.columns)
+        if schema['missing']:
+            file_report['Status'] = 'Rejected'
+            file_report['Error'] = f"Missing columns: {', '.join(schema['missing'])}"
+            return finish(None)
+        if schema['extra']:
+            file_report['Error'] = f"Ignored extra columns: {', '.join(schema['extra'])}"
+        if list(df.columns) != CLINICAL_COLUMNS:
+            df = df.reindex(columns=CLINICAL_COLUMNS)
+        store_cached_frame(key, df)
+        return finish(df)
+    except Exception as e:
+        file_report['Status'] = 'Failed'
+        file_report['Error'] = str(e)
+        return finish(None)
@@ -0,0 +1,108 @@
+"""
+Blood Cancer Dashboard - Background Job Runner
+Runs long loading and cleaning operations on a worker thread pool so the
+Streamlit script thread never blocks. Jobs are identified by an ID that the
+page keeps in session state and polls for progress.
+"""
+
+import threading
+import time
+import traceback
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+# ============================================================================
+# JOB STATES
+# ============================================================================
+PENDING = 'pending'
+RUNNING = 'running'
+DONE = 'done'
+FAILED = 'failed'
+
+FINISHED_STATES = (DONE, FAILED)
+
+
+class JobManager:
+    """Thread pool with job IDs, per-job progress and result collection"""
+
+    def __init__(self, max_workers=2, finished_ttl=3600):
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='dashboard-job')
+        self._jobs = {}
+        self._lock = threading.Lock()
+        self.finished_ttl = finished_ttl
+
+    def submit(self, name, func, *args, **kwargs):
+        """
+        Run func(*args, progress_callback=..., **kwargs) in the background
+        Returns the job ID used to poll and collect the result.
+        """
+        job_id = uuid.uuid4().hex[:12]
+        job = {
+            'id': job_id,
+            'name': name,
+            'status': PENDING,
+            'progress': 0.0,
+            'message': 'Queued',
+            'result': None,
+            'error': None,
+            'submitted': time.time(),
+            'finished': None
+        }
+        with self._lock:
+            self._prune()
+            self._jobs[job_id] = job
+        self._executor.submit(self._run, job_id, func, args, kwargs)
+        return job_id
+
+    def _run(self, job_id, func, args, kwargs):
+        """Execute a job and record its outcome"""
+        self._update(job_id, status=RUNNING, message='Starting')
+
+        def progress_callback(fraction, message=None):
+            changes = {'progress': max(0.0, min(1.0, float(fraction)))}
+            if message:
+                changes['message'] = message
+            self._update(job_id, **changes)
+
+        try:
+            result = func(*args, progress_callback=progress_callback, **kwargs)
+            self._update(job_id, status=DONE, progress=1.0, message='Completed',
+                         result=result, finished=time.time())
+        except Exception as e:
+            self._update(job_id, status=FAILED, message='Failed',
+                         error=f"{e}\n{traceback.format_exc()}", finished=time.time())
+
+    def _update(self, job_id, **changes):
+        with self._lock:
+            if job_id in self._jobs:
+                self._jobs[job_id].update(changes)
+
+    def _prune(self):
+        """Forget finished jobs nobody collected within the TTL (caller holds the lock)"""
+        cutoff = time.time() - self.finished_ttl
+        stale = [job_id for job_id, job in self._jobs.items()
+                 if job['status'] in FINISHED_STATES and job['finished'] < cutoff]
+        for job_id in stale:
+            del self._jobs[job_id]
+
+    def status(self, job_id):
+        """Return a snapshot of the job without its result, or None if unknown"""
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None:
+                return None
+            return {key: value for key, value in job.items() if key != 'result'}
+
+    def collect(self, job_id):
+        """Remove a finished job from the registry and return it, or None if still running"""
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None or job['status'] not in FINISHED_STATES:
+                return None
+            return self._jobs.pop(job_id)
+
+    def active_jobs(self):
+        """Snapshots of all jobs that have not finished yet"""
+        with self._lock:
+            return [{key: value for key, value in job.items() if key != 'result'}
+                    for job in self._jobs.values() if job['status'] not in FINISHED_STATES]
@@ -0,0 +1,284 @@
+#!/usr/bin/env python3
+"""
+Blood Cancer Dashboard - Concurrent Session Load Test
+Drives N simulated browser sessions through the dashboard with Streamlit's
+AppTest, all inside this process, so they share the caches, job pool and
+memory budget exactly like sessions of one server. Each session follows the
+realistic flow: Load Dataset, Start Data Cleaning, then switches between the
+Analytics and Clinical Insights pages. No browser or running server is needed.
+
+AppTest swaps process-wide Streamlit state for the duration of a script run,
+so script runs are serialized; background load/clean jobs and the sessions'
+polling still overlap. Since script runs hold the GIL for most of their time,
+this stays close to a real server, and measured latencies include the time a
+session waits for others. A warm-up session runs first (unless --no-warmup)
+so the first load level does not carry import and cold-cache costs.
+
+For every session count the report lists latency percentiles per step,
+throughput (completed steps per second) and the peak RSS of the process.
+
+Usage:
+    python loadtest.py                          # 1, 2, 4 and 8 sessions
+    python loadtest.py --sessions 1 4 16 --rounds 5 --json loadtest.json
+"""
+
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+APP_FILE = str(Path(__file__).parent / "dashboard.py")
+DEFAULT_SESSIONS = [1, 2, 4, 8]
+DEFAULT_ROUNDS = 3
+DEFAULT_TIMEOUT = 300
+JOB_POLL_SECONDS = 0.2
+RSS_SAMPLE_SECONDS = 0.1
+PERCENTILES = [50, 90, 95, 99]
+
+# Serializes AppTest script runs (see module docstring)
+_SCRIPT_RUN_LOCK = threading.Lock()
+
+PAGE_CLEANING = "🔧 Data Cleaning"
+PAGE_ANALYTICS = "📈 Analytics"
+PAGE_INSIGHTS = "🎯 Clinical Insights"
+
+# ============================================================================
+# MEMORY
+# ============================================================================
+def current_rss():
+    """
+    Resident set size of this process in bytes (peak RSS where /proc is
+    unavailable), or None where neither is (Windows)
+    """
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, IndexError):
+        pass
+    try:
+        import resource
+    except ImportError:
+        return None
+    # ru_maxrss is in kilobytes on Linux and bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+def _higher(peak, rss):
+    """max() of two RSS readings, either of which may be None"""
+    readings = [value for value in (peak, rss) if value is not None]
+    return max(readings) if readings else None
+
+class RssSampler:
+    """Background thread recording the highest RSS seen while it runs"""
+
+    def __init__(self, interval=RSS_SAMPLE_SECONDS):
+        self.interval = interval
+        self.peak = current_rss()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self.peak = _higher(self.peak, current_rss())
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+        self.peak = _higher(self.peak, current_rss())
+
+# ============================================================================
+# SIMULATED SESSION
+# ============================================================================
+class SessionFailed(Exception):
+    pass
+
+class SimulatedSession:
+    """One browser session driven through AppTest, timing every step"""
+
+    def __init__(self, timeout=DEFAULT_TIMEOUT):
+        from streamlit.testing.v1 import AppTest
+        self.timeout = timeout
+        self.app = AppTest.from_file(APP_FILE, default_timeout=timeout)
+        self.timings = []
+
+    def _run(self, step):
+        with _SCRIPT_RUN_LOCK:
+            self.app.run()
+        if self.app.exception:
+            raise SessionFailed(f"{step}: {self.app.exception[0].message}")
+
+    def _wait_for_jobs(self, step):
+        """Rerun (like the page's job poller) until the session has no background job"""
+        deadline = time.monotonic() + self.timeout
+        while True:
+            state = self.app.session_state.app_state
+            if not (state.get('load_job') or state.get('clean_job')):
+                return
+            if time.monotonic() > deadline:
+                raise SessionFailed(f"{step}: background job timed out")
+            time.sleep(JOB_POLL_SECONDS)
+            self._run(step)
+
+    def _timed(self, step, action):
+        started = time.perf_counter()
+        action()
+        self.timings.append((step, time.perf_counter() - started))
+
+    def _open_page(self, page):
+        self.app.sidebar.radio[0].set_value(page)
+        self._run(page)
+
+    def _load_dataset(self):
+        self.app.button(key='load_btn').click()
+        self._run('Load Dataset')
+        self._wait_for_jobs('Load Dataset')
+        if not self.app.session_state.app_state['data_loaded']:
+            raise SessionFailed("Load Dataset: data was not loaded")
+
+    def _start_cleaning(self):
+        buttons = [b for b in self.app.button if 'Start Data Cleaning' in (b.label or '')]
+        if not buttons:
+            raise SessionFailed("Start Data Cleaning: button not found")
+        buttons[0].click()
+        self._run('Start Data Cleaning')
+        self._wait_for_jobs('Start Data Cleaning')
+        if not self.app.session_state.app_state['data_cleaned']:
+            raise SessionFailed("Start Data Cleaning: data was not cleaned")
+
+    def run_flow(self, rounds):
+        """Home -> Load Dataset -> Data Cleaning -> alternate Analytics / Clinical Insights"""
+        self._timed('Open Home', lambda: self._run('Open Home'))
+        self._timed('Load Dataset', self._load_dataset)
+        self._timed(PAGE_CLEANING, lambda: self._open_page(PAGE_CLEANING))
+        self._timed('Start Data Cleaning', self._start_cleaning)
+        for _ in range(rounds):
+            self._timed(PAGE_ANALYTICS, lambda: self._open_page(PAGE_ANALYTICS))
+            self._timed(PAGE_INSIGHTS, lambda: self._open_page(PAGE_INSIGHTS))
+        return self.timings
+
+# ============================================================================
+# LOAD LEVELS
+# ============================================================================
+def run_level(n_sessions, rounds=DEFAULT_ROUNDS, timeout=DEFAULT_TIMEOUT):
+    """
+    Run n_sessions concurrent sessions through the flow
+    Returns {'Sessions', 'Seconds', 'Steps', 'Throughput', 'Peak_RSS_Bytes',
+    'Failures', 'Timings'} where Timings is a frame of (Session, Step, Seconds).
+    """
+    results = [None] * n_sessions
+    failures = []
+    # Sessions are created up front: building an AppTest is not part of a user's latency
+    sessions = [SimulatedSession(timeout) for _ in range(n_sessions)]
+    start = threading.Barrier(n_sessions)
+
+    def worker(i):
+        start.wait()
+        try:
+            results[i] = sessions[i].run_flow(rounds)
+        except Exception as e:
+            failures.append(f"session {i}: {e}")
+            results[i] = sessions[i].timings
+
+    threads = [threading.Thread(target=worker, args=(i,), daemon=True) for i in range(n_sessions)]
+    with RssSampler() as sampler:
+        started = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - started
+
+    timings = pd.DataFrame(
+        [(i, step, seconds) for i, steps in enumerate(results) for step, seconds in steps or []],
+        columns=['Session', 'Step', 'Seconds']
+    )
+    return {
+        'Sessions': n_sessions,
+        'Seconds': elapsed,
+        'Steps': len(timings),
+        'Throughput': len(timings) / elapsed if elapsed else 0.0,
+        'Peak_RSS_Bytes': sampler.peak,
+        'Failures': failures,
+        'Timings': timings
+    }
+
+def latency_table(level):
+    """Latency percentiles (ms) per step for one load level"""
+    rows = []
+    for step, seconds in level['Timings'].groupby('Step', sort=False)['Seconds']:
+        values = seconds.to_numpy() * 1000
+        row = {'Sessions': level['Sessions'], 'Step': step, 'Count': len(values)}
+        row.update({f"P{p}_ms": float(np.percentile(values, p)) for p in PERCENTILES})
+        row['Max_ms'] = float(values.max())
+        rows.append(row)
+    return pd.DataFrame(rows)
+
+def summary_table(levels):
+    """One row per load level: wall time, throughput, peak RSS and failures"""
+    return pd.DataFrame([{
+        'Sessions': level['Sessions'],
+        'Seconds': round(level['Seconds'], 2),
+        'Steps': level['Steps'],
+        'Steps_per_s': round(level['Throughput'], 2),
+        'Peak_RSS_MB': (round(level['Peak_RSS_Bytes'] / 1024 / 1024, 1)
+                        if level['Peak_RSS_Bytes'] is not None else None),
+        'Failures': len(level['Failures'])
+    } for level in levels])
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Load test the dashboard with concurrent simulated sessions")
+    parser.add_argument("--sessions", type=int, nargs='+', default=DEFAULT_SESSIONS,
+                        help="session counts to run, one load level each")
+    parser.add_argument("--rounds", type=int, default=DEFAULT_ROUNDS,
+                        help="Analytics / Clinical Insights switches per session")
+    parser.add_argument("--timeout", type=float, default=DEFAULT_TIMEOUT, help="seconds allowed per step")
+    parser.add_argument("--no-warmup", action="store_true",
+                        help="include import and cold-cache costs in the first load level")
+    parser.add_argument("--json", help="also write the full report to this JSON file")
+    args = parser.parse_args(argv)
+
+    if not args.no_warmup:
+        print("🔥 Warming up with one session...")
+        warmup = run_level(1, rounds=1, timeout=args.timeout)
+        if warmup['Failures']:
+            print(f"❌ Warm-up failed: {warmup['Failures'][0]}")
+            return 1
+
+    levels = []
+    for n_sessions in args.sessions:
+        print(f"⏳ Running {n_sessions} concurrent session(s)...")
+        level = run_level(n_sessions, rounds=args.rounds, timeout=args.timeout)
+        for failure in level['Failures']:
+            print(f"❌ {failure}")
+        levels.append(level)
+
+    with pd.option_context('display.width', 200, 'display.max_columns', None, 'display.float_format', '{:,.1f}'.format):
+        print("\n📊 Latency per step (ms)")
+        print(pd.concat([latency_table(level) for level in levels], ignore_index=True).to_string(index=False))
+        print("\n🚀 Throughput and memory")
+        print(summary_table(levels).to_string(index=False))
+
+    if args.json:
+        report = {
+            'Summary': summary_table(levels).to_dict(orient='records'),
+            'Latency': pd.concat([latency_table(level) for level in levels],
+                                 ignore_index=True).to_dict(orient='records'),
+            'Failures': {level['Sessions']: level['Failures'] for level in levels}
+        }
+        with open(args.json, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"\n✅ Report written to {args.json}")
+    return 1 if any(level['Failures'] for level in levels) else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,174 @@
+"""
+Blood Cancer Dashboard - Memory Budget
+Process-wide accounting of the bytes held by each browser session (its loaded
+frame and cleaning change set) and by the shared in-memory frame caches. A
+global budget is enforced by releasing the data of idle sessions first, then
+shrinking the cache, then releasing the least recently active sessions.
+Released sessions keep their settings and simply have to reload their data.
+
+Releasing a session drops its data references right away, so the memory
+is actually freed even if the session never runs again (idle tabs). The
+rest of its state (loaded/cleaned flags, reports) is reset by the session
+itself at the start of its next run (apply_release), on its own script thread.
+"""
+
+import os
+import threading
+import time
+
+import pandas as pd
+
+DEFAULT_BUDGET_BYTES = int(float(os.environ.get('DASHBOARD_MEMORY_BUDGET_MB', '1024')) * 1024 * 1024)
+DEFAULT_IDLE_SECONDS = float(os.environ.get('DASHBOARD_SESSION_IDLE_MINUTES', '30')) * 60
+
+# App-state keys holding per-session data, and the state a session is reset to when released
+SESSION_DATA_KEYS = ['df', 'cleaning_changes']
+RELEASE_STATE = {
+    'df': None, 'df_fingerprint': None, 'cleaning_changes': None, 'df_cleaned_fingerprint': None,
+    'data_loaded': False, 'data_cleaned': False, 'cleaning_report': None, 'load_report': None
+}
+
+def estimate_bytes(value):
+    """Approximate in-memory size of a value (frames are measured deeply)"""
+    if isinstance(value, pd.DataFrame):
+        return int(value.memory_usage(deep=True).sum())
+    if isinstance(value, pd.Series):
+        return int(value.memory_usage(deep=True))
+    if isinstance(value, (str, bytes)):
+        return len(value)
+    # Numpy arrays and change sets report their own size
+    return int(getattr(value, 'nbytes', 0))
+
+def format_bytes(n):
+    """Human readable byte count, e.g. 12.3 MB"""
+    for unit in ('B', 'KB', 'MB'):
+        if abs(n) < 1024:
+            return f"{n:,.0f} {unit}" if unit == 'B' else f"{n:,.1f} {unit}"
+        n /= 1024
+    return f"{n:,.1f} GB"
+
+def apply_release(state):
+    """Drop a session's data if the budget asked for it; returns whether it did"""
+    reason = state.pop('release_requested', None)
+    if reason is None:
+        return False
+    state.update(RELEASE_STATE)
+    state['memory_released'] = reason
+    return True
+
+class MemoryBudget:
+    """
+    Registry of per-session and cache memory with LRU and idle-timeout eviction
+    Objects are measured once and remembered by identity, so a frame shared
+    by several sessions and the frame cache is only counted once.
+    """
+
+    def __init__(self, budget_bytes=DEFAULT_BUDGET_BYTES, idle_seconds=DEFAULT_IDLE_SECONDS):
+        self.budget_bytes = budget_bytes
+        self.idle_seconds = idle_seconds
+        self._sessions = {}
+        self._caches = {}
+        self._sizes = {}
+        self._evictions = 0
+        self._lock = threading.RLock()
+
+    def add_cache(self, name, objects_func, evict_func=None):
+        """
+        Include a shared cache: objects_func() lists the objects it holds and
+        evict_func(), if given, drops its least recently used entry (returning
+        False once empty)
+        """
+        with self._lock:
+            self._caches[name] = (objects_func, evict_func)
+
+    def _measure(self, value):
+        """Bytes for an object, measured on first sight (keeps a reference so ids stay unique)"""
+        if value is None:
+            return 0
+        entry = self._sizes.get(id(value))
+        if entry is None or entry[0] is not value:
+            entry = (value, estimate_bytes(value))
+            self._sizes[id(value)] = entry
+        return entry[1]
+
+    def _held(self):
+        """{name: [objects]} for every session and cache"""
+        held = {('session', sid): [s['state'].get(key) for key in SESSION_DATA_KEYS]
+                for sid, s in self._sessions.items()}
+        for name, (objects_func, _) in self._caches.items():
+            held[('cache', name)] = list(objects_func())
+        return held
+
+    def _totals(self):
+        """(total bytes with shared objects counted once, {holder: bytes})"""
+        held = self._held()
+        seen = {}
+        per_holder = {}
+        for holder, objects in held.items():
+            per_holder[holder] = 0
+            for obj in objects:
+                if obj is None:
+                    continue
+                nbytes = self._measure(obj)
+                per_holder[holder] += nbytes
+                seen[id(obj)] = nbytes
+        # Forget measurements of objects nobody holds any more
+        for obj_id in list(self._sizes):
+            if obj_id not in seen:
+                del self._sizes[obj_id]
+        return sum(seen.values()), per_holder
+
+    def touch(self, session_id, state):
+        """Record activity for a session and register its app state"""
+        with self._lock:
+            self._sessions[session_id] = {'state': state, 'last_seen': time.monotonic()}
+
+    def _release(self, session_id, reason):
+        """Drop a session's data references and forget it; its next run resets the rest"""
+        state = self._sessions.pop(session_id)['state']
+        if any(state.get(key) is not None for key in SESSION_DATA_KEYS):
+            state['release_requested'] = reason
+            for key in SESSION_DATA_KEYS:
+                state[key] = None
+            self._evictions += 1
+
+    def enforce(self, current_session=None):
+        """
+        Apply the idle timeout, then shrink caches and release the least
+        recently active sessions until usage fits the budget. The current
+        session is never released. Returns the released session ids.
+        """
+        released = []
+        with self._lock:
+            now = time.monotonic()
+            for session_id, session in list(self._sessions.items()):
+                if session_id != current_session and now - session['last_seen'] > self.idle_seconds:
+                    self._release(session_id, 'idle')
+                    released.append(session_id)
+
+            total, _ = self._totals()
+            for _, evict_func in self._caches.values():
+                while evict_func is not None and total > self.budget_bytes and evict_func():
+                    total, _ = self._totals()
+
+            by_age = sorted((s['last_seen'], sid) for sid, s in self._sessions.items() if sid != current_session)
+            for _, session_id in by_age:
+                if total <= self.budget_bytes:
+                    break
+                self._release(session_id, 'budget')
+                released.append(session_id)
+                total, _ = self._totals()
+        return released
+
+    def usage(self, session_id=None):
+        """Usage summary for the sidebar: totals, per-cache bytes and one session's bytes"""
+        with self._lock:
+            total, per_holder = self._totals()
+            return {
+                'Budget_Bytes': self.budget_bytes,
+                'Total_Bytes': total,
+                'Session_Bytes': per_holder.get(('session', session_id), 0),
+                'Sessions': len(self._sessions),
+                'Caches': {name: nbytes for (kind, name), nbytes in per_holder.items() if kind == 'cache'},
+                'Evictions': self._evictions
+            }
@@ -0,0 +1,87 @@
+"""
+Blood Cancer Dashboard - Outlier Flags
+IQR outlier flags for the lab and age columns, kept as a compact bitset (one
+bit per row and column) next to the dataset instead of a filtered copy. The
+numeric columns are stacked into one 2D array so quartiles, bounds and masks
+come from a single vectorized pass. Analyses exclude outliers by AND-ing
+keep_mask() into whatever row mask they already use.
+"""
+
+import numpy as np
+import pandas as pd
+
+import disk_cache
+from aggregations import PLATELET_COL, WBC_COL
+
+OUTLIER_COLUMNS = ['Age', WBC_COL, PLATELET_COL]
+IQR_MULTIPLIER = 1.5
+
+class OutlierFlags:
+    """Per-column outlier bitsets (packed along rows) with the IQR bounds that produced them"""
+
+    def __init__(self, n_rows, columns, bits, bounds):
+        self.n_rows = n_rows
+        self.columns = list(columns)
+        self.bits = bits
+        self.bounds = bounds
+
+    def column_mask(self, column):
+        """Boolean outlier mask for one column"""
+        k = self.columns.index(column)
+        return np.unpackbits(self.bits[:, k], count=self.n_rows).astype(bool)
+
+    def mask(self, columns=None):
+        """Rows that are an outlier in any of the given columns (all flagged columns by default)"""
+        selected = [self.columns.index(col) for col in (self.columns if columns is None else columns)
+                    if col in self.columns]
+        if not selected:
+            return np.zeros(self.n_rows, dtype=bool)
+        packed = np.bitwise_or.reduce(self.bits[:, selected], axis=1)
+        return np.unpackbits(packed, count=self.n_rows).astype(bool)
+
+    def keep_mask(self, columns=None):
+        """Rows to keep when outliers are excluded"""
+        return ~self.mask(columns)
+
+    def counts(self):
+        """{column: number of outlier rows}"""
+        return {col: int(np.unpackbits(self.bits[:, k], count=self.n_rows).sum())
+                for k, col in enumerate(self.columns)}
+
+    @property
+    def nbytes(self):
+        return self.bits.nbytes
+
+    def summary(self):
+        """Bounds and outlier counts per column, for display"""
+        summary = self.bounds.copy()
+        summary['Outliers'] = summary['Column'].map(self.counts())
+        summary['Outlier_Percentage'] = (summary['Outliers'] / max(self.n_rows, 1) * 100).round(2)
+        return summary
+
+def flag_outliers(df, columns=None, multiplier=IQR_MULTIPLIER):
+    """
+    Flag values outside [Q1 - k*IQR, Q3 + k*IQR] in the numeric columns
+    Values that are missing or not numbers are never outliers.
+    """
+    columns = [col for col in (OUTLIER_COLUMNS if columns is None else columns) if col in df.columns]
+    values = np.empty((len(df), len(columns)), dtype=float)
+    for k, col in enumerate(columns):
+        values[:, k] = pd.to_numeric(df[col], errors='coerce').to_numpy(dtype=float)
+
+    if len(df) and columns:
+        with np.errstate(invalid='ignore'):
+            q1, q3 = np.nanpercentile(values, [25, 75], axis=0)
+    else:
+        q1 = q3 = np.full(len(columns), np.nan)
+    iqr = q3 - q1
+    lower, upper = q1 - multiplier * iqr, q3 + multiplier * iqr
+    with np.errstate(invalid='ignore'):
+        outliers = (values < lower) | (values > upper)
+
+    bounds = pd.DataFrame({'Column': columns, 'Q1': q1, 'Q3': q3, 'Lower_Bound': lower, 'Upper_Bound': upper})
+    return OutlierFlags(len(df), columns, np.packbits(outliers, axis=0), bounds)
+
+def cached_outlier_flags(df, fingerprint):
+    """flag_outliers backed by the disk cache, keyed by dataset fingerprint"""
+    return disk_cache.get_or_compute(('outliers', fingerprint), lambda: flag_outliers(df))
@@ -0,0 +1,191 @@
+#!/usr/bin/env python3
+"""
+Blood Cancer Dashboard - Offline Snapshot Job
+Headless batch entry point that runs the whole pipeline (load -> clean ->
+page aggregates) and writes a versioned snapshot the dashboard can serve
+directly: aggregates as Parquet, figure specs as JSON, plus a manifest.
+
+Usage:
+    python precompute.py                                   # bundled dataset
+    python precompute.py --data exports/ --keep 14         # folder of per-hospital CSVs
+
+Snapshot layout:
+    snapshots/
+        LATEST                      (name of the newest complete snapshot)
+        20260101-020000-1a2b3c4d/
+            manifest.json
+            aggregates/<name>.parquet
+            figures/<name>.json
+"""
+
+import argparse
+import json
+import os
+import re
+import shutil
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+
+import pandas as pd
+import plotly.io as pio
+
+from aggregations import compute_page_aggregates
+from data_pipeline import clean_data, dataset_fingerprint
+from figures import build_figures
+from ingest import load_sources
+
+SNAPSHOT_FORMAT = 2
+SNAPSHOT_DIR = os.environ.get('DASHBOARD_SNAPSHOT_DIR', str(Path(__file__).parent / "snapshots"))
+DEFAULT_DATA_FILE = str(Path(__file__).parent / "Blood Cancer Diseases dataset  - Sheet1.csv")
+LATEST_POINTER = "LATEST"
+
+# ============================================================================
+# WRITING SNAPSHOTS
+# ============================================================================
+def _slug(name):
+    """File-system safe name for an aggregate or figure key"""
+    return re.sub(r'[^A-Za-z0-9_.-]+', '_', name).strip('_')
+
+def _write_atomic(path, text):
+    """Replace a small text file atomically"""
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+    with os.fdopen(fd, 'w') as f:
+        f.write(text)
+    os.replace(tmp_path, path)
+
+def write_snapshot(aggregates, figures, manifest, snapshot_dir=SNAPSHOT_DIR):
+    """
+    Write aggregates, figures and manifest into a new versioned directory
+    The directory is assembled under a temporary name and renamed into
+    place, and LATEST is only updated afterwards, so readers never see a
+    partial snapshot.
+    """
+    os.makedirs(snapshot_dir, exist_ok=True)
+    version = manifest['Version']
+    staging = tempfile.mkdtemp(dir=snapshot_dir, prefix=f".{version}-")
+    try:
+        os.makedirs(os.path.join(staging, 'aggregates'))
+        os.makedirs(os.path.join(staging, 'figures'))
+        manifest['Aggregates'] = {}
+        for name, frame in aggregates.items():
+            file_name = f"aggregates/{_slug(name)}.parquet"
+            frame.to_parquet(os.path.join(staging, file_name))
+            manifest['Aggregates'][name] = file_name
+        manifest['Figures'] = {}
+        for name, fig in figures.items():
+            file_name = f"figures/{_slug(name)}.json"
+            with open(os.path.join(staging, file_name), 'w') as f:
+                f.write(fig.to_json())
+            manifest['Figures'][name] = file_name
+        with open(os.path.join(staging, 'manifest.json'), 'w') as f:
+            json.dump(manifest, f, indent=2)
+        os.replace(staging, os.path.join(snapshot_dir, version))
+    except BaseException:
+        shutil.rmtree(staging, ignore_errors=True)
+        raise
+    _write_atomic(os.path.join(snapshot_dir, LATEST_POINTER), version + "\n")
+    return os.path.join(snapshot_dir, version)
+
+def prune_snapshots(snapshot_dir=SNAPSHOT_DIR, keep=7):
+    """Delete all but the newest `keep` snapshots (never the one LATEST points to)"""
+    latest = latest_snapshot_version(snapshot_dir)
+    versions = sorted(name for name in os.listdir(snapshot_dir)
+                      if not name.startswith('.') and os.path.isdir(os.path.join(snapshot_dir, name)))
+    for version in versions[:-keep] if keep > 0 else []:
+        if version != latest:
+            shutil.rmtree(os.path.join(snapshot_dir, version), ignore_errors=True)
+
+def build_snapshot(source=DEFAULT_DATA_FILE, snapshot_dir=SNAPSHOT_DIR, log=print):
+    """Run load -> clean -> aggregates -> figures and write a snapshot; returns the manifest"""
+    started = time.perf_counter()
+    df, load_report = load_sources(source)
+    if df is None:
+        raise RuntimeError(f"Could not load {source}: {'; '.join(load_report['Errors'])}")
+    log(f"   Loaded {len(df):,} rows from {len(load_report['Files'])} file(s)")
+
+    df_cleaned, cleaning_report, missing_report = clean_data(df)
+    fingerprint = dataset_fingerprint(df)
+    cleaned_fingerprint = dataset_fingerprint(df_cleaned)
+    log(f"   Cleaned data: {cleaning_report['Final_Rows']:,} rows")
+
+    aggregates = compute_page_aggregates(df_cleaned)
+    figures = build_figures(aggregates)
+    log(f"   Computed {len(aggregates)} aggregates and {len(figures)} figures")
+
+    created = datetime.now()
+    manifest = {
+        'Format': SNAPSHOT_FORMAT,
+        'Version': f"{created:%Y%m%d-%H%M%S}-{cleaned_fingerprint[:8]}",
+        'Created': created.isoformat(timespec='seconds'),
+        'Source': str(source),
+        'Files': [f['File'] for f in load_report['Files'] if f['Status'] == 'OK'],
+        'Rows': len(df),
+        'Cleaned_Rows': len(df_cleaned),
+        'Fingerprint': fingerprint,
+        'Cleaned_Fingerprint': cleaned_fingerprint,
+        'Cleaning_Actions': cleaning_report['Actions']
+    }
+    path = write_snapshot(aggregates, figures, manifest, snapshot_dir)
+    manifest['Seconds'] = round(time.perf_counter() - started, 3)
+    log(f"   Snapshot written to {path} ({manifest['Seconds']:.2f}s)")
+    return manifest
+
+# ============================================================================
+# READING SNAPSHOTS
+# ============================================================================
+def latest_snapshot_version(snapshot_dir=SNAPSHOT_DIR):
+    """Name of the newest complete snapshot, or None"""
+    try:
+        with open(os.path.join(snapshot_dir, LATEST_POINTER)) as f:
+            version = f.read().strip()
+    except OSError:
+        return None
+    return version if os.path.isdir(os.path.join(snapshot_dir, version)) else None
+
+def load_snapshot(version, snapshot_dir=SNAPSHOT_DIR):
+    """
+    Read a snapshot back into {'manifest', 'aggregates', 'figures'}
+    Returns None for unknown versions or snapshots written in another format.
+    """
+    path = os.path.join(snapshot_dir, version)
+    try:
+        with open(os.path.join(path, 'manifest.json')) as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if manifest.get('Format') != SNAPSHOT_FORMAT:
+        return None
+    aggregates = {name: pd.read_parquet(os.path.join(path, file_name))
+                  for name, file_name in manifest['Aggregates'].items()}
+    figures = {}
+    for name, file_name in manifest['Figures'].items():
+        with open(os.path.join(path, file_name)) as f:
+            figures[name] = pio.from_json(f.read())
+    return {'manifest': manifest, 'aggregates': aggregates, 'figures': figures}
+
+# ============================================================================
+# COMMAND LINE
+# ============================================================================
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Precompute a dashboard snapshot from the raw dataset")
+    parser.add_argument("--data", default=DEFAULT_DATA_FILE,
+                        help="dataset file, folder or glob pattern")
+    parser.add_argument("--out", default=SNAPSHOT_DIR, help="snapshot directory")
+    parser.add_argument("--keep", type=int, default=7, help="number of snapshots to keep")
+    args = parser.parse_args(argv)
+
+    print("🌙 Building dashboard snapshot...")
+    try:
+        manifest = build_snapshot(args.data, args.out)
+    except Exception as e:
+        print(f"❌ Snapshot failed: {e}")
+        return 1
+    prune_snapshots(args.out, keep=args.keep)
+    print(f"✅ Snapshot {manifest['Version']} is now the latest")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
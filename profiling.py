@@ -0,0 +1,157 @@
+"""
+Blood Cancer Dashboard - Data Quality Profiling
+Computes per-column null counts, distinct counts, min/max, top-k values and
+numeric coercion failures. Each column is factorized once and every statistic
+is derived from the codes. A sampled mode profiles a random subset of rows;
+low-cardinality columns are fully represented in the sample, and columns whose
+sample is mostly distinct get a HyperLogLog estimate over the full column.
+"""
+
+import numpy as np
+import pandas as pd
+
+import disk_cache
+from ingest import is_numeric_column
+
+EXACT = 'exact'
+SAMPLED = 'sampled'
+
+DEFAULT_SAMPLE_ROWS = 50_000
+SAMPLE_MODE_THRESHOLD = 200_000
+DEFAULT_TOP_K = 3
+HLL_PRECISION = 14
+HIGH_CARDINALITY_RATIO = 0.5
+
+# ============================================================================
+# HYPERLOGLOG
+# ============================================================================
+def _leading_zeros64(x):
+    """Vectorized count of leading zero bits in a uint64 array"""
+    x = x.copy()
+    zeros = np.zeros(x.shape, dtype=np.uint8)
+    for shift in (32, 16, 8, 4, 2, 1):
+        mask = x < (np.uint64(1) << np.uint64(64 - shift))
+        zeros[mask] += shift
+        x[mask] <<= np.uint64(shift)
+    return zeros
+
+def hll_distinct(series, precision=HLL_PRECISION):
+    """Estimate the number of distinct non-null values with HyperLogLog"""
+    values = series.dropna()
+    if len(values) == 0:
+        return 0
+    hashes = pd.util.hash_pandas_object(values, index=False).to_numpy()
+    m = 1 << precision
+    register_idx = (hashes >> np.uint64(64 - precision)).astype(np.int64)
+    # Remaining bits shifted to the top; the sentinel bit bounds the rank
+    remainder = (hashes << np.uint64(precision)) | (np.uint64(1) << np.uint64(precision - 1))
+    ranks = _leading_zeros64(remainder) + 1
+
+    registers = np.zeros(m, dtype=np.uint8)
+    np.maximum.at(registers, register_idx, ranks)
+
+    alpha = 0.7213 / (1 + 1.079 / m)
+    estimate = alpha * m * m / np.sum(np.ldexp(1.0, -registers.astype(np.int64)))
+    empty = int(np.count_nonzero(registers == 0))
+    if estimate <= 2.5 * m and empty > 0:
+        estimate = m * np.log(m / empty)
+    return int(round(estimate))
+
+# ============================================================================
+# COLUMN PROFILES
+# ============================================================================
+def _format_value(value):
+    if value is None or (isinstance(value, float) and np.isnan(value)):
+        return ''
+    if isinstance(value, (float, np.floating)):
+        return f"{value:,.6g}"
+    return str(value)
+
+def profile_column(series, top_k=DEFAULT_TOP_K, scale=1.0):
+    """Profile one column from a single factorization of its values"""
+    codes, uniques = pd.factorize(series, sort=False)
+    present = codes[codes >= 0]
+    null_count = len(codes) - len(present)
+    counts = np.bincount(present, minlength=len(uniques))
+
+    top_values = ''
+    if len(uniques):
+        k = min(top_k, len(uniques))
+        top_idx = np.argpartition(-counts, k - 1)[:k]
+        top_idx = top_idx[np.argsort(-counts[top_idx], kind='stable')]
+        top_values = ', '.join(f"{_format_value(uniques[i])} ({int(round(counts[i] * scale)):,})"
+                               for i in top_idx)
+
+    # min/max only need the distinct values, not the rows
+    min_val = max_val = None
+    if len(uniques):
+        if pd.api.types.is_numeric_dtype(series):
+            min_val, max_val = np.nanmin(uniques), np.nanmax(uniques)
+        else:
+            labels = sorted(str(u) for u in uniques)
+            min_val, max_val = labels[0], labels[-1]
+
+    non_null = len(present)
+    if not pd.api.types.is_numeric_dtype(series) and is_numeric_column(series.name):
+        failed = pd.to_numeric(pd.Series(uniques), errors='coerce').isna().to_numpy()
+        coercion_failures = int(counts[failed].sum())
+    else:
+        coercion_failures = None
+
+    return {
+        'Non-Null Count': int(round(non_null * scale)),
+        'Null Count': int(round(null_count * scale)),
+        'Unique Values': len(uniques),
+        'Min': _format_value(min_val),
+        'Max': _format_value(max_val),
+        'Top Values': top_values,
+        'Coercion Failures': coercion_failures
+    }
+
+def profile_dataset(df, mode=EXACT, sample_rows=DEFAULT_SAMPLE_ROWS, top_k=DEFAULT_TOP_K, seed=0):
+    """
+    Profile every column of a frame
+    mode='exact' profiles all rows. mode='sampled' profiles a random sample of
+    rows, scaling counts back to the full size; distinct counts of
+    high-cardinality columns come from HyperLogLog over the full column.
+    Returns a report dict whose 'Columns' entry is a DataFrame with one row
+    per column.
+    """
+    total_rows = len(df)
+    sampled = mode == SAMPLED and total_rows > sample_rows
+    frame = df.sample(n=sample_rows, random_state=seed) if sampled else df
+    scale = total_rows / len(frame) if sampled else 1.0
+    load_failures = df.attrs.get('coercion_failures', {})
+
+    rows = []
+    for col in df.columns:
+        stats = profile_column(frame[col], top_k=top_k, scale=scale)
+        if sampled and stats['Unique Values'] > HIGH_CARDINALITY_RATIO * len(frame):
+            stats['Unique Values'] = hll_distinct(df[col])
+        if stats['Coercion Failures'] is None:
+            stats['Coercion Failures'] = int(load_failures.get(col, 0))
+        elif sampled:
+            stats['Coercion Failures'] = int(round(stats['Coercion Failures'] * scale))
+        rows.append({'Column Name': col, 'Data Type': str(df[col].dtype), **stats})
+
+    columns = pd.DataFrame(rows)
+    columns['Null %'] = (columns['Null Count'] / max(total_rows, 1) * 100).round(2)
+    total_nulls = int(columns['Null Count'].sum())
+    return {
+        'Mode': SAMPLED if sampled else EXACT,
+        'Total_Rows': total_rows,
+        'Rows_Profiled': len(frame),
+        'Distinct_Method': 'sample + HyperLogLog' if sampled else 'exact',
+        'Total_Nulls': total_nulls,
+        'Completeness': (1 - total_nulls / max(total_rows * len(df.columns), 1)) * 100,
+        'Columns': columns
+    }
+
+def default_profile_mode(n_rows):
+    """Exact profiling for ordinary files, sampled for very large ones"""
+    return SAMPLED if n_rows > SAMPLE_MODE_THRESHOLD else EXACT
+
+def cached_profile(df, fingerprint, mode=EXACT):
+    """profile_dataset backed by the disk cache, keyed by dataset fingerprint"""
+    return disk_cache.get_or_compute(('profile', fingerprint, mode),
+                                     lambda: profile_dataset(df, mode=mode))
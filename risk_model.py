@@ -0,0 +1,167 @@
+"""
+Blood Cancer Dashboard - Outcome Risk Model
+A Treatment_Outcome classifier trained on the cleaned dataset. Categorical
+columns are fed as integer category codes (HistGradientBoosting handles them
+natively) alongside Age, WBC and Platelet counts. Fitted models are persisted
+in the disk cache keyed by dataset fingerprint, so every session and every
+server restart reuses the same model instead of retraining.
+"""
+
+import time
+
+import numpy as np
+import pandas as pd
+import sklearn
+from sklearn.ensemble import HistGradientBoostingClassifier
+from sklearn.metrics import accuracy_score, log_loss
+from sklearn.model_selection import train_test_split
+
+import disk_cache
+from aggregations import (BMA_COL, CANCER_COL, DIAGNOSIS_COL, GENETIC_COL, LNB_COL, OUTCOME_COL,
+                          PLATELET_COL, SPEP_COL, TREATMENT_COL, WBC_COL)
+
+MODEL_VERSION = 1
+LUMBAR_COL = 'Lumbar Puncture (Spinal Tap)'
+
+# Known before or at the start of treatment (side effects and comments are not)
+CATEGORICAL_FEATURES = ['Gender', CANCER_COL, TREATMENT_COL, GENETIC_COL, BMA_COL, SPEP_COL,
+                        LNB_COL, LUMBAR_COL, DIAGNOSIS_COL]
+NUMERIC_FEATURES = ['Age', WBC_COL, PLATELET_COL]
+OUTCOMES = ['Cured', 'Ongoing', 'Deceased']
+
+HOLDOUT_FRACTION = 0.2
+MIN_TRAINING_ROWS = 50
+# Larger datasets are subsampled; more rows barely move a 12-feature model
+MAX_TRAINING_ROWS = 200_000
+RANDOM_STATE = 0
+# HistGradientBoosting bins category codes, so vocabularies must stay below max_bins
+MAX_CATEGORIES = 250
+
+# ============================================================================
+# FEATURES
+# ============================================================================
+def fit_categories(df):
+    """Category vocabulary per categorical feature, in a stable (sorted) order"""
+    categories = {}
+    for col in CATEGORICAL_FEATURES:
+        if col in df.columns:
+            vocabulary = sorted(df[col].dropna().astype(str).unique())
+            if len(vocabulary) <= MAX_CATEGORIES:
+                categories[col] = vocabulary
+    return categories
+
+def encode_features(df, categories):
+    """
+    Feature matrix for a frame: category codes for categorical columns
+    (unknown or missing values become NaN) and floats for numeric columns
+    """
+    columns = {}
+    for col, vocabulary in categories.items():
+        if col in df.columns:
+            values = df[col].astype(str).where(df[col].notna())
+        else:
+            values = pd.Series(np.nan, index=df.index, dtype=object)
+        codes = pd.Categorical(values, categories=vocabulary).codes.astype(float)
+        codes[codes < 0] = np.nan
+        columns[col] = codes
+    for col in NUMERIC_FEATURES:
+        columns[col] = (pd.to_numeric(df[col], errors='coerce').to_numpy(dtype=float)
+                        if col in df.columns else np.full(len(df), np.nan))
+    return pd.DataFrame(columns, index=df.index)
+
+def _new_classifier(n_categorical):
+    return HistGradientBoostingClassifier(
+        categorical_features=list(range(n_categorical)),
+        max_iter=100, learning_rate=0.1, max_leaf_nodes=15, early_stopping=True,
+        random_state=RANDOM_STATE
+    )
+
+# ============================================================================
+# TRAINING
+# ============================================================================
+def train_risk_model(df, progress_callback=None):
+    """
+    Train the outcome model on a cleaned frame
+    The model is fit on a stratified split and accuracy / log loss are
+    reported on the held-out rows. Returns a model dict, or None when there
+    are too few labelled rows.
+    """
+    started = time.perf_counter()
+    labelled = df[df[OUTCOME_COL].isin(OUTCOMES)]
+    if len(labelled) < MIN_TRAINING_ROWS or labelled[OUTCOME_COL].nunique() < 2:
+        return None
+    if len(labelled) > MAX_TRAINING_ROWS:
+        labelled = labelled.sample(n=MAX_TRAINING_ROWS, random_state=RANDOM_STATE)
+
+    if progress_callback is not None:
+        progress_callback(0.1, "Encoding features")
+    categories = fit_categories(labelled)
+    X = encode_features(labelled, categories).to_numpy()
+    y = labelled[OUTCOME_COL].to_numpy()
+    X_train, X_test, y_train, y_test = train_test_split(
+        X, y, test_size=HOLDOUT_FRACTION, stratify=y, random_state=RANDOM_STATE)
+
+    if progress_callback is not None:
+        progress_callback(0.3, "Fitting model")
+    classifier = _new_classifier(len(categories)).fit(X_train, y_train)
+    probabilities = classifier.predict_proba(X_test)
+
+    return {
+        'Model': classifier,
+        'Categories': categories,
+        'Classes': list(classifier.classes_),
+        'Trained_Rows': len(X_train),
+        'Holdout_Accuracy': float(accuracy_score(y_test, classifier.classes_[probabilities.argmax(axis=1)])),
+        'Holdout_Log_Loss': float(log_loss(y_test, probabilities, labels=classifier.classes_)),
+        'Baseline_Accuracy': float(pd.Series(y_train).value_counts(normalize=True).max()),
+        'Seconds': round(time.perf_counter() - started, 3)
+    }
+
+def cached_risk_model(df, fingerprint, progress_callback=None):
+    """train_risk_model backed by the disk cache, keyed by dataset fingerprint and library version"""
+    key = ('risk_model', fingerprint, MODEL_VERSION, sklearn.__version__)
+    return disk_cache.get_or_compute(key, lambda: train_risk_model(df, progress_callback))
+
+# ============================================================================
+# SCORING
+# ============================================================================
+def score_patients(model, df):
+    """
+    Vectorized scoring of a whole cohort
+    Returns one row per patient with a probability column per outcome
+    (P(Cured), ...) and the most likely outcome.
+    """
+    probabilities = model['Model'].predict_proba(encode_features(df, model['Categories']).to_numpy())
+    scores = pd.DataFrame(probabilities, index=df.index,
+                          columns=[f"P({outcome})" for outcome in model['Classes']])
+    scores['Predicted_Outcome'] = np.asarray(model['Classes'], dtype=object)[probabilities.argmax(axis=1)]
+    return scores
+
+def cohort_risk_summary(model, df, scores=None):
+    """
+    Mean predicted probability next to the observed rate for each outcome
+    scores optionally passes score_patients(model, df) when the caller already has it.
+    """
+    scores = score_patients(model, df) if scores is None else scores
+    observed = df[OUTCOME_COL].value_counts(normalize=True)
+    return pd.DataFrame({
+        'Outcome': model['Classes'],
+        'Predicted (%)': [scores[f"P({outcome})"].mean() * 100 for outcome in model['Classes']],
+        'Observed (%)': [observed.get(outcome, 0.0) * 100 for outcome in model['Classes']]
+    })
+
+def score_patient(model, patient):
+    """
+    Outcome probabilities for a single patient given as {column: value}
+    Encodes the row directly with NumPy (no DataFrame), keeping what-if
+    scoring in the low milliseconds.
+    """
+    row = []
+    for col, vocabulary in model['Categories'].items():
+        value = patient.get(col)
+        row.append(vocabulary.index(str(value)) if value is not None and str(value) in vocabulary else np.nan)
+    for col in NUMERIC_FEATURES:
+        value = pd.to_numeric(patient.get(col), errors='coerce')
+        row.append(np.nan if value is None else float(value))
+    probabilities = model['Model'].predict_proba(np.array([row], dtype=float))[0]
+    return dict(zip(model['Classes'], probabilities.tolist()))
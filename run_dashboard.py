@@ -2,13 +2,29 @@
 """
 Blood Cancer Dashboard - Setup & Launch Script
 Installs dependencies and runs the Streamlit dashboard
+
+Usage:
+    python run_dashboard.py            # install requirements, pre-warm caches, launch
+    python run_dashboard.py --fast     # skip pip when installed versions already satisfy requirements.txt
+                                       # (no check at all while requirements.lock still matches)
+    python run_dashboard.py --fast --no-prewarm
 """
 
+import argparse
+import hashlib
+import re
 import subprocess
 import sys
+import sysconfig
 import os
+from importlib import metadata
 from pathlib import Path
 
+from disk_cache import CACHE_DIR
+
+LOCK_FILE = Path(CACHE_DIR) / "requirements.lock"
+DEFAULT_DATA_FILE = Path(__file__).parent / "Blood Cancer Diseases dataset  - Sheet1.csv"
+
 def print_header():
     """Print welcome header"""
     print("\n" + "="*78)
@@ -24,10 +40,92 @@ def check_python_version():
         sys.exit(1)
     print(f"✅ Python version {version.major}.{version.minor}.{version.micro} detected")
 
-def install_requirements():
-    """Install required packages"""
-    print("\n📦 Installing required libraries...")
-    print("   (This may take 2-3 minutes on first run)\n")
+def _version_tuple(version):
+    """Numeric release segment of a version string, e.g. '1.26.4rc1' -> (1, 26, 4)"""
+    parts = []
+    for piece in version.split('.'):
+        match = re.match(r'\d+', piece)
+        if not match:
+            break
+        parts.append(int(match.group()))
+    return tuple(parts)
+
+def _compare_versions(installed, required):
+    """Compare two version strings by their numeric segments (-1, 0 or 1)"""
+    a, b = _version_tuple(installed), _version_tuple(required)
+    width = max(len(a), len(b))
+    a, b = a + (0,) * (width - len(a)), b + (0,) * (width - len(b))
+    return (a > b) - (a < b)
+
+def unsatisfied_requirements(requirements_file):
+    """
+    Check requirements.txt against installed package metadata
+    Returns a list of human-readable problems; an empty list means everything
+    is installed. Unsupported specifiers are reported so pip gets to decide.
+    """
+    checks = {
+        '>=': lambda c: c >= 0, '==': lambda c: c == 0, '>': lambda c: c > 0,
+        '<=': lambda c: c <= 0, '<': lambda c: c < 0, '!=': lambda c: c != 0
+    }
+    problems = []
+    for line in requirements_file.read_text().splitlines():
+        line = line.split('#', 1)[0].strip()
+        if not line:
+            continue
+        match = re.fullmatch(r'([A-Za-z0-9_.\-]+)\s*(?:(>=|==|<=|!=|>|<)\s*([\w.]+))?', line)
+        if not match:
+            problems.append(f"{line}: unsupported requirement format")
+            continue
+        name, op, required = match.groups()
+        try:
+            installed = metadata.version(name)
+        except metadata.PackageNotFoundError:
+            problems.append(f"{name}: not installed")
+            continue
+        if op and not checks[op](_compare_versions(installed, required)):
+            problems.append(f"{name}: {installed} installed, {op}{required} required")
+    return problems
+
+def requirements_hash(requirements_file):
+    """
+    Hash of requirements.txt, the interpreter and its package directories,
+    recorded after a successful check
+    The directories' modification times change whenever pip adds or removes
+    a package, so a later install or uninstall invalidates the lock.
+    """
+    digest = hashlib.sha256(requirements_file.read_bytes())
+    digest.update(sys.executable.encode())
+    digest.update(sys.version.encode())
+    for name in ('purelib', 'platlib'):
+        path = sysconfig.get_paths()[name]
+        try:
+            digest.update(f"{path}:{os.stat(path).st_mtime_ns}".encode())
+        except OSError:
+            digest.update(path.encode())
+    return digest.hexdigest()
+
+def write_lock(requirements_file):
+    """Record that the current environment satisfies requirements.txt"""
+    try:
+        LOCK_FILE.parent.mkdir(parents=True, exist_ok=True)
+        LOCK_FILE.write_text(requirements_hash(requirements_file) + "\n")
+    except OSError:
+        pass
+
+def lock_matches(requirements_file):
+    """Whether the recorded lock hash matches requirements.txt and this interpreter"""
+    try:
+        return LOCK_FILE.read_text().strip() == requirements_hash(requirements_file)
+    except OSError:
+        return False
+
+def install_requirements(fast=False):
+    """Install required packages (in fast mode, only when something is missing)"""
+    if fast:
+        print("\n📦 Checking installed libraries against requirements.txt...")
+    else:
+        print("\n📦 Installing required libraries...")
+        print("   (This may take 2-3 minutes on first run)\n")
     
     requirements_file = Path(__file__).parent / "requirements.txt"
     
@@ -35,14 +133,29 @@ def install_requirements():
         print(f"❌ requirements.txt not found at {requirements_file}")
         sys.exit(1)
     
+    if fast:
+        if lock_matches(requirements_file):
+            print("✅ requirements.txt and installed packages unchanged since the last check - skipping pip\n")
+            return True
+        problems = unsatisfied_requirements(requirements_file)
+        if not problems:
+            write_lock(requirements_file)
+            print("✅ Installed packages satisfy requirements.txt - skipping pip\n")
+            return True
+        print("   Missing or outdated packages:")
+        for problem in problems:
+            print(f"   - {problem}")
+    
     try:
-        # Upgrade pip
-        print("   Upgrading pip...")
-        subprocess.check_call([sys.executable, "-m", "pip", "install", "--upgrade", "pip"])
+        if not fast:
+            # Upgrade pip
+            print("   Upgrading pip...")
+            subprocess.check_call([sys.executable, "-m", "pip", "install", "--upgrade", "pip"])
         
         # Install requirements
         print("   Installing packages from requirements.txt...")
         subprocess.check_call([sys.executable, "-m", "pip", "install", "-r", str(requirements_file)])
+        write_lock(requirements_file)
         
         print("\n✅ All libraries installed successfully!\n")
         return True
@@ -52,6 +165,20 @@ def install_requirements():
         print("Please check your internet connection and try again.")
         sys.exit(1)
 
+def prewarm_caches(source=DEFAULT_DATA_FILE):
+    """Load, clean and aggregate the dataset once so the first page view is served from cache"""
+    print("🔥 Pre-warming data caches...")
+    try:
+        # Imported here because these modules need the installed requirements
+        sys.path.insert(0, str(Path(__file__).parent))
+        from data_pipeline import prewarm_caches as run_prewarm
+        summary = run_prewarm(str(source))
+        if summary is not None:
+            print(f"✅ Caches warm ({summary['Seconds']:.1f}s)\n")
+    except Exception as e:
+        # A cold cache only costs the first user some time; never block the launch
+        print(f"⚠️  Cache pre-warm skipped: {e}\n")
+
 def launch_dashboard():
     """Launch the Streamlit dashboard"""
     print("🚀 Launching Blood Cancer Analysis Dashboard...")
@@ -71,12 +198,26 @@ def launch_dashboard():
         print(f"❌ Error launching dashboard: {e}")
         sys.exit(1)
 
+def parse_args(argv=None):
+    """Command line options for the launcher"""
+    parser = argparse.ArgumentParser(description="Set up and launch the Blood Cancer Analysis Dashboard")
+    parser.add_argument("--fast", action="store_true",
+                        help="skip pip when installed packages already satisfy requirements.txt")
+    parser.add_argument("--no-prewarm", action="store_true",
+                        help="do not pre-compute data caches before launching")
+    parser.add_argument("--data", default=str(DEFAULT_DATA_FILE),
+                        help="dataset file, folder or glob pattern to pre-warm")
+    return parser.parse_args(argv)
+
 def main():
     """Main setup and launch function"""
+    args = parse_args()
     try:
         print_header()
         check_python_version()
-        install_requirements()
+        install_requirements(fast=args.fast)
+        if not args.no_prewarm:
+            prewarm_caches(args.data)
         launch_dashboard()
     except KeyboardInterrupt:
         print("\n\n⚠️  Setup cancelled by user.")
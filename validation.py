@@ -0,0 +1,186 @@
+"""
+Blood Cancer Dashboard - Data Validation
+Declarative schema and clinical-plausibility rules, checked as data is
+ingested. Numeric columns are still coerced (unparseable values become NaN),
+but every malformed, implausible or unknown value is counted per rule and
+reported with sample row numbers instead of silently flowing into imputation.
+
+A rule is a dict such as
+    {'Rule': 'Age outside 0-120', 'Column': 'Age', 'Check': 'range', 'Min': 0, 'Max': 120}
+with one of these checks:
+    'header'   the row repeats the CSV header (reported once, skipped by every other rule)
+    'numeric'  a value is present but is not a number
+    'range'    a number lies outside [Min, Max]
+    'allowed'  a category is not in the column's vocabulary, matched like cleaning does
+Every rule becomes a boolean mask over the frame in a single pass. Category
+checks work on each column's distinct values and are taken back through the
+codes, so their cost grows with distinct values rather than rows.
+"""
+
+import hashlib
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+from aggregations import PLATELET_COL, WBC_COL, is_header_value
+from vocabulary import VOCABULARY_FILE, load_vocabulary, normalize_key
+
+VALIDATION_VERSION = 1
+MAX_SAMPLE_ROWS = 10
+
+# Plausible ranges; leukemias can push WBC far beyond the normal 4,000-11,000 /cumm
+AGE_RANGE = (0, 120)
+WBC_RANGE = (100, 1_000_000)
+PLATELET_RANGE = (1_000, 2_000_000)
+
+# ============================================================================
+# RULES
+# ============================================================================
+def default_rules(vocabulary=None):
+    """Header, numeric and range rules for the lab columns plus a category rule per vocabulary column"""
+    vocabulary = load_vocabulary() if vocabulary is None else vocabulary
+    rules = [{'Rule': 'Repeated header row', 'Column': None, 'Check': 'header'}]
+    for col, (low, high) in [('Age', AGE_RANGE), (WBC_COL, WBC_RANGE), (PLATELET_COL, PLATELET_RANGE)]:
+        name = col.split('(')[0].strip().replace('_', ' ')
+        rules.append({'Rule': f"{name} is not a number", 'Column': col, 'Check': 'numeric'})
+        rules.append({'Rule': f"{name} outside {low:,}-{high:,}", 'Column': col, 'Check': 'range',
+                      'Min': low, 'Max': high})
+    for col, entry in vocabulary.items():
+        name = col.split('(')[0].strip().replace('_', ' ')
+        rules.append({'Rule': f"Unknown {name}", 'Column': col, 'Check': 'allowed',
+                      'Values': list(entry.get('values', [])) + list(entry.get('aliases', {}))})
+    return rules
+
+def rules_fingerprint(rules=None):
+    """Stable hash of a rule set, so cached validation results follow rule and vocabulary edits"""
+    rules = default_rules() if rules is None else rules
+    payload = json.dumps([VALIDATION_VERSION, rules], sort_keys=True, default=str)
+    return hashlib.blake2b(payload.encode(), digest_size=8).hexdigest()
+
+# (vocabulary file state, fingerprint) of the default rules
+_DEFAULT_FINGERPRINT = (None, None)
+
+def default_rules_fingerprint():
+    """
+    rules_fingerprint() of the default rules, memoized on the vocabulary file's
+    size and modification time, so the file is only re-read after it changes
+    """
+    global _DEFAULT_FINGERPRINT
+    try:
+        stat = os.stat(VOCABULARY_FILE) if VOCABULARY_FILE else None
+    except OSError:
+        return rules_fingerprint()
+    key = (VOCABULARY_FILE, stat.st_size, stat.st_mtime_ns) if stat else ('builtin',)
+    cached_key, fingerprint = _DEFAULT_FINGERPRINT
+    if cached_key != key:
+        fingerprint = rules_fingerprint()
+        _DEFAULT_FINGERPRINT = (key, fingerprint)
+    return fingerprint
+
+# ============================================================================
+# MASKS
+# ============================================================================
+def _distinct_mask(series, flag):
+    """Row mask from a per-distinct-value predicate (missing values never match)"""
+    codes, uniques = pd.factorize(series)
+    if len(uniques) == 0:
+        return np.zeros(len(series), dtype=bool)
+    flags = np.fromiter((flag(value) for value in uniques), dtype=bool, count=len(uniques))
+    return np.where(codes >= 0, flags[codes], False)
+
+def header_mask(df, rows=None):
+    """
+    Rows where at least half of the text columns hold their own column name
+    rows optionally restricts the search to candidate row positions.
+    """
+    mask = np.zeros(len(df), dtype=bool)
+    columns = [col for col in df.columns if df[col].dtype == object]
+    if not columns or (rows is not None and len(rows) == 0):
+        return mask
+    frame = df if rows is None else df.iloc[rows]
+    hits = np.zeros(len(frame), dtype=np.int64)
+    for col in columns:
+        hits += _distinct_mask(frame[col], lambda value, col=col: is_header_value(value, col))
+    mask[slice(None) if rows is None else rows] = hits * 2 >= len(columns)
+    return mask
+
+def rule_mask(df, rule, failed=None):
+    """Violation mask of one rule, or None when the frame lacks the rule's column"""
+    col = rule['Column']
+    if col not in df.columns:
+        return None
+    if rule['Check'] == 'numeric':
+        if failed is not None and col in failed:
+            return failed[col]
+        if pd.api.types.is_numeric_dtype(df[col]):
+            return np.zeros(len(df), dtype=bool)
+        return (pd.to_numeric(df[col], errors='coerce').isna() & df[col].notna()).to_numpy()
+    if rule['Check'] == 'range':
+        values = pd.to_numeric(df[col], errors='coerce').to_numpy(dtype=float)
+        with np.errstate(invalid='ignore'):
+            return (values < rule['Min']) | (values > rule['Max'])
+    if rule['Check'] == 'allowed':
+        keys = {normalize_key(value) for value in rule['Values']}
+        return _distinct_mask(df[col], lambda value: isinstance(value, str)
+                              and normalize_key(value.strip()) not in keys)
+    raise ValueError(f"Unknown validation check: {rule['Check']}")
+
+def validate_frame(df, rules=None, failed=None, max_samples=MAX_SAMPLE_ROWS):
+    """
+    Evaluate every rule on a frame
+    failed optionally maps numeric columns to the mask of values their
+    coercion could not parse, so values are not parsed twice. It also narrows
+    the header search: a repeated header leaves text in the numeric columns,
+    so only rows that failed coercion can be headers. Returns one
+    {'Rule', 'Column', 'Check', 'Violations', 'Sample_Rows'} dict per rule,
+    with Sample_Rows the first row positions that break it.
+    """
+    rules = default_rules() if rules is None else rules
+    candidates = None
+    if failed:
+        candidates = np.flatnonzero(np.logical_or.reduce([np.asarray(mask) for mask in failed.values()]))
+    headers = header_mask(df, candidates)
+    results = []
+    for rule in rules:
+        mask = headers if rule['Check'] == 'header' else rule_mask(df, rule, failed)
+        if mask is None:
+            mask = np.zeros(len(df), dtype=bool)
+        elif rule['Check'] != 'header':
+            mask = mask & ~headers
+        results.append({
+            'Rule': rule['Rule'],
+            'Column': rule['Column'],
+            'Check': rule['Check'],
+            'Violations': int(np.count_nonzero(mask)),
+            'Sample_Rows': np.flatnonzero(mask)[:max_samples].tolist()
+        })
+    return results
+
+# ============================================================================
+# COMBINING & REPORTING
+# ============================================================================
+def merge_validation(results, offsets=None, max_samples=MAX_SAMPLE_ROWS):
+    """
+    Combine the validation results of consecutive chunks or files
+    offsets gives each part's first row in the combined frame (parts are
+    assumed to start at row 0 otherwise).
+    """
+    merged = {}
+    for i, part in enumerate(results):
+        offset = offsets[i] if offsets is not None else 0
+        for entry in part or []:
+            total = merged.setdefault(entry['Rule'], dict(entry, Violations=0, Sample_Rows=[]))
+            total['Violations'] += entry['Violations']
+            room = max_samples - len(total['Sample_Rows'])
+            total['Sample_Rows'] += [row + offset for row in entry['Sample_Rows'][:room]]
+    return list(merged.values())
+
+def validation_summary(results, violations_only=False):
+    """Validation results as a display table (sample rows joined into text)"""
+    summary = pd.DataFrame(results, columns=['Rule', 'Column', 'Check', 'Violations', 'Sample_Rows'])
+    if violations_only:
+        summary = summary[summary['Violations'] > 0]
+    summary['Sample_Rows'] = summary['Sample_Rows'].map(lambda rows: ', '.join(map(str, rows)))
+    return summary.reset_index(drop=True)
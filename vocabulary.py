@@ -0,0 +1,143 @@
+"""
+Blood Cancer Dashboard - Categorical Vocabulary
+Canonical spellings for the clinical categorical columns, used by step 3 of
+clean_data. Values are matched on a normalized key (case, surrounding and
+inner whitespace, '-', '_' and '/' ignored), so 'aml', ' AML ' and 'Not done'
+map to 'AML' and 'Not Done'. Work happens on each column's distinct values
+only: the column is factorized once, the uniques are mapped and the codes
+are taken back, so cost grows with distinct values rather than rows.
+
+The built-in vocabulary can be extended or overridden with a JSON file named
+by DASHBOARD_VOCABULARY_FILE:
+    {"Side_Effects": {"values": ["None", "Mild", "Moderate", "Severe"],
+                      "aliases": {"Grade 3": "Severe"}}}
+"""
+
+import hashlib
+import json
+import os
+import re
+
+import numpy as np
+import pandas as pd
+
+VOCABULARY_FILE = os.environ.get('DASHBOARD_VOCABULARY_FILE')
+
+DEFAULT_VOCABULARY = {
+    'Gender': {
+        'values': ['Male', 'Female'],
+        'aliases': {'M': 'Male', 'F': 'Female'}
+    },
+    'Cancer_Type(AML, ALL, CLL)': {
+        'values': ['AML', 'ALL', 'CLL', 'CML', 'Lymphoma', 'Multiple Myeloma'],
+        'aliases': {
+            'Acute Myeloid Leukemia': 'AML',
+            'Acute Lymphoblastic Leukemia': 'ALL',
+            'Chronic Lymphocytic Leukemia': 'CLL',
+            'Chronic Myeloid Leukemia': 'CML',
+            'Myeloma': 'Multiple Myeloma'
+        }
+    },
+    'Treatment_Type(Chemotherapy, Radiation)': {
+        'values': ['Chemotherapy', 'Radiation', 'Targeted Therapy', 'Immunotherapy', 'Stem Cell Transplant'],
+        'aliases': {'Chemo': 'Chemotherapy', 'Radiotherapy': 'Radiation', 'SCT': 'Stem Cell Transplant'}
+    },
+    'Bone Marrow Aspiration(Positive / Negative / Not Done)': {
+        'values': ['Positive', 'Negative', 'Not Done'],
+        'aliases': {'Pos': 'Positive', 'Neg': 'Negative', 'Not Performed': 'Not Done'}
+    },
+    'Serum Protein Electrophoresis (SPEP)(Normal / Abnormal)': {
+        'values': ['Normal', 'Abnormal'],
+        'aliases': {}
+    },
+    'Lymph Node Biopsy(Positive / Negative / Not Done)': {
+        'values': ['Positive', 'Negative', 'Not Done'],
+        'aliases': {'Pos': 'Positive', 'Neg': 'Negative', 'Not Performed': 'Not Done'}
+    },
+    'Lumbar Puncture (Spinal Tap)': {
+        'values': ['Positive', 'Negative', 'Not Done'],
+        'aliases': {'Pos': 'Positive', 'Neg': 'Negative', 'Not Performed': 'Not Done'}
+    },
+    'Treatment_Outcome': {
+        'values': ['Cured', 'Ongoing', 'Deceased'],
+        'aliases': {'Died': 'Deceased', 'Dead': 'Deceased', 'In Progress': 'Ongoing'}
+    },
+    'Genetic_Data(BCR-ABL, FLT3)': {
+        'values': ['BCR-ABL', 'FLT3', 'TP53'],
+        'aliases': {}
+    },
+    'Side_Effects': {
+        'values': ['None', 'Mild', 'Moderate', 'Severe'],
+        'aliases': {}
+    },
+    'Diagnosis_Result': {
+        'values': ['Confirmed', 'Suspected', 'Ruled Out'],
+        'aliases': {}
+    }
+}
+
+def normalize_key(value):
+    """Matching key for a categorical value: case and separators ignored"""
+    return re.sub(r'[\s_\-/]+', '', str(value).casefold())
+
+def load_vocabulary(path=VOCABULARY_FILE):
+    """Built-in vocabulary, with columns from the JSON file at `path` (if any) replacing the defaults"""
+    vocabulary = {col: dict(entry) for col, entry in DEFAULT_VOCABULARY.items()}
+    if path:
+        with open(path) as f:
+            overrides = json.load(f)
+        for col, entry in overrides.items():
+            vocabulary[col] = {'values': list(entry.get('values', [])),
+                               'aliases': dict(entry.get('aliases', {}))}
+    return vocabulary
+
+def vocabulary_fingerprint(vocabulary):
+    """Stable hash of a vocabulary, so cached cleaning results follow vocabulary edits"""
+    return hashlib.blake2b(json.dumps(vocabulary, sort_keys=True).encode(), digest_size=8).hexdigest()
+
+def _lookup(entry):
+    """Normalized key -> canonical value for one column's vocabulary entry"""
+    lookup = {normalize_key(alias): canonical for alias, canonical in entry.get('aliases', {}).items()}
+    lookup.update({normalize_key(value): value for value in entry.get('values', [])})
+    return lookup
+
+def canonicalize_column(series, entry=None):
+    """
+    Canonicalize one categorical column at the dictionary level
+    Every distinct value is stripped and, when the column has a vocabulary
+    entry, mapped to its canonical spelling; unknown values are only
+    stripped. Returns (series, mappings) where mappings lists each changed
+    value as {'From', 'To', 'Rows'}.
+    """
+    codes, uniques = pd.factorize(series)
+    if len(uniques) == 0:
+        return series, []
+    lookup = _lookup(entry) if entry else {}
+
+    originals = np.asarray(uniques, dtype=object)
+    canonical = np.empty(len(originals), dtype=object)
+    for i, value in enumerate(originals):
+        text = value.strip() if isinstance(value, str) else value
+        canonical[i] = lookup.get(normalize_key(text), text) if isinstance(text, str) else text
+
+    changed = np.flatnonzero(canonical != originals)
+    if len(changed) == 0:
+        return series, []
+    rows = np.bincount(codes[codes >= 0], minlength=len(originals))
+    mappings = [{'From': originals[i], 'To': canonical[i], 'Rows': int(rows[i])} for i in changed]
+
+    values = canonical.take(codes)
+    values[codes < 0] = np.nan
+    return pd.Series(values, index=series.index, name=series.name, dtype=object), mappings
+
+def canonicalize_frame(df, columns, vocabulary=None):
+    """
+    Canonicalize the given categorical columns in place
+    Returns the applied mappings as a list of {'Column', 'From', 'To', 'Rows'}.
+    """
+    vocabulary = load_vocabulary() if vocabulary is None else vocabulary
+    applied = []
+    for col in columns:
+        df[col], mappings = canonicalize_column(df[col], vocabulary.get(col))
+        applied.extend(dict(Column=col, **mapping) for mapping in mappings)
+    return applied